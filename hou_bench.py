@@ -0,0 +1,2255 @@
+"""
+Offline benchmarks for hou_parser.
+
+All benchmarks run against a generated corpus of pages with the same markup as
+http://www.sidefx.com/docs/houdini/hom/hou/ served by a local http server.
+
+python hou_bench.py crawl --pages 300 --workers 8 --delay 0.02
+"""
+import os, re, sys, json, time, random, shutil, tempfile, threading, hashlib, collections, email.utils, zlib
+from contextlib import contextmanager
+import BaseHTTPServer, SocketServer
+import hou_parser
+
+
+RETURN_SAMPLES = [
+    '', 'hou.Node', 'hou.Node or None', 'tuple of hou.Parm', 'tuple of hou.Node', 'float', 'int',
+    'str', 'bool', 'tuple of str', 'tuple of float', 'dict of str to str', 'hou.nodeTypeFilter enum value',
+    'tuple of hou.primType enum values', '`hou.Vector3`', '(int, int)', 'QWidget subclass', 'double',
+    'tuple of [Hom:hou.Geometry]', 'dict', 'hou.Vector3', 'int, float, str or tuple', 'hou.Matrix4',
+    '(hou.Node, tuple of hou.Parm)', 'tuple of (str, int)', 'dictionary mapping str to str',
+]
+ARG_SAMPLES = [
+    'name', 'value', 'index=0', 'on=True', 'label=None', 'position=hou.Vector3((0,0,0))', 'Hom:hou.Node node',
+    'node_type_filter=hou.nodeTypeFilter.NoFilter', 'tolerance=0.001', 'path', 'recurse=False',
+    'parms=()', 'include_self=True',
+]
+# return strings covering every parse_return rule, in addition to RETURN_SAMPLES
+RETURN_CORPUS = RETURN_SAMPLES + [
+    'hou.Parm', 'hou.ParmTuple or None', 'str or None', 'Node or none', 'hou.Parm or None',
+    'tuple of hou.nodeTypeFilter enum values', 'tuple of [Hom:hou.Node]', 'tuple of int', 'tuple of strings',
+    'tuple of tuples', 'tuple of hou.Vector3', '(tuple of int, tuple of tuples of float)',
+    'a tuple of (str, int)', 'tuple of (hou.Node, float, str)', '[Hom:hou.severityType] enum value',
+    'hou.primType enum value', 'dict of str to hou.Node', 'dict of hou.parmTemplateType enum value to str',
+    'a dict mapping names to values', '(hou.Vector3, float)', '(str, str, int)', '(int)',
+    'dictionary of (hou.Node/str, tuple of hou.Parm) pairs', 'a QtWidgets.QWidget subclass',
+    '(int, tuple of int and float tuples)', 'str or tuple of str', 'string', 'None', 'True', 'Boolean',
+    'values', '`hou.Matrix4`', 'Hom.Node', 'Hom:hou.Node', 'list of str', 'tuple', 'generator', 'QIcon',
+    'float = 0.0', 'int >= 0', 'integer', 'floats', 'strings', 'dictionary', 'dictionaries', '{}', '()',
+    'Nodes', 'Vector3s', 'parm', 'start', 'false', 'value', 'hou.Geometry or None', 'hou.Node, hou.Parm or None',
+    'tuple of hou.Parm or None', '= hou.Node', 'hou.Color',
+]
+
+
+CORE_CLASSES = ('EnumValue', 'Node', 'Parm', 'Geometry', 'Vector3', 'Matrix4')
+WORDS = ('node parameter network geometry value returns the this a of to and '
+         'raise hou.OperationFailed if is not valid viewer scene houdini').split()
+
+
+def _text(rnd, words):
+    return ' '.join(rnd.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def _signature(rnd, name, self_arg=True):
+    args = sorted(rnd.sample(ARG_SAMPLES, rnd.randint(0, 3)), key=lambda a: '=' in a)
+    if self_arg:
+        args.insert(0, 'self')
+    ret = rnd.choice(RETURN_SAMPLES)
+    title = '%s(%s)' % (name, ', '.join(args))
+    if ret:
+        title += u' \u2192 ' + ret
+    return title
+
+
+def _method_item(rnd, name, self_arg=True):
+    # some methods are marked as not implemented
+    extra = 'ni' if rnd.random() < 0.05 else ''
+    return u'''<div class="collapsible collapsed method item %(extra)s" id="%(name)s" data-title="%(name)s">
+<p class="label">%(title)s</p>
+<div class="content"><p>%(doc1)s</p><p>%(doc2)s</p></div>
+</div>
+''' % dict(name=name, title=_signature(rnd, name, self_arg), doc1=_text(rnd, 30), doc2=_text(rnd, 12), extra=extra)
+
+
+NAVIGATION = u'''<div id="header"><script>var search_index = {};</script>
+<a href="/docs/houdini/">Houdini</a> <input type="text" class="search" placeholder="Search"></div>
+<nav id="sidebar"><ul class="toc">
+%s</ul></nav>
+''' % ''.join(u'<li class="toc_item"><a class="link" href="/docs/houdini/hom/hou/item%s">hou.item%s</a>'
+              u'<span class="tip">Reference page %s</span></li>\n' % (i, i, i) for i in range(150))
+
+
+def _page(title, summary, content):
+    return u'''<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>%(title)s</title></head>
+<body>
+%(navigation)s
+<div id="main">
+<div class="title-content ">
+<h1 class="title">%(title)s</h1>
+<p class="summary">%(summary)s</p>
+</div>
+<div id="content">
+%(content)s
+</div>
+</div>
+<div id="footer"><p>Copyright SideFX</p></div>
+</body></html>
+''' % dict(title=title, summary=summary, content=content, navigation=NAVIGATION)
+
+
+def class_page(rnd, name, bases, methods, module=False):
+    group = 'functions' if module else 'methods'
+    items = ''.join(_method_item(rnd, 'method%s%s' % (name, i), not module) for i in range(methods))
+    content = u'<p>%s</p>\n<p>%s</p>\n' % (_text(rnd, 40), _text(rnd, 20))
+    content += u'''<section id="%(group)s"><h2>Methods</h2>
+<div class="content" id="%(group)s-body">
+<div class="%(group)s_item_group item_group">
+%(items)s</div>
+</div>
+</section>
+''' % dict(group=group, items=items)
+    for base in bases:
+        content += u'''<section><h2 id="methods-from-%(base)s">Methods from hou.%(base)s</h2>
+<div class="content" id="methods-from-%(base)s-body"><p>inherited</p></div>
+</section>
+''' % dict(base=base)
+    return _page(u'hou.%s %s' % (name, 'module' if module else 'class'), _text(rnd, 15), content)
+
+
+def enum_page(rnd, name, values):
+    if rnd.random() < 0.5:
+        items = ''.join(u'''<div class="values_item item def"><p class="label">Value%s</p>
+<div class="content"><p>%s</p></div></div>
+''' % (i, _text(rnd, 10)) for i in range(values))
+    else:
+        # older pages list values
+        items = u'<ul>\n%s</ul>' % ''.join(u'<li><p>hou.%s.Value%s</p><p>%s</p></li>\n' % (name, i, _text(rnd, 10))
+                                            for i in range(values))
+    content = u'<p>%s</p>\n<section><div class="content" id="values-body">\n%s</div></section>\n' % (
+        _text(rnd, 20), items)
+    return _page(u'hou.%s' % name, _text(rnd, 10), content)
+
+
+def function_page(rnd, name):
+    content = u'<div class="usage_group"><p class="label">%s</p></div>\n<p>%s</p>\n<p>%s</p>\n' % (
+        _signature(rnd, name, False), _text(rnd, 30), _text(rnd, 10))
+    return _page(u'hou.%s function' % name, _text(rnd, 12), content)
+
+
+def make_corpus(folder, pages=300, seed=1):
+    """
+    Write synthetic documentation tree: index.html with subtopics list and one file per page,
+    plus pages of CORE_CLASSES. Returns list of page names in index order
+    """
+    rnd = random.Random(seed)
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+    docs = {}
+    classes = []
+    ancestors = {}
+    for i in range(pages):
+        kind = rnd.random()
+        if kind < 0.55:
+            name = 'Class%04d' % i
+            bases = rnd.sample(classes, min(len(classes), rnd.randint(0, 2)))
+            # base which is an ancestor of other base has no consistent python 3 mro
+            bases = [b for b in bases if not any(b in ancestors[o] for o in bases)]
+            docs[name] = class_page(rnd, name, bases, rnd.randint(1, 40))
+            classes.append(name)
+            ancestors[name] = set(bases).union(*[ancestors[b] for b in bases])
+        elif kind < 0.65:
+            name = 'module%04d' % i
+            docs[name] = class_page(rnd, name, [], rnd.randint(1, 10), module=True)
+        elif kind < 0.8:
+            name = 'enum%04d' % i
+            docs[name] = enum_page(rnd, name, rnd.randint(2, 12))
+        else:
+            name = 'function%04d' % i
+            docs[name] = function_page(rnd, name)
+    # classes used as return and default argument types, other pages are the same with or without them
+    core = random.Random(seed + 1)
+    for name in CORE_CLASSES:
+        docs[name] = class_page(core, name, [], core.randint(1, 5))
+    names = sorted(docs)
+    rnd.shuffle(names)
+    items = ''.join(u'<li class="subtopics_item" data-title="hou.%s"><a href="%s">hou.%s</a></li>\n' % (n, n, n)
+                    for n in names)
+    index = _page(u'hou', u'Module containing all the sub-modules, classes, and functions.',
+                  u'<ul class="subtopics">\n%s</ul>' % items)
+    open(os.path.join(folder, 'index.html'), 'w').write(index.encode('utf-8'))
+    for name, html in docs.items():
+        open(os.path.join(folder, name), 'w').write(html.encode('utf-8'))
+    return names
+
+
+class _ThreadingServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+@contextmanager
+def serve_corpus(folder, delay=0.0, fail_first=0):
+    """
+    Serve folder over http on a free local port, yields server with url and stats counters
+    of status codes, connections, and requests and 200 downloads per path.
+    Supports keep-alive and conditional requests with ETag and Last-Modified.
+    delay simulates network latency per request,
+    fail_first answers 503 to the first n requests of every page
+    """
+    stats = collections.Counter()
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            BaseHTTPServer.BaseHTTPRequestHandler.setup(self)
+            with lock:
+                stats['connections'] += 1
+
+        def do_GET(self):
+            if delay:
+                time.sleep(delay)
+            path = self.path.split('?')[0].lstrip('/') or 'index.html'
+            with lock:
+                stats['requests'] += 1
+                stats['requests ' + path] += 1
+                fail = stats['requests ' + path] <= fail_first
+            if fail:
+                return self._send(503)
+            file_path = os.path.join(folder, path)
+            if not os.path.isfile(file_path):
+                return self._send(404)
+            content = open(file_path, 'rb').read()
+            etag = '"%s"' % hashlib.md5(content).hexdigest()
+            modified = email.utils.formatdate(int(os.path.getmtime(file_path)), usegmt=True)
+            if self.headers.get('If-None-Match') == etag or (
+                    not self.headers.get('If-None-Match') and self.headers.get('If-Modified-Since') == modified):
+                return self._send(304)
+            with lock:
+                stats['downloads ' + path] += 1
+            self._send(200, content, {'ETag': etag, 'Last-Modified': modified})
+
+        def _send(self, status, content='', headers=None):
+            with lock:
+                stats[status] += 1
+            self.send_response(status)
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.send_header('Content-Type', 'text/html')
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, *args):
+            pass
+
+    server = _ThreadingServer(('127.0.0.1', 0), Handler)
+    server.url = 'http://127.0.0.1:%s/' % server.server_address[1]
+    server.stats = stats
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@contextmanager
+def quiet():
+    """
+    Silence parser output
+    """
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        yield
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+
+@contextmanager
+def temp_cache():
+    """
+    Point HouModules cache to a temporary folder
+    """
+    folder = tempfile.mkdtemp(prefix='hou_bench_')
+    cache_folder, cache = hou_parser.HouModules.cache_folder, hou_parser.HouModules.cache
+    hou_parser.HouModules.cache_folder, hou_parser.HouModules.cache = folder, None
+    try:
+        yield folder
+    finally:
+        if hou_parser.HouModules.fetcher:
+            hou_parser.HouModules.fetcher.close()
+            hou_parser.HouModules.fetcher = None
+        hou_parser.HouModules.cache_folder, hou_parser.HouModules.cache = cache_folder, cache
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def bench_crawl(pages=300, workers=(1, 8), delay=0.02):
+    """
+    Cold crawl of the corpus with different worker counts. Output must be identical for every run
+    """
+    corpus = tempfile.mkdtemp(prefix='hou_corpus_')
+    try:
+        make_corpus(corpus, pages)
+        results = []
+        with serve_corpus(corpus, delay) as server:
+            for count in workers:
+                with temp_cache(), quiet():
+                    start = time.time()
+                    output = hou_parser.HouModules.parse_help(save_cache=False, workers=count, root_url=server.url)
+                    elapsed = time.time() - start
+                results.append((count, elapsed, output))
+        for count, elapsed, output in results:
+            print 'workers %3s: %7.2fs %8.1f pages/sec  identical: %s' % (
+                count, elapsed, pages / elapsed, output == results[0][2])
+        different = [count for count, _, output in results if output != results[0][2]]
+        assert not different, 'output of workers %s differs' % ', '.join(map(str, different))
+    finally:
+        shutil.rmtree(corpus, ignore_errors=True)
+
+
+def bench_fetch(pages=300, workers=4, changed=10, fail_first=1):
+    """
+    Cold crawl, then refresh with conditional requests after a few pages changed on server.
+    Every page answers 503 fail_first times to exercise retries.
+    Refresh must download only the changed pages, everything else is answered with 304
+    """
+    corpus = tempfile.mkdtemp(prefix='hou_corpus_')
+    try:
+        names = make_corpus(corpus, pages)
+        with serve_corpus(corpus, fail_first=fail_first) as server, temp_cache():
+            with quiet():
+                start = time.time()
+                cold = hou_parser.HouModules.parse_help(save_cache=False, workers=workers, root_url=server.url,
+                                                        retries=fail_first + 2, rate_limit=None)
+                cold_time = time.time() - start
+            cold_stats = server.stats.copy()
+            server.stats.clear()
+            for name in names[:changed]:
+                path = os.path.join(corpus, name)
+                open(path, 'a').write('<!-- changed -->')
+            with quiet():
+                start = time.time()
+                refresh = hou_parser.HouModules.parse_help(save_cache=False, workers=workers,
+                                                           root_url=server.url, retries=fail_first + 2)
+                refresh_time = time.time() - start
+            refresh_stats = server.stats
+        for title, elapsed, stats in (('cold', cold_time, cold_stats), ('refresh', refresh_time, refresh_stats)):
+            print '%-8s %6.2fs  requests: %5s  connections: %3s  200: %5s  304: %5s  503: %5s' % (
+                title, elapsed, stats['requests'], stats['connections'], stats[200], stats[304], stats[503])
+        downloaded = sum(refresh_stats['downloads ' + name] for name in names)
+        print 'changed pages: %s, downloaded again: %s, index downloaded again: %s' % (
+            changed, downloaded, bool(refresh_stats['downloads index.html']))
+        assert downloaded == changed, 'refresh downloaded %s pages, %s changed' % (downloaded, changed)
+        print 'identical output: %s' % (cold == refresh)
+    finally:
+        shutil.rmtree(corpus, ignore_errors=True)
+
+
+def _folder_size(folder):
+    return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(folder) for f in files)
+
+
+def bench_cache(pages=300):
+    """
+    Cold and warm runs of two documentation versions sharing one cache folder, then size eviction
+    """
+    corpus = tempfile.mkdtemp(prefix='hou_corpus_')
+    try:
+        make_corpus(corpus, pages)
+        with serve_corpus(corpus) as server, temp_cache() as folder:
+            rows = []
+            for title, version, compress in (('16.5 cold', '16.5', False), ('16.5 warm', '16.5', False),
+                                             ('17.0 cold gz', '17.0', True), ('17.0 warm gz', '17.0', True)):
+                server.stats.clear()
+                with quiet():
+                    start = time.time()
+                    hou_parser.HouModules.parse_help(root_url=server.url, version=version, compress_cache=compress)
+                    elapsed = time.time() - start
+                cache = hou_parser.HouModules.cache
+                rows.append((title, elapsed, server.stats['requests'], cache.hits, len(cache.entries),
+                             _folder_size(folder)))
+            for row in rows:
+                print '%-14s %6.2fs  requests: %4s  cache hits: %4s  entries: %4s  folder: %6.1f KB' % (
+                    row[:5] + (row[5] / 1024.0,))
+            cache = hou_parser.PageCache(folder, max_size=cache.size() / 2)
+            before = len(cache.entries)
+            cache.save()
+            print 'evict to half size: %s -> %s entries, folder %.1f KB' % (
+                before, len(cache.entries), _folder_size(folder) / 1024.0)
+    finally:
+        shutil.rmtree(corpus, ignore_errors=True)
+
+
+def bench_index(pages=300):
+    """
+    Start of a run with cached page list of documentation root: cold, warm, stale index and offline
+    after the server is gone. Index time, server requests and output identity
+    """
+    from hou_stats import Stats
+    corpus = tempfile.mkdtemp(prefix='hou_corpus_')
+
+    def run(title, url, **kwargs):
+        stats = Stats()
+        start = time.time()
+        with quiet():
+            result = hou_parser.HouModules.parse_help(root_url=url, stats=stats, **kwargs)
+        elapsed = time.time() - start
+        requests = server.stats['requests'] if server else 0
+        print '%-14s %6.2fs  index %7.1f ms  requests: %4s' % (
+            title, elapsed, stats.stages['index'] * 1000, requests)
+        return result
+
+    try:
+        make_corpus(corpus, pages)
+        with temp_cache():
+            with serve_corpus(corpus) as server:
+                url = server.url
+                outputs = [run('cold', url)]
+                server.stats.clear()
+                outputs.append(run('warm', url))
+                server.stats.clear()
+                outputs.append(run('stale index', url, index_max_age=0))
+                print 'stale index answered: %s' % ', '.join(
+                    '%s x%s' % (k, v) for k, v in sorted(server.stats.items()) if k in (200, 304))
+            server = None
+            outputs.append(run('offline', url, offline=True))
+            try:
+                with quiet():
+                    hou_parser.HouModules.parse_help(root_url=url + 'other/', offline=True)
+            except IOError as e:
+                print 'offline, not cached: %s' % e
+        print 'identical output: %s' % all(o == outputs[0] for o in outputs)
+    finally:
+        shutil.rmtree(corpus, ignore_errors=True)
+
+
+def bench_resume(pages=300, broken=5, workers=1, stop=0.5):
+    """
+    Crawl interrupted after stop part of pages, with broken pages failing to parse:
+    resumed run fetches only pages not finished, failed pages are reported and retried after fix
+    """
+    from hou_stats import Stats
+    from hou_cache import CrawlJournal
+    corpus = tempfile.mkdtemp(prefix='hou_corpus_')
+    out = tempfile.mkdtemp(prefix='hou_out_')
+
+    class Interrupt(object):
+        def __init__(self, pages):
+            self.pages = pages
+
+        def __call__(self, event, data):
+            if event == 'page':
+                self.pages -= 1
+                if not self.pages:
+                    raise KeyboardInterrupt
+
+    def run(title, **kwargs):
+        server.stats.clear()
+        start = time.time()
+        result = None
+        with quiet():
+            try:
+                result = hou_parser.HouModules.parse_help(root_url=server.url, workers=workers, **kwargs)
+            except KeyboardInterrupt:
+                pass
+        print '%-24s %6.2fs  requests: %4s  failed: %s' % (
+            title, time.time() - start, server.stats['requests'], len(hou_parser.HouModules.failures))
+        return result
+
+    try:
+        names = make_corpus(corpus, pages)
+        with serve_corpus(corpus) as server, temp_cache():
+            reference = run('clean run')
+            hou_parser.HouModules.cache = None
+            shutil.rmtree(hou_parser.HouModules.cache_folder)
+            # title lookup fails with AttributeError
+            for name in names[-broken:]:
+                path = os.path.join(corpus, name)
+                original = open(path).read()
+                open(path + '.orig', 'w').write(original)
+                open(path, 'w').write(original.replace('class="title"', 'class="heading"'))
+            stats = Stats()
+            stats.add_hook(Interrupt(int(len(names) * stop)))
+            run('interrupted', stats=stats)
+            # write of the last entry torn by the interrupt, entries resumed after it must be kept
+            journal = CrawlJournal(hou_parser.HouModules.cache_folder, 'latest', hou_parser.HouModules.parser_hash())
+            interrupted = len(journal.entries)
+            journal.close()
+            open(journal.path, 'ab').write('{"url": "torn')
+            failures = os.path.join(out, 'failures.json')
+            run('resumed', resume=True, failures_json=failures)
+            journal = CrawlJournal(hou_parser.HouModules.cache_folder, 'latest', hou_parser.HouModules.parser_hash())
+            journal.close()
+            print 'journal after torn line: %s entries of interrupted run, %s after resume' % (
+                interrupted, len(journal.entries))
+            assert len(journal.entries) == len(names) - broken, 'journal lost %s entries after torn line' % (
+                len(names) - broken - len(journal.entries))
+            report = json.load(open(failures))
+            print 'failure report: %s pages, last line: %s' % (len(report), report[0]['error'].strip().splitlines()[-1])
+            for name in names[-broken:]:
+                path = os.path.join(corpus, name)
+                os.rename(path + '.orig', path)
+            result = run('resumed after fix', resume=True)
+            print 'identical output: %s' % (result == reference)
+            assert result == reference, 'resumed output differs from clean run'
+    finally:
+        shutil.rmtree(corpus, ignore_errors=True)
+        shutil.rmtree(out, ignore_errors=True)
+
+
+def bench_incremental(pages=300, changed=5):
+    """
+    Regenerate outputs on a warm cache after a few pages changed: full run against incremental run
+    """
+    corpus = tempfile.mkdtemp(prefix='hou_corpus_')
+    try:
+        names = make_corpus(corpus, pages)
+        with serve_corpus(corpus) as server, temp_cache():
+            with quiet():
+                hou_parser.HouModules.parse_help(root_url=server.url, incremental=True)
+            for name in names[:changed]:
+                path = os.path.join(corpus, name)
+                html = open(path).read()
+                open(path, 'w').write(html.replace('<p class="summary">', '<p class="summary">Changed. '))
+            with quiet():
+                # download changed pages to cache
+                hou_parser.HouModules.parse_help(root_url=server.url, save_cache=False)
+                start = time.time()
+                full = hou_parser.HouModules.parse_help(root_url=server.url)
+                full_time = time.time() - start
+                start = time.time()
+                incremental = hou_parser.HouModules.parse_help(root_url=server.url, incremental=True)
+                incremental_time = time.time() - start
+        print 'changed pages: %s of %s' % (changed, pages)
+        print 'full:        %6.2fs' % full_time
+        print 'incremental: %6.2fs  %.1f%% of full' % (incremental_time, 100.0 * incremental_time / full_time)
+        print 'identical output: %s' % (full == incremental)
+    finally:
+        shutil.rmtree(corpus, ignore_errors=True)
+
+
+def peak_memory(func, *args):
+    """
+    Run func in a forked process, return (result, peak RSS growth in MB)
+    """
+    import multiprocessing, resource
+    queue = multiprocessing.Queue()
+
+    def run():
+        start = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        result = func(*args)
+        queue.put((result, (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - start) / 1024.0))
+
+    process = multiprocessing.Process(target=run)
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def bench_stream(pages=300, workers=1):
+    """
+    Build outputs with parse_help and stream_help on a warm cache: time, peak memory and identity
+    """
+    corpus = tempfile.mkdtemp(prefix='hou_corpus_')
+    out = tempfile.mkdtemp(prefix='hou_out_')
+
+    def build(stream):
+        start = time.time()
+        with quiet():
+            if stream:
+                hou_parser.HouModules.stream_help(os.path.join(out, 'full_s.py'), os.path.join(out, 'min_s.py'),
+                                                  root_url=server.url, workers=workers)
+            else:
+                minify, full = hou_parser.HouModules.parse_help(root_url=server.url, workers=workers)
+                open(os.path.join(out, 'full.py'), 'wb').write(full.encode('utf-8'))
+                open(os.path.join(out, 'min.py'), 'wb').write(minify.encode('utf-8'))
+        return time.time() - start
+
+    try:
+        make_corpus(corpus, pages)
+        with serve_corpus(corpus) as server, temp_cache():
+            with quiet():
+                hou_parser.HouModules.parse_help(root_url=server.url)
+            for stream in (False, True):
+                elapsed, memory = peak_memory(build, stream)
+                print '%-12s %6.2fs  peak memory +%.1f MB' % ('stream_help' if stream else 'parse_help', elapsed, memory)
+        identical = all(open(os.path.join(out, name + '.py'), 'rb').read() ==
+                        open(os.path.join(out, name + '_s.py'), 'rb').read() for name in ('full', 'min'))
+        print 'identical output: %s' % identical
+        assert identical, 'stream_help output differs from parse_help'
+    finally:
+        shutil.rmtree(corpus, ignore_errors=True)
+        shutil.rmtree(out, ignore_errors=True)
+
+
+def bench_source(pages=300, workers=1):
+    """
+    Same corpus read over http (cold cache), from a folder and from a zip archive without extraction.
+    Local sources keep the urls of the http server, outputs of every source must be identical
+    """
+    import zipfile, hou_source, hou_cache
+    corpus = tempfile.mkdtemp(prefix='hou_corpus_')
+    archive = os.path.join(tempfile.mkdtemp(prefix='hou_zip_'), 'help.zip')
+
+    def build(**kwargs):
+        start = time.time()
+        with quiet():
+            result = hou_parser.HouModules.parse_help(workers=workers, **kwargs)
+        return time.time() - start, result
+
+    try:
+        make_corpus(corpus, pages)
+        with zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED) as z:
+            for name in sorted(os.listdir(corpus)):
+                z.write(os.path.join(corpus, name), 'hom/hou/' + name)
+        print 'archive: %.1f KB of %.1f KB pages' % (
+            os.path.getsize(archive) / 1024.0,
+            sum(os.path.getsize(os.path.join(corpus, n)) for n in os.listdir(corpus)) / 1024.0)
+        results = []
+        with serve_corpus(corpus) as server, temp_cache():
+            results.append(('http',) + build(root_url=server.url))
+        with temp_cache():
+            base_url = server.url
+            results.append(('folder',) + build(source=hou_source.DirectorySource(corpus, base_url=base_url)))
+            source = hou_source.ZipSource(archive, 'hom/hou', base_url)
+            results.append(('zip',) + build(source=source))
+            source.close()
+            # journal/ and parsed/ are always there, page cache is objects/ and index.json
+            cached = [n for n in ('objects', hou_cache.PageCache.INDEX)
+                      if os.path.exists(os.path.join(hou_parser.HouModules.cache_folder, n))]
+            # source without documentation root
+            empty = tempfile.mkdtemp(prefix='hou_empty_')
+            try:
+                build(source=hou_source.DirectorySource(empty, base_url=base_url))
+                missing_root = None
+            except IOError as e:
+                missing_root = str(e)
+            finally:
+                shutil.rmtree(empty, ignore_errors=True)
+        for name, elapsed, _ in results:
+            print '%-8s %6.2fs' % (name, elapsed)
+        print 'identical output: %s' % all(r[2] == results[0][2] for r in results)
+        print 'page cache written by local sources: %s' % (', '.join(cached) or 'none')
+        assert not cached, 'local sources wrote page cache: %s' % ', '.join(cached)
+        assert all(r[2] == results[0][2] for r in results), 'outputs of sources differ'
+        print 'source without root: %s' % missing_root
+        assert missing_root, 'source without index.html is not reported'
+    finally:
+        shutil.rmtree(corpus, ignore_errors=True)
+        shutil.rmtree(os.path.dirname(archive), ignore_errors=True)
+
+
+def bench_shard(pages=300, shards=(1, 2, 4), delay=0.02):
+    """
+    Single hou_parser process against local shard processes merged by hou_shard, every run with a cold cache
+    against the same http server with per request latency. Merged files must be identical to the single run
+    """
+    import subprocess
+    here = os.path.dirname(os.path.abspath(__file__))
+    corpus = tempfile.mkdtemp(prefix='hou_corpus_')
+    work = tempfile.mkdtemp(prefix='hou_shard_')
+
+    def run(name, args):
+        # cold cache of every run in its own home folder
+        home = os.path.join(work, name)
+        os.makedirs(home)
+        env = dict(os.environ, HOME=home)
+        start = time.time()
+        with open(os.path.join(home, 'run.log'), 'w') as log:
+            code = subprocess.call([sys.executable] + args, cwd=home, env=env, stdout=log, stderr=subprocess.STDOUT)
+        assert not code, '%s failed with code %s:\n%s' % (
+            name, code, ''.join(open(os.path.join(home, 'run.log')).readlines()[-10:]))
+        return time.time() - start, [open(os.path.join(home, n), 'rb').read() for n in ('hou_full.py', 'hou_min.py')]
+
+    try:
+        make_corpus(corpus, pages)
+        with serve_corpus(corpus, delay) as server:
+            single, expected = run('single', [os.path.join(here, 'hou_parser.py'), '-u', server.url])
+            print 'single process   %6.2fs' % single
+            different = []
+            for count in shards:
+                elapsed, output = run('shards%s' % count, [
+                    os.path.join(here, 'hou_shard.py'), 'local', str(count), 'shards', '--', '-u', server.url])
+                print '%2s shards        %6.2fs  x%.1f  identical %s' % (count, elapsed, single / elapsed,
+                                                                      output == expected)
+                if output != expected:
+                    different.append(count)
+        assert not different, 'merged output of %s shards differs from single run' % ', '.join(map(str, different))
+    finally:
+        shutil.rmtree(corpus, ignore_errors=True)
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def bench_memory(pages=300, folder=None):
+    """
+    Peak memory of a full parse and render: parsed modules kept with page source and parse tree,
+    as before compact records, against compact records only
+    """
+    corpus = None
+    if not folder:
+        corpus = folder = tempfile.mkdtemp(prefix='hou_corpus_')
+        make_corpus(corpus, pages)
+    docs = load_pages(folder)
+
+    def build(keep_modules):
+        hm = hou_parser.HouModules
+        start = time.time()
+        with quiet():
+            modules = []
+            for name, content in docs:
+                mod = hm('saved/' + name, content=content)
+                if mod.is_valid:
+                    modules.append(mod if keep_modules else mod.record())
+            text = [hm.render_text(m if not keep_modules else m.record(), True) for m in modules]
+        return time.time() - start, hashlib.sha1(u''.join(text).encode('utf-8')).hexdigest()
+
+    try:
+        results = []
+        for keep_modules in (True, False):
+            (elapsed, digest), memory = peak_memory(build, keep_modules)
+            results.append(digest)
+            print '%-8s %6.2fs  peak memory +%.1f MB' % ('modules' if keep_modules else 'records', elapsed, memory)
+        print 'pages: %s  identical output: %s' % (len(docs), results[0] == results[1])
+    finally:
+        if corpus:
+            shutil.rmtree(corpus, ignore_errors=True)
+
+
+SUITE_STAGES = ('index', 'parse', 'returns', 'render', 'sort', 'write')
+
+
+def run_suite(docs, index=None, repeat=3):
+    """
+    Offline run of the whole pipeline over saved pages, best time of every stage over repeat runs.
+    docs is a list of (name, content), index is the root page source or None to use docs order
+    """
+    hm = hou_parser.HouModules
+    content = dict(('saved/' + name, data) for name, data in docs)
+    timings = dict((stage, []) for stage in SUITE_STAGES)
+    out = tempfile.mkdtemp(prefix='hou_out_')
+    try:
+        for _ in range(repeat):
+            with quiet():
+                start = time.time()
+                if index:
+                    pages = hm.parse_index(index, 'saved/')
+                else:
+                    pages = [('saved/' + name, name) for name, _ in docs]
+                timings['index'].append(time.time() - start)
+
+                start = time.time()
+                records = []
+                for url, title in pages:
+                    mod = hm(url, content=content[url])
+                    if mod.is_valid:
+                        records.append(mod.record())
+                timings['parse'].append(time.time() - start)
+
+                hm._return_cache.clear()
+                rets = [m.ret for r in records for m in r.methods + r.static_functions]
+                rets.extend(r.function.ret for r in records if r.function)
+                start = time.time()
+                for ret in rets:
+                    hm.parse_return(ret)
+                timings['returns'].append(time.time() - start)
+
+                start = time.time()
+                blocks = [(hm.render_text(r, True), hm.render_text(r, False)) for r in records]
+                timings['render'].append(time.time() - start)
+
+                start = time.time()
+                order = hm.order_modules(records)
+                timings['sort'].append(time.time() - start)
+
+                start = time.time()
+                position = dict((id(r), i) for i, r in enumerate(records))
+                for i, path in enumerate(('hou_full.py', 'hou_min.py')):
+                    text = hm.QT_IMPORT + '\n'.join(blocks[position[id(r)]][i] for r in order)
+                    open(os.path.join(out, path), 'wb').write(text.encode('utf-8'))
+                timings['write'].append(time.time() - start)
+    finally:
+        shutil.rmtree(out, ignore_errors=True)
+    stages = dict((stage, min(values)) for stage, values in timings.items())
+    return dict(
+        stages=stages,
+        pages=len(records),
+        methods=len(rets),
+        pages_per_sec=len(records) / stages['parse'],
+        methods_per_sec=len(rets) / (stages['parse'] + stages['returns'] + stages['render']),
+        corpus=hashlib.sha1(''.join(hashlib.sha1(data).hexdigest() for _, data in docs)).hexdigest(),
+    )
+
+
+def bench_suite(pages=300, folder=None, repeat=3, baseline=None, save=False, tolerance=0.2):
+    """
+    Time every pipeline stage on a generated or saved corpus and compare with stored baseline.
+    Returns number of regressed stages: slower than baseline by more than tolerance
+    """
+    corpus = None
+    if not folder:
+        corpus = folder = tempfile.mkdtemp(prefix='hou_corpus_')
+        make_corpus(corpus, pages)
+    try:
+        docs = load_pages(folder)
+        index_file = os.path.join(folder, 'index.html')
+        index = open(index_file, 'rb').read() if os.path.exists(index_file) else None
+        result, memory = peak_memory(run_suite, docs, index, repeat)
+    finally:
+        if corpus:
+            shutil.rmtree(corpus, ignore_errors=True)
+    result['peak_memory'] = memory
+    base = None
+    if baseline and os.path.exists(baseline) and not save:
+        base = json.load(open(baseline))
+        if base['corpus'] != result['corpus']:
+            print 'Baseline corpus differs, not compared: %s' % baseline
+            base = None
+    regressions = 0
+    print 'pages: %s  methods: %s  best of %s' % (result['pages'], result['methods'], repeat)
+    for stage in SUITE_STAGES:
+        line = '%-8s %8.3fs' % (stage, result['stages'][stage])
+        if base:
+            old = base['stages'][stage]
+            line += '  baseline %8.3fs  %+6.1f%%' % (old, 100.0 * (result['stages'][stage] - old) / old if old else 0)
+            # ignore noise of very short stages
+            if result['stages'][stage] > old * (1 + tolerance) and result['stages'][stage] - old > 0.005:
+                line += '  REGRESSION'
+                regressions += 1
+        print line
+    print 'pages/sec:   %9.1f' % result['pages_per_sec'] + (
+        '  baseline %9.1f' % base['pages_per_sec'] if base else '')
+    print 'methods/sec: %9.1f' % result['methods_per_sec'] + (
+        '  baseline %9.1f' % base['methods_per_sec'] if base else '')
+    print 'peak memory: +%.1f MB' % memory + ('  baseline +%.1f MB' % base['peak_memory'] if base else '')
+    if save and baseline:
+        json.dump(result, open(baseline, 'w'), indent=2, sort_keys=True)
+        print 'Baseline saved: %s' % baseline
+    elif base:
+        print 'regressions: %s' % regressions
+    return regressions
+
+
+def parse_corpus(docs):
+    """
+    Parse saved pages offline, returns records in output order
+    """
+    hm = hou_parser.HouModules
+    records = []
+    with quiet():
+        for name, content in docs:
+            mod = hm('saved/' + name, content=content)
+            if mod.is_valid:
+                records.append(mod.record())
+        return hm.order_modules(records)
+
+
+# stand-in for PySide2, generated stubs star import QtWidgets
+QT_STUB = """
+class QWidget(object):
+    pass
+"""
+
+
+def _import_time(folder, statement, repeat):
+    """
+    Best time of statement in fresh interpreters with folder on sys.path, first run compiles sources.
+    Returns (cold, warm) seconds or error message
+    """
+    import subprocess
+    script = ('import sys, time; sys.path.insert(0, %r); start = time.time()\n%s\n'
+              'sys.stdout.write(repr(time.time() - start))' % (folder, statement))
+    times = []
+    for _ in range(repeat + 1):
+        process = subprocess.Popen([sys.executable, '-c', script], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        out, err = process.communicate()
+        if process.returncode:
+            return err.strip().splitlines()[-1]
+        times.append(float(out))
+    return times[0], min(times[1:])
+
+
+def bench_package(pages=300, folder=None, repeat=5):
+    """
+    Size, compile and import time of monolithic hou_full.py against lazy hou package
+    """
+    import hou_package
+    corpus = None
+    if not folder:
+        corpus = folder = tempfile.mkdtemp(prefix='hou_corpus_')
+        make_corpus(corpus, pages)
+    out = tempfile.mkdtemp(prefix='hou_out_')
+    try:
+        records = parse_corpus(load_pages(folder))
+        hm = hou_parser.HouModules
+        monolith = hm.QT_IMPORT + '\n'.join(hm.render_text(r, True) for r in records)
+        open(os.path.join(out, 'hou_full.py'), 'wb').write(monolith.encode('utf-8'))
+        package = hou_package.write_package(records, out)
+        os.makedirs(os.path.join(out, 'PySide2'))
+        open(os.path.join(out, 'PySide2', '__init__.py'), 'w').close()
+        open(os.path.join(out, 'PySide2', 'QtWidgets.py'), 'w').write(QT_STUB)
+        sources = dict((f, open(os.path.join(package, f)).read()) for f in os.listdir(package) if f.endswith('.py'))
+        print 'records: %s  package modules: %s' % (len(records), len(sources))
+        print 'size: monolith %.1f KB, package %.1f KB, largest module %.1f KB' % (
+            len(monolith) / 1024.0, sum(len(x) for x in sources.values()) / 1024.0,
+            max(len(x) for x in sources.values()) / 1024.0)
+        start = time.time()
+        compile(monolith, 'hou_full.py', 'exec')
+        monolith_compile = time.time() - start
+        times = {}
+        for name, source in sources.items():
+            start = time.time()
+            compile(source, name, 'exec')
+            times[name] = time.time() - start
+        print 'compile: monolith %.1f ms, __init__ %.2f ms, median module %.2f ms' % (
+            monolith_compile * 1000, times['__init__.py'] * 1000, sorted(times.values())[len(times) // 2] * 1000)
+        classes = [r for r in records if r.type == hm.TYPES.CLASS]
+        deepest = max(classes, key=lambda r: len(r.inherits)).name if classes else records[0].name
+        # monolith uses enums and default values before their classes are defined,
+        # all names are seeded as builtins so it can be imported at all
+        seed = 'import __builtin__\nfor name in %r: setattr(__builtin__, name, object)\n' % (
+            [hou_package.export_name(r) for r in records],)
+        open(os.path.join(out, 'seed_names.py'), 'w').write(seed)
+        for title, statement in (
+                ('import hou_full', 'import hou_full'),
+                ('import hou_full (seeded)', 'import seed_names, hou_full'),
+                ('import hou', 'import hou'),
+                ('hou.%s' % deepest, 'import hou; hou.%s' % deepest),
+                ('all names', 'import hou\nfor name in hou.__all__: getattr(hou, name)')):
+            result = _import_time(out, statement, repeat)
+            if isinstance(result, tuple):
+                print '%-24s cold %7.1f ms  warm %7.1f ms' % (title, result[0] * 1000, result[1] * 1000)
+            else:
+                print '%-24s failed: %s' % (title, result)
+    finally:
+        shutil.rmtree(out, ignore_errors=True)
+        if corpus:
+            shutil.rmtree(corpus, ignore_errors=True)
+
+
+def _mypy_run(folder, python):
+    """
+    Time of one mypy check of client.py in folder, which also holds hou.py or hou.pyi.
+    Returns (seconds, error count) or error message
+    """
+    import subprocess
+    command = [python, '-m', 'mypy', '--no-incremental', '--cache-dir', os.devnull, '--follow-imports', 'silent',
+               '--no-error-summary', 'client.py']
+    start = time.time()
+    process = subprocess.Popen(command, cwd=folder, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    out, err = process.communicate()
+    seconds = time.time() - start
+    # 1 is type errors in output, a crash has no output
+    if process.returncode not in (0, 1) or process.returncode and not out.strip():
+        return ((err or out).decode('utf-8').strip().splitlines() or ['exit code %s' % process.returncode])[-1]
+    return seconds, out.decode('utf-8').count(': error:')
+
+
+def bench_pyi(pages=300, folder=None, repeat=5, python=None):
+    """
+    Size of runtime stubs against .pyi stubs, every stub must parse.
+    Load time is how long mypy takes to check a client module using every documented name against hou.py
+    or hou.pyi, runs interleaved, median above mypy of a client without hou.
+    Not measured if mypy is not installed for the Python 3 interpreter
+    """
+    import subprocess, hou_pyi, hou_package
+    corpus = None
+    if not folder:
+        corpus = folder = tempfile.mkdtemp(prefix='hou_corpus_')
+        make_corpus(corpus, pages)
+    out = tempfile.mkdtemp(prefix='hou_out_')
+    try:
+        records = parse_corpus(load_pages(folder))
+        hm = hou_parser.HouModules
+        full = os.path.join(out, 'hou_full.py')
+        open(full, 'wb').write((hm.QT_IMPORT + '\n'.join(hm.render_text(r, True) for r in records)).encode('utf-8'))
+        start = time.time()
+        stub = hou_pyi.write_stub(records, os.path.join(out, 'hou_full.pyi'))
+        print 'records: %s  stub written in %.1f ms' % (len(records), (time.time() - start) * 1000)
+        errors = hou_pyi.check_stubs([stub], python)
+        print 'stub errors: %s' % len(errors)
+        for path, error in errors:
+            print '  %s %s' % (path, error)
+        typed = sum(1 for r in records for m in list(r.methods) + list(r.static_functions) + [r.function]
+                    if m and m.types)
+        print 'methods with documented argument types: %s' % typed
+        python = python or (sys.executable if sys.version_info[0] >= 3 else 'python3')
+        try:
+            mypy = not subprocess.call([python, '-c', 'import mypy'], stderr=open(os.devnull, 'w'))
+        except OSError:
+            mypy = False
+        client = 'import hou\n' + ''.join('name_%s = hou.%s\n' % (i, hou_package.export_name(r))
+                                          for i, r in enumerate(records))
+        checks = []
+        for path, module in ((None, None), (full, 'hou.py'), (stub, 'hou.pyi')):
+            check = os.path.join(out, module or 'empty')
+            os.mkdir(check)
+            open(os.path.join(check, 'client.py'), 'w').write(client if module else 'import sys\n')
+            if module:
+                shutil.copy(path, os.path.join(check, module))
+            checks.append((path, check))
+        times = dict((path, []) for path, _ in checks)
+        failed = {}
+        client_errors = {}
+        for _ in xrange(repeat if mypy else 0):
+            for path, check in checks:
+                result = _mypy_run(check, python)
+                if isinstance(result, tuple):
+                    times[path].append(result[0])
+                    client_errors[path] = result[1]
+                else:
+                    failed[path] = result
+        if mypy and not failed:
+            baseline = _percentile(times[None], 50)
+            print 'mypy of client without hou: %.0f ms, median of %s runs' % (baseline * 1000, repeat)
+        for path in (full, stub):
+            line = '%-14s %8.1f KB' % (os.path.basename(path), os.path.getsize(path) / 1024.0)
+            if not mypy:
+                line += '  mypy is not installed for %s, load time not measured' % python
+            elif failed:
+                line += '  mypy failed: %s' % failed.get(path, failed.values()[0])
+            else:
+                median = _percentile(times[path], 50)
+                line += '  mypy %6.0f ms, %+5.0f ms over client without hou, %s client errors' % (
+                    median * 1000, (median - baseline) * 1000, client_errors[path])
+            print line
+    finally:
+        shutil.rmtree(out, ignore_errors=True)
+        if corpus:
+            shutil.rmtree(corpus, ignore_errors=True)
+
+
+def bench_db(pages=300, folder=None, repeat=200):
+    """
+    Build time and size of the SQLite api index, lookup latency and stub regeneration from database
+    """
+    import hou_db
+    corpus = None
+    if not folder:
+        corpus = folder = tempfile.mkdtemp(prefix='hou_corpus_')
+        make_corpus(corpus, pages)
+    out = tempfile.mkdtemp(prefix='hou_out_')
+    try:
+        records = parse_corpus(load_pages(folder))
+        hm = hou_parser.HouModules
+        path = os.path.join(out, 'hou.db')
+        start = time.time()
+        hou_db.build(records, path)
+        print 'records: %s  built in %.1f ms  %.1f KB' % (
+            len(records), (time.time() - start) * 1000, os.path.getsize(path) / 1024.0)
+        db = hou_db.ApiDatabase(path)
+        classes = [r.name for r in records if r.type == hm.TYPES.CLASS] or ['Node']
+        words = [w for r in records for w in r.doc.split() if w.isalpha() and len(w) > 4][:50] or ['node']
+        queries = (
+            ('subclasses', lambda i: db.subclasses(classes[i % len(classes)])),
+            ('methods inherited', lambda i: db.methods(classes[i % len(classes)], True)),
+            ('returning', lambda i: db.returning(classes[i % len(classes)])),
+            ('search', lambda i: db.search(words[i % len(words)])),
+        )
+        for name, query in queries:
+            start = time.time()
+            for i in xrange(repeat):
+                query(i)
+            print '%-18s %8.3f ms per lookup' % (name, (time.time() - start) * 1000 / repeat)
+        db.store(mro_records(), 'mro')
+        owner = [o for o, m in db.methods('D', True, 'mro') if m.name == 'm'][0]
+        db.delete('mro')
+        print 'D.m resolved to %s.m' % owner
+        assert owner == 'Y', 'database resolves members unlike python: D.m of %s' % owner
+        # store failing on a broken record keeps the stored version
+        try:
+            db.store(records + [None])
+        except AttributeError:
+            pass
+        kept = len(db.records())
+        print 'records after failed store: %s' % kept
+        assert kept == len(records), 'failed store deleted %s records' % (len(records) - kept)
+        db.close()
+        start = time.time()
+        full = hou_db.write_stubs(path, out)[0]
+        print 'stubs from db: %.1f ms' % ((time.time() - start) * 1000)
+        text = hm.QT_IMPORT + '\n'.join(hm.render_text(r, True) for r in records)
+        identical = open(full).read() == text
+        print 'identical to parsed output: %s' % identical
+        assert identical, 'stubs from database differ from parsed output'
+    finally:
+        shutil.rmtree(out, ignore_errors=True)
+        if corpus:
+            shutil.rmtree(corpus, ignore_errors=True)
+
+
+def bench_export(pages=300, folder=None, repeat=5):
+    """
+    Reload time of interchange exports against parsing saved pages, size and round trip of every format
+    """
+    import hou_export
+    corpus = None
+    if not folder:
+        corpus = folder = tempfile.mkdtemp(prefix='hou_corpus_')
+        make_corpus(corpus, pages)
+    out = tempfile.mkdtemp(prefix='hou_out_')
+    try:
+        docs = load_pages(folder)
+        hm = hou_parser.HouModules
+        start = time.time()
+        records = parse_corpus(docs)
+        parse_time = time.time() - start
+        text = hm.QT_IMPORT + '\n'.join(hm.render_text(r, True) for r in records)
+        print 'records: %s  parse %.1f ms' % (len(records), parse_time * 1000)
+        formats = sorted(hou_export.FORMATS)
+        if hou_export.msgpack is None:
+            formats.remove('.msgpack')
+            print 'msgpack is not installed, skipped'
+        for ext in formats:
+            path = os.path.join(out, 'hou' + ext)
+            start = time.time()
+            hou_export.dump(records, path)
+            dump_time = time.time() - start
+            best = None
+            for i in xrange(repeat):
+                start = time.time()
+                loaded = hou_export.load(path)
+                best = min(best or 1e9, time.time() - start)
+            ordered = hm.order_modules(loaded)
+            print '%-9s %8.1f KB  dump %7.1f ms  load %7.2f ms  %6.0fx faster than parse  equal %s  identical %s' % (
+                ext, os.path.getsize(path) / 1024.0, dump_time * 1000, best * 1000, parse_time / best,
+                loaded == records, hm.QT_IMPORT + '\n'.join(hm.render_text(r, True) for r in ordered) == text)
+    finally:
+        shutil.rmtree(out, ignore_errors=True)
+        if corpus:
+            shutil.rmtree(corpus, ignore_errors=True)
+
+
+NOTE = ('Note: this method is only available when the node is unlocked and its definition is not read only. '
+        'Raises hou.OperationFailed if the node was deleted, hou.PermissionError if the node is inside a locked '
+        'asset. Changes are recorded in the undo history and can be reverted with hou.undos.')
+
+
+def with_repeats(records, repeats=30, notes=20, seed=1):
+    """
+    Copy of records like pages listing inherited methods: about repeats percent of inherited methods are copied
+    into subclasses unchanged, every tenth copy with other doc (an override, which has to stay),
+    and notes percent of method docs get the same long note appended
+    """
+    rnd = random.Random(seed)
+    hm = hou_parser.HouModules
+    by_name = dict((r.name, r) for r in records)
+    result = []
+    for r in records:
+        methods = [hou_parser.Method(m.name, m.args, m.ret, m.doc + ' ' + NOTE if rnd.random() * 100 < notes else m.doc,
+                                     m.types) for m in r.methods]
+        result.append(hou_parser.ModuleRecord(r.url, r.type, r.name, r.doc, r.inherits, tuple(methods),
+                                              r.static_functions, r.function, r.enum, r.sha1))
+    by_name = dict((r.name, r) for r in result)
+    for r in result:
+        if r.type != hm.TYPES.CLASS:
+            continue
+        own = set(m.name for m in r.methods)
+        copies = []
+        for base in r.inherits:
+            base = by_name.get(base.split('.')[-1])
+            for m in base.methods if base else ():
+                if m.name not in own and rnd.random() * 100 < repeats:
+                    own.add(m.name)
+                    copies.append(m if len(copies) % 10 else hou_parser.Method(m.name, m.args, m.ret, 'Overridden.', m.types))
+        r.methods += tuple(copies)
+    return result
+
+
+def mro_records():
+    """
+    Classes where breadth first search of bases and python mro resolve D.m differently:
+    D(B, C), B(X), X(Y), m in Y and C. Python resolves D.m to Y.m
+    """
+    hm = hou_parser.HouModules
+    classes = []
+    for name, bases, methods in (('Y', (), ('m',)), ('X', ('Y',), ()), ('B', ('X',), ()), ('C', (), ('m',)),
+                                 ('D', ('B', 'C'), ())):
+        classes.append(hou_parser.ModuleRecord(
+            'mro/%s' % name, hm.TYPES.CLASS, name, '', bases,
+            tuple(hou_parser.Method(m, ('self',), '', 'Of %s.' % name, ()) for m in methods), (), None, (), None))
+    return classes
+
+
+def resolved_api(records):
+    """
+    {class name: {member name: Method}} as resolved by python for every class with consistent mro
+    """
+    hm = hou_parser.HouModules
+    classes = [r for r in records if r.type in (hm.TYPES.CLASS, hm.TYPES.MODULE)]
+    graph = hm.inheritance_graph(classes)
+    by_name = dict((r.name, r) for r in classes)
+    result = {}
+    for name, mro in hm.class_mro(graph, hm.class_order(graph)[0]).items():
+        members = result[name] = {}
+        for owner in reversed(mro):
+            for m in by_name[owner].methods + by_name[owner].static_functions if owner in by_name else ():
+                members[m.name] = m
+    return result
+
+
+def bench_dedup(pages=300, folder=None, repeats=30, notes=20, repeat=15):
+    """
+    Output size and render time of records with repeated inherited methods and doc strings,
+    without and with dedup_methods. Time of dedup_methods with intern_docs and
+    time of rendering are medians of repeat runs each, net time saved is render time saved less dedup time
+    """
+    corpus = None
+    if not folder:
+        corpus = folder = tempfile.mkdtemp(prefix='hou_corpus_')
+        make_corpus(corpus, pages)
+    try:
+        hm = hou_parser.HouModules
+        records = with_repeats(parse_corpus(load_pages(folder)), repeats, notes)
+        print 'records: %s  methods: %s' % (len(records), sum(len(r.methods) for r in records))
+
+        def dedup():
+            result = hm.dedup_methods(records)
+            hm.intern_docs(result)
+            return result
+
+        def render(result):
+            return hm.QT_IMPORT + '\n'.join(hm.render_blocks(r, (True,))[0] for r in result)
+
+        configs = (('plain', False), ('dedup', True))
+        sizes = []
+        outputs = []
+        for name, with_dedup in configs:
+            # counters of one untimed run, timed runs without stats
+            hm.start_stats()
+            result = dedup() if with_dedup else records
+            sizes.append(len(render(result)))
+            outputs.append(result)
+            counters = hm.stats.counters
+            print '%-12s %8.1f KB  dropped %5s  same api %s' % (
+                name, sizes[-1] / 1024.0, counters['dedup_methods'],
+                resolved_api(result) == resolved_api(records))
+        hm.stats = None
+        # runs of all configs take turns, so slow periods of the machine do not favour one of them
+        dedup_times = [[0.0] * repeat for _ in configs]
+        render_times = [[] for _ in configs]
+        for run in xrange(repeat):
+            for i, (name, with_dedup) in enumerate(configs):
+                if with_dedup:
+                    start = time.time()
+                    dedup()
+                    dedup_times[i][run] = time.time() - start
+                start = time.time()
+                render(outputs[i])
+                render_times[i].append(time.time() - start)
+        results = [(name, size, _percentile(d, 50), _percentile(r, 50)) for (name, _), size, d, r in
+                   zip(configs, sizes, dedup_times, render_times)]
+        print 'median of %s runs:' % repeat
+        plain_size, _, plain_render = results[0][1:]
+        for name, size, dedup_time, render_time in results:
+            line = '%-12s render %7.1f ms  dedup %5.1f ms' % (name, render_time * 1000, dedup_time * 1000)
+            if name != 'plain':
+                line += '  saved %5.1f%% size, %5.1f%% render time, net %+6.1f ms (%+5.1f%%)' % (
+                    100.0 * (plain_size - size) / plain_size, 100.0 * (plain_render - render_time) / plain_render,
+                    (plain_render - render_time - dedup_time) * 1000,
+                    100.0 * (plain_render - render_time - dedup_time) / plain_render)
+            print line
+    finally:
+        if corpus:
+            shutil.rmtree(corpus, ignore_errors=True)
+
+
+def _percentile(values, percent):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100.0))]
+
+
+def bench_complete(pages=300, folder=None, queries=5000, clients=(1, 4, 16)):
+    """
+    Completion index build time, in process lookup latency and http server latency and throughput
+    with concurrent clients on keep-alive connections
+    """
+    import httplib, urllib, subprocess
+    import hou_complete, hou_export
+    corpus = None
+    if not folder:
+        corpus = folder = tempfile.mkdtemp(prefix='hou_corpus_')
+        make_corpus(corpus, pages)
+    out = tempfile.mkdtemp(prefix='hou_out_')
+    try:
+        records = parse_corpus(load_pages(folder))
+        start = time.time()
+        index = hou_complete.CompletionIndex(records)
+        print '%s built in %.1f ms' % (index, (time.time() - start) * 1000)
+        api = resolved_api(records)
+        different = [name for name in api if dict((k, v[1]) for k, v in index._members[name].items()) !=
+                     dict((k, m.doc) for k, m in api[name].items())]
+        owner = hou_complete.CompletionIndex(mro_records())._members['D']['m'][0].owner
+        print 'members resolved as in stubs: %s of %s classes, D.m of %s' % (
+            len(api) - len(different), len(api), owner)
+        assert not different and owner == 'Y', 'completion resolves members unlike python: %s' % (
+            ', '.join(different[:5]) or 'D.m of %s' % owner)
+        rnd = random.Random(1)
+        owners = sorted(index.members)
+        texts = []
+        for i in xrange(queries):
+            if i % 3 == 0:
+                name = rnd.choice(owners)
+                texts.append('hou.' + name[:rnd.randint(1, len(name))])
+            else:
+                owner = rnd.choice(owners)
+                members = index.members[owner].entries or [hou_complete.Completion('', '', '', '')]
+                name = rnd.choice(members).name
+                texts.append('hou.%s.%s' % (owner, name[:rnd.randint(0, len(name))]))
+        times = []
+        for text in texts:
+            start = time.time()
+            index.complete(text, 50)
+            times.append(time.time() - start)
+        print 'in process  mean %.4f ms  p50 %.4f ms  p99 %.4f ms  %.0f lookups/sec' % (
+            sum(times) / len(times) * 1000, _percentile(times, 50) * 1000, _percentile(times, 99) * 1000,
+            len(times) / sum(times))
+        export = hou_export.dump(records, os.path.join(out, 'hou.marshal'))
+        process = subprocess.Popen([sys.executable, hou_complete.__file__.replace('.pyc', '.py'), export, 'stdio'],
+                                   stdin=subprocess.PIPE, stdout=subprocess.PIPE, bufsize=-1)
+        times = []
+        for i, text in enumerate(texts):
+            start = time.time()
+            process.stdin.write(json.dumps({'id': i, 'method': 'complete', 'params': {'q': text}}) + '\n')
+            process.stdin.flush()
+            json.loads(process.stdout.readline())
+            times.append(time.time() - start)
+        process.stdin.close()
+        process.wait()
+        print 'stdio       mean %.3f ms  p50 %.3f ms  p99 %.3f ms  %.0f requests/sec' % (
+            sum(times) / len(times) * 1000, _percentile(times, 50) * 1000, _percentile(times, 99) * 1000,
+            len(times) / sum(times))
+        server = hou_complete.make_server(index, port=0)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        port = server.server_address[1]
+        try:
+            for count in clients:
+                times = []
+                lock = threading.Lock()
+
+                def client(part):
+                    connection = httplib.HTTPConnection('127.0.0.1', port)
+                    result = []
+                    for text in part:
+                        start = time.time()
+                        connection.request('GET', '/complete?' + urllib.urlencode({'q': text, 'limit': 50}))
+                        response = connection.getresponse()
+                        json.loads(response.read())
+                        result.append(time.time() - start)
+                    connection.close()
+                    with lock:
+                        times.extend(result)
+
+                threads = [threading.Thread(target=client, args=(texts[i::count],)) for i in xrange(count)]
+                start = time.time()
+                for t in threads:
+                    t.start()
+                for t in threads:
+                    t.join()
+                total = time.time() - start
+                print 'http %2s clients  mean %.3f ms  p50 %.3f ms  p99 %.3f ms  %.0f requests/sec' % (
+                    count, sum(times) / len(times) * 1000, _percentile(times, 50) * 1000,
+                    _percentile(times, 99) * 1000, len(times) / total)
+        finally:
+            server.shutdown()
+            server.server_close()
+    finally:
+        shutil.rmtree(out, ignore_errors=True)
+        if corpus:
+            shutil.rmtree(corpus, ignore_errors=True)
+
+
+def next_version(records, changed=10, seed=1):
+    """
+    Copy of records with api changes: about changed percent of records are removed, added,
+    get other signatures, new methods and enum values or doc strings
+    """
+    rnd = random.Random(seed)
+    hm = hou_parser.HouModules
+    result = []
+    for r in records:
+        roll = rnd.random() * 100
+        if roll < changed / 4.0:
+            continue
+        if roll < changed / 2.0:
+            r = r.__class__(*r.__reduce__()[1])
+            r.doc = r.doc + ' Changed.'
+        elif roll < changed:
+            methods = list(r.methods)
+            if methods:
+                m = methods[0]
+                methods[0] = hou_parser.Method(m.name, m.args + ('changed=None',), m.ret, m.doc,
+                                               m.types and m.types + (None,))
+            if r.type == hm.TYPES.CLASS:
+                methods.append(hou_parser.Method('addedMethod', (), ' hou.Node', 'Added.', ()))
+            enum = r.enum + ((hou_parser.EnumValue('addedValue', 'Added.'),) if r.type == hm.TYPES.ENUM else ())
+            r = hou_parser.ModuleRecord(r.url, r.type, r.name, r.doc, r.inherits, tuple(methods),
+                                        r.static_functions, r.function, enum, r.sha1)
+        result.append(r)
+    for i in xrange(int(len(records) * changed / 400.0)):
+        result.append(hou_parser.ModuleRecord('added%s.html' % i, hm.TYPES.CLASS, 'AddedClass%s' % i,
+                                              'Added.', (), (), (), None, (), None))
+    with quiet():
+        return hm.order_modules(result)
+
+
+def bench_diff(pages=300, folder=None, changed=10):
+    """
+    Digest based diff of two versions in api database against text diff of rendered output
+    """
+    import difflib, hou_db, hou_diff
+    corpus = None
+    if not folder:
+        corpus = folder = tempfile.mkdtemp(prefix='hou_corpus_')
+        make_corpus(corpus, pages)
+    out = tempfile.mkdtemp(prefix='hou_out_')
+    try:
+        old = parse_corpus(load_pages(folder))
+        new = next_version(old, changed)
+        path = os.path.join(out, 'hou.db')
+        hou_db.build(old, path, '1.0')
+        hou_db.build(new, path, '2.0')
+        hm = hou_parser.HouModules
+        start = time.time()
+        lines = [(hm.QT_IMPORT + '\n'.join(hm.render_text(r, True) for r in x)).splitlines() for x in (old, new)]
+        text_lines = len(list(difflib.unified_diff(lines[0], lines[1], lineterm='')))
+        text_time = time.time() - start
+        db = hou_db.ApiDatabase(path)
+        start = time.time()
+        result = hou_diff.diff_versions(db, '1.0', '2.0')
+        report = result.report()
+        diff_time = time.time() - start
+        db.close()
+        print 'records: %s -> %s' % (len(old), len(new))
+        print 'render and text diff: %8.1f ms  %s diff lines' % (text_time * 1000, text_lines)
+        print 'digest diff, report:  %8.1f ms  %s report lines' % (diff_time * 1000, len(report.splitlines()))
+        print '%s, %s doc or order changes only, %s unchanged' % (result, len(result.docs_only), result.unchanged)
+        memory = hou_diff.diff_records(old, new, '1.0', '2.0')
+        print 'same as diff of records: %s' % (memory.to_dict() == result.to_dict())
+    finally:
+        shutil.rmtree(out, ignore_errors=True)
+        if corpus:
+            shutil.rmtree(corpus, ignore_errors=True)
+
+
+def legacy_legal_text(text):
+    """
+    Previous HouModules.legal_text, kept for comparison
+    """
+    text = re.sub(r'[^\x00-\x7F]', ' ', text)
+    text = re.sub(r"(\n)+", r"\n", text).strip()
+    return text
+
+
+def legacy_render_text(record, docs=True):
+    """
+    Previous HouModules.render_text, one call per target, kept for comparison
+    """
+    hm = hou_parser.HouModules
+    text = ''
+    #################### CLASS
+    if record.type == hm.TYPES.CLASS or record.type == hm.TYPES.MODULE:
+        if docs:
+            d = '%s\n%s' % (
+                legacy_legal_text(record.doc),
+                record.url
+            )
+        else:
+            d = ''
+        text += """
+class {name}({inherit}):
+{doc}
+""".format(
+            name=record.name,
+            inherit=', '.join([x.split('.')[-1] for x in record.inherits]),
+            # doc=d
+            doc=hm.to_doc_string(d, 4)
+        )
+        if record.methods or record.static_functions:
+            for m in record.methods:
+                if docs:
+                    d = '%s\nreturn %s' % (
+                        legacy_legal_text(m.doc).strip(),
+                        m.ret.replace('=', '').strip()
+                    )
+                else:
+                    d = ''
+                if m.name == '__init__':
+                    ret = 'pass'
+                else:
+                    ret = 'return '+hm.parse_return(m.ret)
+                text += """
+    def {name}{args}:
+{doc}
+        {parse_ret}
+    """.format(
+                    name=m.name,
+                    args=hm.args_to_str(m.args, 'self'),
+                    doc=hm.to_doc_string(d, 8),
+                    parse_ret=ret
+                )
+            for f in record.static_functions:
+                if docs:
+                    d = '%s\nreturn %s' % (
+                        legacy_legal_text(f.doc.replace('"""', "'''")).strip(),
+                        f.ret.replace('=', '').strip()
+                    )
+                else:
+                    d = ''
+                text += """
+    @classmethod
+    def {name}{args}:
+{doc}
+        return {parse_ret}
+    """.format(
+                    name=f.name,
+                    args=hm.args_to_str(f.args, 'cls'),
+                    doc=hm.to_doc_string(d, 8),
+                    parse_ret=hm.parse_return(f.ret)
+                )
+        else:
+            text += '    pass'
+    ########################### FUNCTION
+    elif record.type == hm.TYPES.FUNC:
+        doc = '\n'.join(record.doc) if isinstance(record.doc, list) else record.doc
+
+        if docs:
+            d = '%s\n' \
+                '%s\n' \
+                '%s\n' \
+                'return %s' % (
+                    record.url,
+                    legacy_legal_text(doc),
+                    legacy_legal_text(record.function.doc.replace('"""', "'''")).strip(),
+                    record.function.ret.replace('=', '').strip()
+                )
+        else:
+            d = ''
+
+        text += """
+def {name}{args}:
+{doc}    
+    return {parse_ret}
+""".format(
+            name=record.function.name,
+            args=hm.args_to_str(record.function.args),
+            doc=hm.to_doc_string(d),
+            parse_ret=hm.parse_return(record.function.ret)
+        )
+    ########################## ENUM
+    elif record.type == hm.TYPES.ENUM:
+        d = ''
+        if docs:
+            d = '%s\n' \
+                '%s' % (
+                    record.doc,
+                    record.url
+                )
+        text += """
+class {name}:
+{doc}
+{enum}
+""".format(
+            name=record.name,
+            doc=hm.to_doc_string(d),
+            enum='\n'.join(['    {name} = EnumValue'.format(name=x.name) +
+                            ('\n    # {doc}'.format(doc=legacy_legal_text(x.description.replace('\n', '\n    # ').replace('"""', "'''")).strip())
+                             if (x.description.strip() and docs)else '') for x in record.enum])
+        )
+    return text
+
+
+def bench_render(pages=300, folder=None, methods=(100, 400, 2000), repeat=3):
+    """
+    Rendering of full and min output: two render_text passes of the previous renderer against
+    one render_blocks pass, on the corpus and on single classes with many methods
+    """
+    hm = hou_parser.HouModules
+    corpus = None
+    if not folder:
+        corpus = folder = tempfile.mkdtemp(prefix='hou_corpus_')
+        make_corpus(corpus, pages)
+    try:
+        records = parse_corpus(load_pages(folder))
+    finally:
+        if corpus:
+            shutil.rmtree(corpus, ignore_errors=True)
+    rnd = random.Random(1)
+    samples = [('corpus %s records' % len(records), records)]
+    with quiet():
+        for count in methods:
+            content = class_page(rnd, 'Node', [], count).encode('utf-8')
+            samples.append(('class %s methods' % count, [hm('saved/Node', content=content).record()]))
+
+    def best(func):
+        times = []
+        for _ in range(repeat):
+            start = time.time()
+            result = func()
+            times.append(time.time() - start)
+        return min(times), result
+
+    different = []
+    for title, sample in samples:
+        legacy_time, legacy = best(lambda: [(legacy_render_text(r, True), legacy_render_text(r, False)) for r in sample])
+        new_time, new = best(lambda: [tuple(hm.render_blocks(r)) for r in sample])
+        print '%-22s legacy %8.1f ms  single pass %8.1f ms  x%.1f  identical: %s' % (
+            title, legacy_time * 1000, new_time * 1000, legacy_time / max(new_time, 1e-9), legacy == new)
+        if legacy != new:
+            different.append(title)
+    out = tempfile.mkdtemp(prefix='hou_out_')
+    try:
+        start = time.time()
+        with open(os.path.join(out, 'full.py'), 'wb') as full, open(os.path.join(out, 'min.py'), 'wb') as short:
+            hm.render_records(records, [(full, True), (short, False)])
+        print 'render_records to two files: %.1f ms' % ((time.time() - start) * 1000)
+        text = hm.QT_IMPORT + '\n'.join(legacy_render_text(r, True) for r in records)
+        identical = open(os.path.join(out, 'full.py'), 'rb').read() == text.encode('utf-8')
+        print 'identical file: %s' % identical
+    finally:
+        shutil.rmtree(out, ignore_errors=True)
+    assert not different, 'single pass render differs for %s' % ', '.join(different)
+    assert identical, 'render_records file differs from legacy render'
+
+
+class _FakeClass(object):
+    def __init__(self, name, inherits):
+        self.name = name
+        self.inherits = inherits
+
+
+def legacy_sort_classes(classes):
+    """
+    Previous HouModules.sort_classes, kept for comparison
+    """
+    next = True
+    i = 0
+    while next and i < 1000:
+        i += 1
+        for curr_cls in classes:
+            for cls in classes:
+                if cls.name == curr_cls.name:
+                    continue
+                if curr_cls.name in cls.inherits:
+                    if classes.index(curr_cls) > classes.index(cls):
+                        cur = classes.pop(classes.index(curr_cls))
+                        classes.insert(classes.index(cls) - 1, cur)
+                        break
+                next = False
+        else:
+            next = False
+    return classes
+
+
+def make_hierarchy(count, seed=1):
+    """
+    Random acyclic class hierarchy in random order
+    """
+    rnd = random.Random(seed)
+    names = ['Class%05d' % i for i in range(count)]
+    classes = [_FakeClass(name, rnd.sample(names[:i], min(i, rnd.randint(0, 2)))) for i, name in enumerate(names)]
+    rnd.shuffle(classes)
+    return classes
+
+
+def order_violations(classes):
+    """
+    Number of base classes placed after their subclass
+    """
+    position = dict((c.name, i) for i, c in enumerate(classes))
+    return sum(1 for c in classes for base in c.inherits if position.get(base, -1) > position[c.name])
+
+
+def bench_sort(sizes=(250, 500, 1000, 2000, 5000), legacy_limit=5000):
+    """
+    Legacy sort_classes against topological sort on synthetic hierarchies
+    """
+    print '%7s %12s %10s %12s %10s' % ('classes', 'legacy', 'violations', 'topological', 'violations')
+    for size in sizes:
+        if size <= legacy_limit:
+            classes = make_hierarchy(size)
+            start = time.time()
+            result = legacy_sort_classes(classes)
+            legacy = '%11.3fs %10s' % (time.time() - start, order_violations(result))
+        else:
+            legacy = '%12s %10s' % ('skipped', '')
+        classes = make_hierarchy(size)
+        with quiet():
+            start = time.time()
+            result = hou_parser.HouModules.sort_classes(classes)
+            elapsed = time.time() - start
+        print '%7s %s %11.3fs %10s' % (size, legacy, elapsed, order_violations(result))
+
+
+def load_pages(folder):
+    """
+    Read saved pages from folder recursively, compressed cache objects are supported.
+    Returns list of (name, content)
+    """
+    pages = []
+    for root, _, files in os.walk(folder):
+        for name in sorted(files):
+            if name.endswith('.json') or name.startswith('.') or name == 'index.html':
+                continue
+            content = open(os.path.join(root, name), 'rb').read()
+            if name.endswith('.gz'):
+                content = zlib.decompress(content)
+            pages.append((name, content))
+    return pages
+
+
+def bench_parsers(pages=300, folder=None, repeat=3):
+    """
+    Parse saved pages with every tree builder, with full tree and strained tree.
+    Parsed data and rendered text must be identical to html.parser full tree
+    """
+    corpus = None
+    if not folder:
+        corpus = folder = tempfile.mkdtemp(prefix='hou_corpus_')
+        make_corpus(corpus, pages)
+    try:
+        docs = load_pages(folder)
+        hm = hou_parser.HouModules
+        options = hm.html_parser, hm.strain_tree
+        reference = None
+        different = []
+        try:
+            for parser in reversed(hm.PARSERS):
+                for strain in (False, True):
+                    hm.html_parser, hm.strain_tree = parser, strain
+                    if hm.get_html_parser() != parser:
+                        print '%-12s not installed' % parser
+                        break
+                    best = None
+                    for _ in range(repeat):
+                        with quiet():
+                            start = time.time()
+                            mods = [hm('saved/' + name, content=content) for name, content in docs]
+                            elapsed = time.time() - start
+                        best = min(best or elapsed, elapsed)
+                    result = [(m.to_dict(), m.as_text(True), m.as_text(False)) if m.is_valid else None for m in mods]
+                    if reference is None:
+                        reference = result
+                    diff = [docs[i][0] for i, r in enumerate(result) if r != reference[i]]
+                    print '%-12s %-8s %7.3fs %7.1f pages/sec  different pages: %s %s' % (
+                        parser, 'strained' if strain else 'full', best, len(docs) / best, len(diff),
+                        ', '.join(diff[:5]))
+                    if diff:
+                        different.append('%s %s' % (parser, 'strained' if strain else 'full'))
+        finally:
+            hm.html_parser, hm.strain_tree = options
+        assert not different, 'parsed pages differ with %s' % ', '.join(different)
+    finally:
+        if corpus:
+            shutil.rmtree(corpus, ignore_errors=True)
+
+
+def bench_page(methods=400, bases=3, repeat=10):
+    """
+    Parse time of one large class page, like hou.Node
+    """
+    rnd = random.Random(1)
+    content = class_page(rnd, 'Node', ['Base%s' % i for i in range(bases)], methods).encode('utf-8')
+    hm = hou_parser.HouModules
+    soups = []
+    with quiet():
+        start = time.time()
+        for _ in range(repeat):
+            soups.append(hm.make_soup(content))
+        soup_time = (time.time() - start) / repeat
+        start = time.time()
+        for _ in range(repeat):
+            mod = hm('saved/Node', content=content)
+        total = (time.time() - start) / repeat
+    print 'page: %s methods, %.1f KB' % (len(mod.methods), len(content) / 1024.0)
+    print 'tree build: %7.1f ms' % (soup_time * 1000)
+    print 'extraction: %7.1f ms' % ((total - soup_time) * 1000)
+    print 'total:      %7.1f ms' % (total * 1000)
+
+
+def legacy_parse_return(line):
+    """
+    Previous HouModules.parse_return, kept for comparison
+    """
+    line = line.replace('=', '').strip().replace('`', '')
+    # int , float , str or tuple
+    if re.match(r"(.+,)+\s*\w+\s*or\s*\w+", line):
+        return 'object'
+    # single class
+    m = re.match(r"^hou.(\w+)$", line)
+    if m:
+        return m.group(1)
+    # class or none
+    m = re.match(r"([\w.]+)\s+or\s+(None|none)", line)
+    if m:
+        return legacy_type_to_data(m.group(1))
+    # tuple of enums
+    m = re.match(r"tuple\s*of\s*([\w._]+)\s+enum\s+values", line)
+    if m:
+        return '(EnumValue, )'
+    # tuple of []
+    m = re.match(r"tuple\s*of\s*\[Hom:([\w._]+)\]", line)
+    if m:
+        return '(%s, )' % legacy_type_to_data(m.group(1))
+    # tuple of
+    m = re.match(r"tuple\s*of\s*([\w._]+)", line)
+    if m:
+        return '(%s, )' % legacy_type_to_data(m.group(1))
+    # tuple ot tuples
+    m = re.match(r"\(\s*tuple\s+of\s+([\w._]+)\s*,\s+tuple\s+of\s+tuples\s+of\s+([\w._]+).*", line)
+    if m:
+        return '(%s, ((%s,),))' % (legacy_type_to_data(m.group(1)), legacy_type_to_data(m.group(2)))
+    # tuple ot tuples 2
+    m = re.search(r"tuple\s+of\s+\(([\w\s.,_]+)+\)", line)
+    if m:
+        vals = [legacy_type_to_data(x.strip()) for x in m.group(1).split(',')]
+        return '((%s,),)' % ', '.join(vals)
+    # hou.primType enum value
+    m = re.match(r"([\[\]:\w.]+)\s+enum\s+value", line)
+    if m:
+        return 'EnumValue'  # type_to_data(m.group(1))
+    m = re.match(r"dict\s+of\s+([\w.]+)\s+to\s+([\w.]+)", line)
+    if m:
+        return '{%s: %s}' % (legacy_type_to_data(m.group(1)), legacy_type_to_data(m.group(2)))
+    m = re.match(r"dict\s+of\s+[\s\w\[\].:]+\s+enum\s+value\s+to\s+([\w.]+)", line)
+    if m:
+        return '{EnumValue: %s}' % legacy_type_to_data(m.group(1))
+    m = re.search(r"(dict|dictionary)\s+mapping\s+\w+\s+to\s+\w+", line)
+    if m:
+        return '{"": ""}'
+    m = re.match(r"\(([\s\w,._]+)\)", line)
+    if m and ',' in line:
+        args = [legacy_type_to_data(x.strip()) for x in m.group(1).split(',')]
+        return '(%s,)' % ', '.join(args)
+    m = re.match(r"dictionary\s+of\s+\((([\w\/.]+)\s?\,\s?tuple\s+of\s+([\w.]+))\)\s+pairs", line)
+    if m:
+        k, v = m.group(2).split('/')[-1], m.group(3)
+        return '{%s: (%s, )}' % (legacy_type_to_data(k), legacy_type_to_data(v))
+    m = re.match(r".*(Q[\w]+)\s+subclass", line)
+    if m:
+        # need to import QWidget to script
+        return m.group(1)
+    m = re.match(r"\(([\w.+]+)\s*,\s*tuple\s+of\s+([\w._]+)\)", line)
+    if m:
+        k, v = m.groups()
+        return '(%s, (%s,))' % (legacy_type_to_data(k), legacy_type_to_data(v))
+    m = re.match(r"\(([\w.+]+)\s*,\s*tuple\s+of\s+([\w._]+)\s+and\s+([\w._]+)\s+tuples\)", line)
+    if m:
+        v1, v2, v3 = m.groups()
+        return '(%s, (%s (%s,),))' % (legacy_type_to_data(v1), legacy_type_to_data(v2), legacy_type_to_data(v3))
+    variants = [x.strip().strip(',') for x in re.findall(r"([\w.]+\s*,?\s*)", line)]
+    if 'or' in variants:
+        return 'object'
+    return legacy_type_to_data(line)
+
+
+
+def legacy_type_to_data(line):
+    """
+    Previous HouModules.type_to_data, kept for comparison
+    """
+    line = line.replace('=', '').replace('::', '.').replace(':', '.').strip()
+    if not line:
+        return 'None'
+    if line in ['double', 'float', 'floats']:
+        return '0.0'
+    elif line in ['int', 'start', 'end', 'integer']:
+        return '0'
+    elif line in ['bool', 'Boolean', 'true', 'True', 'false', 'False']:
+        return 'True'
+    elif line in ['string', 'str', 'strings']:
+        return '""'
+    elif line in ['dict', '{}', 'dictionary', 'dictionaries']:
+        return '{}'
+    elif line == 'parm':
+        return 'Parm'
+    elif line == '()':
+        return 'tuple()'
+    elif line == 'Nodes':
+        return 'Node'
+    elif line == 'Vector3s':
+        return 'Vector3'
+
+    elif line.startswith('hou.') or 'hou.' in line:
+        return line.split('hou.')[-1]
+    elif line.startswith('Hom.') or 'Hom.' in line:
+        return line.split('hou.')[-1]
+    elif line.strip() in ['value', 'values']:
+        return 'object'
+
+    elif line[0].istitle():
+        return line
+    else:
+        return 'object'
+
+
+def bench_returns(calls=50000, folder=None):
+    """
+    Rendered return values of the rule engine must be the same as legacy parse_return.
+    Timing on a workload where return strings repeat like in real documentation
+    """
+    lines = list(RETURN_CORPUS)
+    if folder:
+        with quiet():
+            for name, content in load_pages(folder):
+                mod = hou_parser.HouModules('saved/' + name, content=content)
+                if mod.is_valid:
+                    lines.extend(m.ret for m in mod.methods + mod.static_functions)
+                    if mod.function:
+                        lines.append(mod.function.ret)
+    unique = sorted(set(lines))
+    hm = hou_parser.HouModules
+    diff = [(line, legacy_parse_return(line), hm.parse_return(line)) for line in unique
+            if legacy_parse_return(line) != hm.parse_return(line)]
+    print 'return strings: %s unique, different results: %s' % (len(unique), len(diff))
+    for line, old, new in diff:
+        print '  %r: %r != %r' % (line, old, new)
+    rnd = random.Random(1)
+    workload = [rnd.choice(lines) for _ in range(calls)]
+    start = time.time()
+    for line in workload:
+        legacy_parse_return(line)
+    legacy_time = time.time() - start
+    hm.reset_return_stats()
+    start = time.time()
+    for line in workload:
+        hm.parse_return(line)
+    engine_time = time.time() - start
+    print 'legacy: %6.3fs  %9.0f returns/sec' % (legacy_time, calls / legacy_time)
+    print 'engine: %6.3fs  %9.0f returns/sec' % (engine_time, calls / engine_time)
+    hm.print_return_stats()
+
+
+# method titles of cases beyond ARG_SAMPLES, the last ones break legacy signature parsing
+SIGNATURE_CORPUS = [
+    u'createNode(self, node_type_name, node_name=None, run_init_scripts=True) \u2192 hou.Node',
+    u'setColor(self, color=hou.Color((0.0, 0.0, 0.0)))', u'position(self) -> hou.Vector2',
+    u'glob(self, pattern=(\'*\',)) \u2192 tuple of hou.Node', u'parmTuple(self, name, index=0) \u2192 hou.ParmTuple',
+    u'setPosition(self, pos=(0, 0))', u'addSpareParmTuple(self, [Hom:hou.ParmTemplate] parm_template, in_folder=())',
+    u'children(self) \u2192 tuple of [Hom:hou.Node]', u'hou.node(path) \u2192 hou.Node or None', u'hscript(command)',
+    u'evalAtFrame(self, frame) \u2192 int, float, str or tuple', u'  lock(self, on)  ', u'clear(self) -> ',
+    u'move(self, Hom:hou.Vector2 amount)', u'layout(self, items=(), horizontal_spacing=-1.0)',
+    u'setSelected(self, on, clear_all_selected=False, show_asset_if_selected=False)',
+    # two tuple defaults with commas, only the first one is rewritten by legacy code
+    u'transform(self, translate=hou.Vector3((0,0,0)), rotate=hou.Vector3((0,0,0)), scale=hou.Vector3((1,1,1)))',
+    u'setBounds(self, min=(0, 0), max=(1, 1))',
+    u'frame(self, bounds=hou.BoundingBox(-1, -1, -1, 1, 1, 1), center=(-1.0, -1.0))',
+    u'findFiles(self, pattern=("*.hip", "*.hipnc"))', u'split(self, separator=",") \u2192 tuple of str',
+    u'setColors(self, colors={"a": (1, 0, 0), "b": (0, 1, 0)})',
+    u'find(self, flags=hou.nodeFlag.Display | hou.nodeFlag.Render, depth=-1)',
+]
+
+
+def legacy_parse_method_title(title):
+    """
+    Previous HouModules.parse_method_title, kept for comparison
+    """
+    title = re.sub(r'[^\x00-\x7F]', '==', title)
+    title = re.sub(r'->', '==', title)
+    title = hou_parser.HouModules.legal_text(title).replace('\n', ' ').strip()
+    name, args, ret = None, None, None
+    if '==' in title:
+        deff, ret = title.split('==')
+    else:
+        deff, ret = title, ''
+    m = re.search(r"(\w+)(\(.*\))", deff)
+    if m:
+        name, args = [x.strip().strip(':') for x in m.groups()]
+    return name, args, ret
+
+
+def legacy_parse_args(args):
+    """
+    Previous HouModules.parse_args, kept for comparison
+    """
+    nargs = []
+    args = args.strip()
+    if args[0] == '(':
+        args = args[1:]
+    if args[-1] == ')':
+        args = args[:-1]
+    if not args.strip():
+        return nargs
+    s = re.search(r"=\s*(hou.([\w+]+)\(\(.*?\)\))", args)
+    if s:
+        args = args.replace(s.group(1), s.group(2))
+    r = re.search(r"(\w+)\s?=\s?\([\s\w.,]+\)", args)
+    if r:
+        args = args.replace(r.group(0), r.group(1))
+    m = re.search(r"(\w+)=\([\'\"*,]+\)", args)
+    if m:
+        args = args.replace(m.group(0), m.group(1)+'=None')
+    for a in args.split(','):
+        a = a.strip().replace('Hom:hou.', '').replace('hou.', '').replace('Hom.', '').replace('Hom:', '')
+        if '=' in a:
+            name, val = a.split('=')
+            name = name.strip()
+            val = val.strip()
+            if ' ' in name:
+                name = name.split(' ')[-1]
+            nargs.append('%s=%s' % (name.strip(), hou_parser.HouModules.type_to_data(val)))
+            continue
+        if '[' in a or ']' in a:
+            a = a.replace('[', '').replace(']', '').replace('::', ".").replace(':', ".").split('hou.')[-1]
+            nargs.append(a)
+            continue
+        if ' ' in a:
+            a = a.split()[-1]
+        nargs.append(a)
+    return nargs
+
+
+def legacy_signature(title):
+    name, args, ret = legacy_parse_method_title(title)
+    return name, name and legacy_parse_args(args), ret
+
+
+def _valid_args(args):
+    """
+    True if every argument and the argument list are valid python
+    """
+    try:
+        for text in list(args) + [', '.join(args)]:
+            compile('def f(%s): pass' % text, '<signature>', 'exec')
+        return True
+    except SyntaxError:
+        return False
+
+
+def signature_titles(folder=None, pages=300):
+    """
+    Method titles of saved pages in folder or of generated corpus
+    """
+    from bs4 import BeautifulSoup
+    titles = list(SIGNATURE_CORPUS)
+    if folder is None:
+        rnd = random.Random(1)
+        titles.extend(_signature(rnd, 'method%s' % i, rnd.random() < 0.9) for i in range(pages * 20))
+        return titles
+    for name, content in load_pages(folder):
+        soup = BeautifulSoup(content, 'html.parser')
+        titles.extend(p.text.strip() for p in soup.find_all('p', class_='label') if '(' in p.text)
+    return titles
+
+
+def bench_signatures(pages=300, folder=None, repeat=3):
+    """
+    Signatures of the tokenizer must be the same as of legacy parse_method_title and parse_args,
+    except of titles where legacy code fails or writes arguments which are not valid python.
+    Timing of whole titles in signatures/sec
+    """
+    hm = hou_parser.HouModules
+    titles = signature_titles(folder, pages)
+    unique = sorted(set(titles))
+    counts = collections.Counter()
+    changed = []
+    for title in unique:
+        new = hm.parse_signature(title)[:3]
+        try:
+            old = legacy_signature(title)
+        except (ValueError, IndexError, TypeError, AttributeError):
+            counts['legacy error'] += 1
+            changed.append(('legacy error', title, None, new))
+            continue
+        if old == new:
+            counts['same'] += 1
+            continue
+        kind = 'changed'
+        if old[0] and not _valid_args(old[1]):
+            kind = 'legacy invalid'
+        counts[kind] += 1
+        changed.append((kind, title, old, new))
+    print 'titles: %s unique, %s' % (len(unique), ', '.join('%s %s' % x for x in sorted(counts.items())))
+    for kind, title, old, new in changed:
+        print '  %s: %r' % (kind, title)
+        print '    legacy: %r' % (old,)
+        print '    new:    %r' % (new,)
+    invalid = [t for t in unique if hm.parse_signature(t)[0] and not _valid_args(hm.parse_signature(t)[1])]
+    print 'invalid argument lists of tokenizer: %s' % len(invalid)
+    assert not counts['changed'], '%s signatures differ from valid legacy results' % counts['changed']
+    assert not invalid, '%s signatures with invalid argument lists' % len(invalid)
+
+    def best(func):
+        times = []
+        for _ in range(repeat):
+            start = time.time()
+            func()
+            times.append(time.time() - start)
+        return min(times)
+
+    def legacy():
+        for title in titles:
+            try:
+                legacy_signature(title)
+            except (ValueError, IndexError, TypeError, AttributeError):
+                pass
+
+    legacy_time = best(legacy)
+    new_time = best(lambda: [hm.parse_signature(t) for t in titles])
+    print 'legacy:    %6.3fs  %9.0f signatures/sec' % (legacy_time, len(titles) / legacy_time)
+    print 'tokenizer: %6.3fs  %9.0f signatures/sec' % (new_time, len(titles) / new_time)
+    return counts
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='hou_parser benchmarks')
+    sub = parser.add_subparsers(dest='command')
+    crawl = sub.add_parser('crawl', help='Compare sequential and concurrent crawl')
+    crawl.add_argument('--pages', type=int, default=300)
+    crawl.add_argument('--workers', type=int, default=8)
+    crawl.add_argument('--delay', type=float, default=0.02, help='Simulated latency per request, seconds')
+    fetch = sub.add_parser('fetch', help='Connection reuse, retries and conditional refresh')
+    fetch.add_argument('--pages', type=int, default=300)
+    fetch.add_argument('--workers', type=int, default=4)
+    fetch.add_argument('--changed', type=int, default=10, help='Pages changed on server before refresh')
+    fetch.add_argument('--fail-first', type=int, default=1, help='503 answers per page before success')
+    cache = sub.add_parser('cache', help='Versioned cache: cold, warm, compressed and eviction')
+    cache.add_argument('--pages', type=int, default=300)
+    index = sub.add_parser('index', help='Cached page list of documentation root: warm, stale and offline starts')
+    index.add_argument('--pages', type=int, default=300)
+    resume = sub.add_parser('resume', help='Interrupted crawl with failing pages, resumed from journal')
+    resume.add_argument('--pages', type=int, default=300)
+    resume.add_argument('--broken', type=int, default=5, help='Pages which fail to parse')
+    resume.add_argument('--workers', type=int, default=1)
+    incremental = sub.add_parser('incremental', help='Full against incremental regeneration')
+    incremental.add_argument('--pages', type=int, default=300)
+    incremental.add_argument('--changed', type=int, default=5, help='Pages changed on server')
+    stream = sub.add_parser('stream', help='Peak memory of parse_help against stream_help')
+    stream.add_argument('--pages', type=int, default=300)
+    stream.add_argument('--workers', type=int, default=1)
+    source = sub.add_parser('source', help='Http against local folder and zip archive sources')
+    source.add_argument('--pages', type=int, default=300)
+    source.add_argument('--workers', type=int, default=1)
+    shard = sub.add_parser('shard', help='Single process against local shard processes with merge')
+    shard.add_argument('--pages', type=int, default=300)
+    shard.add_argument('--shards', default='1,2,4', help='Comma separated numbers of shards')
+    shard.add_argument('--delay', type=float, default=0.02, help='Server latency per request, seconds')
+    suite = sub.add_parser('suite', help='Offline timing of every stage, compared with stored baseline')
+    suite.add_argument('--pages', type=int, default=300)
+    suite.add_argument('--corpus', help='Folder with saved pages and optional index.html')
+    suite.add_argument('--repeat', type=int, default=3, help='Best of repeated runs')
+    suite.add_argument('--baseline', default='hou_bench_baseline.json', help='Baseline json file')
+    suite.add_argument('--save', action='store_true', help='Store results as new baseline')
+    suite.add_argument('--tolerance', type=float, default=0.2, help='Allowed slowdown against baseline')
+    package = sub.add_parser('package', help='Monolithic output against lazy hou package: size, compile and import')
+    package.add_argument('--pages', type=int, default=300)
+    package.add_argument('--corpus', help='Folder with saved pages')
+    package.add_argument('--repeat', type=int, default=5)
+    pyi = sub.add_parser('pyi', help='Runtime stubs against .pyi stubs: size, stub check and mypy time')
+    pyi.add_argument('--pages', type=int, default=300)
+    pyi.add_argument('--corpus', help='Folder with saved pages')
+    pyi.add_argument('--repeat', type=int, default=5)
+    pyi.add_argument('--python', help='Python 3 interpreter for stub check and mypy, default python3')
+    db = sub.add_parser('db', help='SQLite api index: build, lookup latency and stubs from database')
+    db.add_argument('--pages', type=int, default=300)
+    db.add_argument('--corpus', help='Folder with saved pages')
+    db.add_argument('--repeat', type=int, default=200)
+    diff = sub.add_parser('diff', help='Digest diff of two api versions against text diff of output')
+    diff.add_argument('--pages', type=int, default=300)
+    diff.add_argument('--corpus', help='Folder with saved pages')
+    diff.add_argument('--changed', type=float, default=10, help='Percent of changed records')
+    export = sub.add_parser('export', help='Reload of jsonl, marshal and msgpack exports against parsing')
+    export.add_argument('--pages', type=int, default=300)
+    export.add_argument('--corpus', help='Folder with saved pages')
+    export.add_argument('--repeat', type=int, default=5)
+    complete = sub.add_parser('complete', help='Completion index: lookup latency in process and over http')
+    complete.add_argument('--pages', type=int, default=300)
+    complete.add_argument('--corpus', help='Folder with saved pages')
+    complete.add_argument('--queries', type=int, default=5000)
+    complete.add_argument('--clients', default='1,4,16', help='Comma separated numbers of concurrent http clients')
+    dedup = sub.add_parser('dedup', help='Output size and render time with inherited methods and docs deduplicated')
+    dedup.add_argument('--pages', type=int, default=300)
+    dedup.add_argument('--corpus', help='Folder with saved pages')
+    dedup.add_argument('--repeats', type=float, default=30, help='Percent of inherited methods repeated in subclasses')
+    dedup.add_argument('--notes', type=float, default=20, help='Percent of method docs with the same long note')
+    dedup.add_argument('--repeat', type=int, default=15)
+    memory = sub.add_parser('memory', help='Peak memory of kept parse trees against compact records')
+    memory.add_argument('--pages', type=int, default=300)
+    memory.add_argument('--corpus', help='Folder with saved pages, e.g. ~/hou_help_cache/objects')
+    sort = sub.add_parser('sort', help='Legacy against topological sort_classes')
+    sort.add_argument('--sizes', default='250,500,1000,2000,5000', help='Comma separated class counts')
+    sort.add_argument('--legacy-limit', type=int, default=5000, help='Skip legacy sort above this size')
+    parsers = sub.add_parser('parsers', help='Compare html tree builders and strained parsing')
+    parsers.add_argument('--pages', type=int, default=300)
+    parsers.add_argument('--corpus', help='Folder with saved pages, e.g. ~/hou_help_cache/objects')
+    render = sub.add_parser('render', help='Two pass legacy renderer against single pass multi target renderer')
+    render.add_argument('--pages', type=int, default=300)
+    render.add_argument('--corpus', help='Folder with saved pages')
+    render.add_argument('--methods', default='100,400,2000', help='Comma separated method counts of single classes')
+    page = sub.add_parser('page', help='Parse time of one large class page')
+    page.add_argument('--methods', type=int, default=400)
+    returns = sub.add_parser('returns', help='Return type rules: parity with legacy code, timing and rule hits')
+    returns.add_argument('--calls', type=int, default=50000)
+    returns.add_argument('--corpus', help='Folder with saved pages to collect return strings from')
+    signatures = sub.add_parser('signatures', help='Signature tokenizer: parity with legacy code and signatures/sec')
+    signatures.add_argument('--pages', type=int, default=300)
+    signatures.add_argument('--corpus', help='Folder with saved pages to collect method titles from')
+    signatures.add_argument('--repeat', type=int, default=3)
+    corpus = sub.add_parser('corpus', help='Write synthetic corpus to folder')
+    corpus.add_argument('folder')
+    corpus.add_argument('--pages', type=int, default=300)
+    options = parser.parse_args()
+    if options.command == 'crawl':
+        bench_crawl(options.pages, (1, options.workers), options.delay)
+    elif options.command == 'fetch':
+        bench_fetch(options.pages, options.workers, options.changed, options.fail_first)
+    elif options.command == 'cache':
+        bench_cache(options.pages)
+    elif options.command == 'index':
+        bench_index(options.pages)
+    elif options.command == 'resume':
+        bench_resume(options.pages, options.broken, options.workers)
+    elif options.command == 'incremental':
+        bench_incremental(options.pages, options.changed)
+    elif options.command == 'stream':
+        bench_stream(options.pages, options.workers)
+    elif options.command == 'source':
+        bench_source(options.pages, options.workers)
+    elif options.command == 'shard':
+        bench_shard(options.pages, [int(x) for x in options.shards.split(',')], options.delay)
+    elif options.command == 'suite':
+        sys.exit(1 if bench_suite(options.pages, options.corpus and os.path.expanduser(options.corpus), options.repeat,
+                                  options.baseline, options.save, options.tolerance) else 0)
+    elif options.command == 'package':
+        bench_package(options.pages, options.corpus and os.path.expanduser(options.corpus), options.repeat)
+    elif options.command == 'pyi':
+        bench_pyi(options.pages, options.corpus and os.path.expanduser(options.corpus), options.repeat, options.python)
+    elif options.command == 'db':
+        bench_db(options.pages, options.corpus and os.path.expanduser(options.corpus), options.repeat)
+    elif options.command == 'diff':
+        bench_diff(options.pages, options.corpus and os.path.expanduser(options.corpus), options.changed)
+    elif options.command == 'export':
+        bench_export(options.pages, options.corpus and os.path.expanduser(options.corpus), options.repeat)
+    elif options.command == 'complete':
+        bench_complete(options.pages, options.corpus and os.path.expanduser(options.corpus), options.queries,
+                       [int(x) for x in options.clients.split(',')])
+    elif options.command == 'dedup':
+        bench_dedup(options.pages, options.corpus and os.path.expanduser(options.corpus), options.repeats, options.notes,
+                     options.repeat)
+    elif options.command == 'memory':
+        bench_memory(options.pages, options.corpus and os.path.expanduser(options.corpus))
+    elif options.command == 'sort':
+        bench_sort([int(x) for x in options.sizes.split(',')], options.legacy_limit)
+    elif options.command == 'parsers':
+        bench_parsers(options.pages, options.corpus and os.path.expanduser(options.corpus))
+    elif options.command == 'render':
+        bench_render(options.pages, options.corpus and os.path.expanduser(options.corpus),
+                     [int(x) for x in options.methods.split(',')])
+    elif options.command == 'page':
+        bench_page(options.methods)
+    elif options.command == 'returns':
+        bench_returns(options.calls, options.corpus and os.path.expanduser(options.corpus))
+    elif options.command == 'signatures':
+        bench_signatures(options.pages, options.corpus and os.path.expanduser(options.corpus), options.repeat)
+    elif options.command == 'corpus':
+        make_corpus(options.folder, options.pages)
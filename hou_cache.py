@@ -0,0 +1,408 @@
+"""
+Versioned page cache.
+
+Entries are keyed by documentation version and full page url (query and anchor included).
+Page bodies are stored content-addressed by sha1 in objects/, so identical pages of different
+versions share one file. A single index.json keeps url, version, content hash, validators,
+fetch and access time of every entry, warm lookups never touch the file system except to read the body.
+Page lists parsed from documentation root pages are kept in index.json too, with the same keys.
+Parsed records and rendered blocks for incremental rebuilds are kept per version in parsed/.
+Records parsed by an unfinished run are journaled per version in journal/ for resume.
+
+cache_folder/
+    index.json
+    objects/ab/ab12...ef.html[.gz]
+    parsed/16.5.json
+    journal/16.5.jsonl
+"""
+import os, re, json, time, zlib, hashlib, threading, tempfile, collections
+
+
+class PageCache(object):
+    INDEX = 'index.json'
+    INDEX_VERSION = 1
+
+    def __init__(self, folder, version='latest', compress=False, max_size=None, max_age=None, max_idle=None):
+        """
+        :param folder: cache root folder
+        :param version: documentation version, entries of other versions are kept side by side
+        :param compress: store new page bodies compressed
+        :param max_size: max total size of stored bodies in bytes, least recently used entries are evicted
+        :param max_age: seconds after fetch when entry becomes stale and must be revalidated
+        :param max_idle: entries not accessed for this many seconds are evicted
+        """
+        self.folder = folder
+        self.version = version
+        self.compress = compress
+        self.max_size = max_size
+        self.max_age = max_age
+        self.max_idle = max_idle
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+        self._changed = False
+        self.entries, self.page_lists = self._load_index()
+
+    def __repr__(self):
+        return '<PageCache %s [%s] %s entries>' % (self.folder, self.version, len(self.entries))
+
+    @property
+    def index_file(self):
+        return os.path.join(self.folder, self.INDEX)
+
+    def _load_index(self):
+        if not os.path.exists(self.index_file):
+            return {}, {}
+        try:
+            data = json.load(open(self.index_file))
+        except ValueError:
+            print 'Broken cache index, start from scratch: %s' % self.index_file
+            return {}, {}
+        if data.get('version') != self.INDEX_VERSION:
+            return {}, {}
+        return data['entries'], data.get('page_lists', {})
+
+    def key(self, url, version=None):
+        return '%s %s' % (version or self.version, url)
+
+    def _object_file(self, sha1, compressed):
+        return os.path.join(self.folder, 'objects', sha1[:2], sha1 + ('.html.gz' if compressed else '.html'))
+
+    def entry(self, url, version=None):
+        """
+        Index record of url or None
+        """
+        return self.entries.get(self.key(url, version))
+
+    def fresh(self, url):
+        """
+        Entry exists and is not older than max_age
+        """
+        entry = self.entry(url)
+        if not entry:
+            return False
+        return not self.max_age or time.time() - entry['fetched'] < self.max_age
+
+    def get(self, url, version=None):
+        """
+        Cached page content or None
+        """
+        with self._lock:
+            entry = self.entry(url, version)
+            if not entry:
+                self.misses += 1
+                return None
+            entry['accessed'] = time.time()
+            self._changed = True
+        try:
+            data = open(self._object_file(entry['sha1'], entry['compressed']), 'rb').read()
+        except IOError:
+            with self._lock:
+                self.entries.pop(self.key(url, version), None)
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        if entry['compressed']:
+            data = zlib.decompress(data)
+        return data
+
+    def put(self, url, content, validators=None):
+        """
+        Store page content, returns content sha1
+        """
+        sha1 = hashlib.sha1(content).hexdigest()
+        data = None
+        for compressed in (self.compress, not self.compress):
+            path = self._object_file(sha1, compressed)
+            if os.path.exists(path):
+                # same page of other version or url
+                break
+        else:
+            compressed = self.compress
+            path = self._object_file(sha1, compressed)
+            if not os.path.exists(os.path.dirname(path)):
+                try:
+                    os.makedirs(os.path.dirname(path))
+                except OSError:
+                    # created by other thread
+                    pass
+            data = zlib.compress(content) if compressed else content
+            _write_atomic(path, data)
+        now = time.time()
+        with self._lock:
+            self.entries[self.key(url)] = dict(
+                url=url,
+                version=self.version,
+                sha1=sha1,
+                compressed=compressed,
+                size=len(data) if data is not None else os.path.getsize(path),
+                fetched=now,
+                accessed=now,
+                etag=(validators or {}).get('etag'),
+                last_modified=(validators or {}).get('last_modified'),
+            )
+            self._changed = True
+        return sha1
+
+    def touch(self, url):
+        """
+        Mark entry as revalidated on server
+        """
+        with self._lock:
+            entry = self.entry(url)
+            if entry:
+                entry['fetched'] = entry['accessed'] = time.time()
+                self._changed = True
+
+    def validators(self, url):
+        entry = self.entry(url)
+        if not entry:
+            return None
+        return dict(etag=entry['etag'], last_modified=entry['last_modified'])
+
+    def page_list(self, url, version=None):
+        """
+        Cached page list of documentation root url or None
+        """
+        return self.page_lists.get(self.key(url, version))
+
+    def put_page_list(self, url, sha1, pages, validators=None):
+        """
+        Store list of (url, title) parsed from root page with content hash sha1
+        """
+        with self._lock:
+            self.page_lists[self.key(url)] = dict(
+                url=url,
+                version=self.version,
+                sha1=sha1,
+                pages=[list(p) for p in pages],
+                fetched=time.time(),
+                etag=(validators or {}).get('etag'),
+                last_modified=(validators or {}).get('last_modified'),
+            )
+            self._changed = True
+
+    def touch_page_list(self, url):
+        """
+        Mark page list as revalidated on server
+        """
+        with self._lock:
+            entry = self.page_list(url)
+            if entry:
+                entry['fetched'] = time.time()
+                self._changed = True
+
+    def evict(self):
+        """
+        Drop entries idle longer than max_idle, then least recently used entries
+        until total size fits max_size. Returns number of removed entries
+        """
+        with self._lock:
+            removed = 0
+            now = time.time()
+            if self.max_idle:
+                for key, entry in list(self.entries.items()):
+                    if now - entry['accessed'] > self.max_idle:
+                        del self.entries[key]
+                        removed += 1
+            if self.max_size:
+                total = self.size()
+                refs = collections.Counter(e['sha1'] for e in self.entries.values())
+                for key, entry in sorted(self.entries.items(), key=lambda x: x[1]['accessed']):
+                    if total <= self.max_size:
+                        break
+                    del self.entries[key]
+                    refs[entry['sha1']] -= 1
+                    if not refs[entry['sha1']]:
+                        total -= entry['size']
+                    removed += 1
+            if removed:
+                self._changed = True
+                self._collect_garbage()
+            return removed
+
+    def size(self):
+        """
+        Total size of stored bodies in bytes
+        """
+        return sum(dict((e['sha1'], e['size']) for e in self.entries.values()).values())
+
+    def _collect_garbage(self):
+        used = set(e['sha1'] for e in self.entries.values())
+        objects = os.path.join(self.folder, 'objects')
+        if not os.path.exists(objects):
+            return
+        for sub in os.listdir(objects):
+            for name in os.listdir(os.path.join(objects, sub)):
+                if name.split('.')[0] not in used:
+                    os.remove(os.path.join(objects, sub, name))
+
+    def save(self):
+        """
+        Apply eviction policy and write index
+        """
+        with self._lock:
+            self.evict()
+            if not self._changed:
+                return
+            if not os.path.exists(self.folder):
+                os.makedirs(self.folder)
+            _write_atomic(self.index_file, json.dumps(dict(version=self.INDEX_VERSION, entries=self.entries,
+                                                           page_lists=self.page_lists)))
+            self._changed = False
+
+
+class RecordCache(object):
+    """
+    Parsed records and rendered text blocks of pages keyed by url and page content hash.
+    One json file per documentation version, dropped entirely when parser code changes
+    """
+    def __init__(self, folder, version='latest', parser=''):
+        """
+        :param parser: parser code hash, records of other parser are not used
+        """
+        self.path = os.path.join(folder, 'parsed', re.sub(r'[^\w.-]+', '_', version) + '.json')
+        self.parser = parser
+        self.hits = 0
+        self.misses = 0
+        self.entries = {}
+        self._used = set()
+        if os.path.exists(self.path):
+            try:
+                data = json.load(open(self.path))
+            except ValueError:
+                data = {}
+            if data.get('parser') == parser:
+                self.entries = data['entries']
+
+    def __repr__(self):
+        return '<RecordCache %s %s entries>' % (self.path, len(self.entries))
+
+    def get(self, url, sha1):
+        """
+        Parsed record of page if page content is not changed
+        """
+        entry = self.entries.get(url)
+        if entry and entry['sha1'] == sha1:
+            self._used.add(url)
+            self.hits += 1
+            return entry['record']
+        self.misses += 1
+
+    def put(self, url, sha1, record):
+        self.entries[url] = dict(sha1=sha1, record=record, blocks=None)
+        self._used.add(url)
+
+    def blocks(self, url, sha1):
+        """
+        Rendered text blocks of unchanged page or None
+        """
+        entry = self.entries.get(url)
+        if entry and entry['sha1'] == sha1:
+            return entry['blocks']
+
+    def put_blocks(self, url, sha1, blocks):
+        entry = self.entries.get(url)
+        if entry and entry['sha1'] == sha1:
+            entry['blocks'] = blocks
+
+    def save(self):
+        """
+        Write entries of pages used in this run, records of removed pages are dropped
+        """
+        entries = dict((url, e) for url, e in self.entries.items() if url in self._used)
+        if not os.path.exists(os.path.dirname(self.path)):
+            os.makedirs(os.path.dirname(self.path))
+        _write_atomic(self.path, json.dumps(dict(parser=self.parser, entries=entries)))
+
+
+class CrawlJournal(object):
+    """
+    Checkpoint of a run: one json line per finished page, written as soon as the page is parsed.
+    A run which stopped is resumed from the journal without fetching and parsing its pages again.
+    Journal of other parser code is not used
+    """
+    def __init__(self, folder, version='latest', parser='', resume=True):
+        """
+        :param resume: load entries of previous run, else start a new journal
+        """
+        self.path = os.path.join(folder, 'journal', re.sub(r'[^\w.-]+', '_', version) + '.jsonl')
+        self.parser = parser
+        self.entries = {}
+        # end of the last complete line of loaded journal
+        end = 0
+        if resume and os.path.exists(self.path):
+            end = self._load()
+        if not os.path.exists(os.path.dirname(self.path)):
+            os.makedirs(os.path.dirname(self.path))
+        if self.entries:
+            # drop torn line of interrupted write, new entries are appended after valid ones
+            self._file = open(self.path, 'r+b')
+            self._file.truncate(end)
+            self._file.seek(end)
+        else:
+            self._file = open(self.path, 'wb')
+            self._write(dict(parser=parser))
+
+    def __repr__(self):
+        return '<CrawlJournal %s %s entries>' % (self.path, len(self.entries))
+
+    def __contains__(self, url):
+        return url in self.entries
+
+    def _load(self):
+        """
+        Load entries, returns byte offset after the last complete line
+        """
+        end = 0
+        with open(self.path, 'rb') as f:
+            for i, line in enumerate(f):
+                if not line.endswith('\n'):
+                    # last line of interrupted write
+                    break
+                try:
+                    data = json.loads(line)
+                except ValueError:
+                    break
+                if i == 0:
+                    if data.get('parser') != self.parser:
+                        return 0
+                else:
+                    self.entries[data['url']] = (data['sha1'], data['record'])
+                end += len(line)
+        return end
+
+    def _write(self, data):
+        self._file.write(json.dumps(data) + '\n')
+        self._file.flush()
+
+    def get(self, url):
+        """
+        (page sha1, record dict) of finished page, record is None for not valid pages
+        """
+        return self.entries[url]
+
+    def add(self, url, sha1, record):
+        self.entries[url] = (sha1, record)
+        self._write(dict(url=url, sha1=sha1, record=record))
+
+    def close(self):
+        self._file.close()
+
+    def remove(self):
+        """
+        Drop journal of complete run
+        """
+        self._file.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def _write_atomic(path, data):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    if os.path.exists(path):
+        os.remove(path)
+    os.rename(tmp, path)
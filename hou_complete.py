@@ -0,0 +1,313 @@
+"""
+Completion index and lookup server of hou symbols.
+
+Built from parsed records (parse_help(as_text=False), a hou_export file or a hou_db database).
+Top level names and members of every class, module and enum are kept in sorted lists searched with bisect,
+members of base classes are resolved through inherits when the index is built, so a lookup is one
+dictionary access and one binary search.
+
+    hou.No          classes, modules, functions and enums starting with No, case insensitive
+    hou.Node.cre    methods of Node and its base classes starting with cre
+    hou.primType.   all values of enum
+
+Served over http (GET /complete?q=hou.Node.cre&limit=20, GET /describe?q=hou.Node.createNode)
+or over stdin and stdout, one json request per line: {"id": 1, "method": "complete", "params": {"q": "hou.No"}}
+
+python hou_complete.py hou.jsonl complete hou.Node.cre
+python hou_complete.py hou.db serve --port 8765
+python hou_complete.py hou.marshal stdio
+"""
+import os, sys, json, bisect, urlparse, collections
+import BaseHTTPServer, SocketServer
+from hou_parser import HouModules
+
+Completion = collections.namedtuple('Completion', 'name kind owner signature')
+
+
+def _item(completion, **extra):
+    """
+    Json dict of Completion, plain dict is several times faster to build and dump than _asdict
+    """
+    result = dict(zip(Completion._fields, completion))
+    result.update(extra)
+    return result
+
+
+def load_records(path, version='latest'):
+    """
+    Records of hou_db database (.db) or hou_export file
+    """
+    if os.path.splitext(path)[1].lower() == '.db':
+        import hou_db
+        db = hou_db.ApiDatabase(path)
+        try:
+            return db.records(version)
+        finally:
+            db.close()
+    import hou_export
+    return hou_export.load(path)
+
+
+def _signature(method):
+    ret = method.ret.strip()
+    return '%s%s%s' % (method.name, HouModules.args_to_str(method.args), ' -> %s' % ret if ret else '')
+
+
+class _Names(object):
+    """
+    Sorted entries with bisect prefix search on lower case names
+    """
+    def __init__(self, entries):
+        entries = sorted(entries, key=lambda e: (e.name.lower(), e.name))
+        self.keys = [e.name.lower() for e in entries]
+        self.entries = entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def prefixed(self, prefix, limit=None):
+        prefix = prefix.lower()
+        keys = self.keys
+        start = bisect.bisect_left(keys, prefix)
+        end = start
+        count = len(keys) if limit is None else min(len(keys), start + limit)
+        while end < count and keys[end].startswith(prefix):
+            end += 1
+        return self.entries[start:end]
+
+
+class CompletionIndex(object):
+    """
+    Completions of top level names and of members of classes, modules and enums, inherited members included
+    """
+    def __init__(self, records):
+        types = HouModules.TYPES
+        self.records = dict((r.name, r) for r in records)
+        self.mro = HouModules.records_mro(records)
+        # {name: (Completion, doc, url)}
+        self._top = {}
+        # {owner: {name: (Completion, doc)}}
+        self._own = {}
+        for r in records:
+            if r.type == types.FUNC:
+                if r.function:
+                    c = Completion(r.function.name, 'function', '', _signature(r.function))
+                    self._top[c.name] = (c, r.function.doc, r.url)
+                continue
+            bases = [b.split('.')[-1] for b in r.inherits]
+            if r.type == types.CLASS:
+                c = Completion(r.name, 'class', '', 'class %s%s' % (r.name, '(%s)' % ', '.join(bases) if bases else ''))
+            else:
+                c = Completion(r.name, r.type, '', '%s %s' % (r.type, r.name))
+            self._top[c.name] = (c, r.doc, r.url)
+            members = {}
+            for f in r.static_functions:
+                members[f.name] = (Completion(f.name, 'static', r.name, _signature(f)), f.doc)
+            for m in r.methods:
+                members[m.name] = (Completion(m.name, 'method', r.name, _signature(m)), m.doc)
+            for e in r.enum:
+                members[e.name] = (Completion(e.name, 'value', r.name, '%s.%s' % (r.name, e.name)), e.description)
+            self._own[r.name] = members
+        self.top = _Names(c for c, doc, url in self._top.values())
+        self.members = {}
+        self._members = {}
+        for name in self._own:
+            resolved = self._resolve(name)
+            self._members[name] = resolved
+            self.members[name] = _Names(c for c, doc in resolved.values())
+
+    def __repr__(self):
+        return '<CompletionIndex %s names, %s members>' % (
+            len(self.top), sum(len(x) for x in self.members.values()))
+
+    @classmethod
+    def load(cls, path, version='latest'):
+        return cls(load_records(path, version))
+
+    def ancestors(self, name):
+        """
+        Base classes of class in method resolution order of the stubs.
+        Classes without consistent order get base classes breadth first, nearest first
+        """
+        if name in self.mro:
+            return self.mro[name][1:]
+        result = []
+        record = self.records.get(name)
+        queue = [b.split('.')[-1] for b in record.inherits] if record else []
+        while queue:
+            base = queue.pop(0)
+            if base not in result and base != name:
+                result.append(base)
+                if base in self.records:
+                    queue.extend(b.split('.')[-1] for b in self.records[base].inherits)
+        return result
+
+    def _resolve(self, name):
+        """
+        {member name: (Completion, doc)} of own and inherited members, overridden members are not repeated
+        """
+        result = {}
+        for owner in [name] + self.ancestors(name):
+            for key, value in self._own.get(owner, {}).items():
+                result.setdefault(key, value)
+        return result
+
+    @staticmethod
+    def split(text):
+        """
+        (owner, prefix) of completion text, owner is empty for top level names
+        """
+        text = text.strip()
+        if text.startswith('hou.'):
+            text = text[4:]
+        owner, _, prefix = text.rpartition('.')
+        return owner, prefix
+
+    def complete(self, text, limit=50):
+        """
+        List of Completion of text, e.g. "hou.Node.cre"
+        """
+        owner, prefix = self.split(text)
+        if not owner:
+            return self.top.prefixed(prefix, limit)
+        names = self.members.get(owner)
+        if names is None:
+            return []
+        return names.prefixed(prefix, limit)
+
+    def describe(self, text):
+        """
+        Completion of full symbol name with doc and url as dict, None if not found
+        """
+        owner, name = self.split(text)
+        if not owner:
+            item = self._top.get(name)
+            if not item:
+                return None
+            completion, doc, url = item
+            return _item(completion, doc=doc or '', url=url or '')
+        item = self._members.get(owner, {}).get(name)
+        if not item:
+            return None
+        completion, doc = item
+        return _item(completion, doc=doc or '', url=self.records[completion.owner].url or '',
+                     inherited=completion.owner != owner)
+
+    def request(self, method, params):
+        """
+        Result of json request, method is complete or describe
+        """
+        if method == 'complete':
+            return [_item(c) for c in self.complete(params.get('q', ''), int(params.get('limit', 50)))]
+        if method == 'describe':
+            return self.describe(params.get('q', ''))
+        raise ValueError('Unknown method: %s' % method)
+
+
+class _Server(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def make_server(index, host='127.0.0.1', port=8765):
+    """
+    Http server of index, call serve_forever to run. Port 0 is any free port, see server.server_address
+    """
+    class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            url = urlparse.urlparse(self.path)
+            params = dict((k, v[0]) for k, v in urlparse.parse_qs(url.query).items())
+            try:
+                result = index.request(url.path.strip('/'), params)
+            except ValueError as e:
+                return self._send(400, {'error': str(e)})
+            self._send(200 if result is not None else 404, {'result': result})
+
+        def _send(self, status, data):
+            content = json.dumps(data)
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, *args):
+            pass
+
+    return _Server((host, port), Handler)
+
+
+def serve_stdio(index, stdin=None, stdout=None):
+    """
+    Answer json requests read line by line until end of input
+    """
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    for line in iter(stdin.readline, ''):
+        if not line.strip():
+            continue
+        response = {'id': None}
+        try:
+            request = json.loads(line)
+            response['id'] = request.get('id')
+            response['result'] = index.request(request['method'], request.get('params', {}))
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            response['error'] = str(e)
+        stdout.write(json.dumps(response) + '\n')
+        stdout.flush()
+
+
+if __name__ == '__main__':
+    import argparse, time
+    parser = argparse.ArgumentParser(description='Complete hou symbols from parsed houdini python api')
+    parser.add_argument('source', help='hou_export file or hou_db database')
+    parser.add_argument('--doc-version', default='latest', help='Documentation version of database')
+    sub = parser.add_subparsers(dest='command')
+    complete = sub.add_parser('complete', help='Print completions of text')
+    complete.add_argument('text')
+    complete.add_argument('--limit', type=int, default=50)
+    describe = sub.add_parser('describe', help='Print signature and doc of symbol')
+    describe.add_argument('text')
+    serve = sub.add_parser('serve', help='Run http server')
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8765)
+    sub.add_parser('stdio', help='Answer json requests on stdin, one per line')
+    options = parser.parse_args()
+    if not os.path.exists(options.source):
+        parser.error('Not found: %s' % options.source)
+    start = time.time()
+    try:
+        index = CompletionIndex.load(options.source, options.doc_version)
+    except ValueError as e:
+        parser.error(str(e))
+    load_time = time.time() - start
+    if options.command == 'complete':
+        start = time.time()
+        items = index.complete(options.text, options.limit)
+        lookup_time = time.time() - start
+        for c in items:
+            print '%-8s %s' % (c.kind, '.'.join(x for x in (c.owner, c.signature) if x))
+        print '%s (loaded in %.1f ms, lookup %.3f ms)' % (index, load_time * 1000, lookup_time * 1000)
+    elif options.command == 'describe':
+        info = index.describe(options.text)
+        if info is None:
+            print 'Not found: %s' % options.text
+        else:
+            print info['signature'].encode('utf-8')
+            if info['doc']:
+                print info['doc'].encode('utf-8')
+            print info['url']
+    elif options.command == 'serve':
+        server = make_server(index, options.host, options.port)
+        sys.stderr.write('%s serving on http://%s:%s/ (loaded in %.1f ms)\n' % (
+            index, options.host, server.server_address[1], load_time * 1000))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        server.server_close()
+    elif options.command == 'stdio':
+        serve_stdio(index)
@@ -0,0 +1,356 @@
+"""
+SQLite index of the parsed hou API.
+
+Records of every documentation version are stored side by side with digests of their parsed data (see hou_diff)
+and can be read back as ModuleRecord objects in output order, so stubs are regenerated without fetching
+or parsing pages.
+Doc strings of classes, methods and enum values are indexed for full text search.
+
+python hou_db.py hou.db subclasses NetworkMovableItem
+python hou_db.py hou.db returns Node
+python hou_db.py hou.db search "bounding box"
+python hou_db.py hou.db stubs --out stubs/
+"""
+import os, json, sqlite3
+from hou_parser import HouModules, ModuleRecord, Method, EnumValue
+from hou_package import NAME_RE
+
+SCHEMA_VERSION = 3
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS modules (
+    id INTEGER PRIMARY KEY, version TEXT, position INTEGER, url TEXT, type TEXT, name TEXT, doc TEXT, sha1 TEXT,
+    digest TEXT, api_digest TEXT);
+CREATE INDEX IF NOT EXISTS modules_name ON modules (version, name);
+CREATE TABLE IF NOT EXISTS bases (module_id INTEGER, position INTEGER, base TEXT, base_name TEXT);
+CREATE INDEX IF NOT EXISTS bases_base ON bases (base_name);
+CREATE INDEX IF NOT EXISTS bases_module ON bases (module_id);
+CREATE TABLE IF NOT EXISTS methods (
+    id INTEGER PRIMARY KEY, module_id INTEGER, kind TEXT, position INTEGER,
+    name TEXT, args TEXT, ret TEXT, returns TEXT, doc TEXT, types TEXT);
+CREATE INDEX IF NOT EXISTS methods_name ON methods (name);
+CREATE INDEX IF NOT EXISTS methods_module ON methods (module_id);
+CREATE TABLE IF NOT EXISTS return_types (method_id INTEGER, type TEXT);
+CREATE INDEX IF NOT EXISTS return_types_type ON return_types (type);
+CREATE TABLE IF NOT EXISTS enum_values (module_id INTEGER, position INTEGER, name TEXT, description TEXT);
+CREATE INDEX IF NOT EXISTS enum_values_module ON enum_values (module_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS docs USING fts4 (
+    version, kind, owner, name, doc, notindexed=version, notindexed=kind);
+'''
+KINDS = ('method', 'static', 'function')
+# parse_return values which are not type names
+NOT_TYPES = {'True', 'False', 'None', 'object', 'tuple'}
+
+
+class ApiDatabase(object):
+    def __init__(self, path):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        # {version: HouModules.records_mro of stored classes}
+        self._mro = {}
+        self.db.executescript(SCHEMA)
+        version = self.meta('schema')
+        if version is None:
+            self.set_meta('schema', SCHEMA_VERSION)
+            self.db.commit()
+        elif int(version) != SCHEMA_VERSION:
+            raise ValueError('Database schema %s is not supported: %s' % (version, path))
+
+    def __repr__(self):
+        return '<ApiDatabase %s>' % self.path
+
+    def close(self):
+        self.db.close()
+
+    def meta(self, key):
+        row = self.db.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row and row[0]
+
+    def set_meta(self, key, value):
+        self.db.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)', (key, str(value)))
+
+    def versions(self):
+        return [r[0] for r in self.db.execute('SELECT DISTINCT version FROM modules ORDER BY version')]
+
+    def store(self, records, version='latest'):
+        """
+        Replace records of version, records must be in output order
+        """
+        self._mro.pop(version, None)
+        with self.db:
+            self._delete(version)
+            for position, r in enumerate(records):
+                module_id = self.db.execute(
+                    'INSERT INTO modules (version, position, url, type, name, doc, sha1, digest, api_digest) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (version, position, r.url, r.type, r.name, r.doc, r.sha1, r.digest(), r.digest(False))).lastrowid
+                self.db.executemany('INSERT INTO bases VALUES (?, ?, ?, ?)',
+                                    [(module_id, i, b, b.split('.')[-1]) for i, b in enumerate(r.inherits)])
+                self.db.execute('INSERT INTO docs (docid, version, kind, owner, name, doc) VALUES (?, ?, ?, ?, ?, ?)',
+                                (-module_id, version, r.type, '', r.name, r.doc))
+                methods = [(KINDS[0], m) for m in r.methods] + [(KINDS[1], f) for f in r.static_functions]
+                if r.function:
+                    methods.append((KINDS[2], r.function))
+                for i, (kind, m) in enumerate(methods):
+                    returns = HouModules.parse_return(m.ret)
+                    method_id = self.db.execute(
+                        'INSERT INTO methods (module_id, kind, position, name, args, ret, returns, doc, types) '
+                        'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                        (module_id, kind, i, m.name, json.dumps(m.args), m.ret, returns, m.doc,
+                         json.dumps(m.types or ()))).lastrowid
+                    types = set(n for n in NAME_RE.findall(returns) if n not in NOT_TYPES)
+                    self.db.executemany('INSERT INTO return_types VALUES (?, ?)', [(method_id, t) for t in types])
+                    self.db.execute('INSERT INTO docs (docid, version, kind, owner, name, doc) VALUES (?, ?, ?, ?, ?, ?)',
+                                    (method_id, version, kind, r.name, m.name, m.doc))
+                self.db.executemany('INSERT INTO enum_values VALUES (?, ?, ?, ?)',
+                                    [(module_id, i, e.name, e.description) for i, e in enumerate(r.enum)])
+            self.set_meta('parser %s' % version, HouModules.parser_hash())
+
+    def delete(self, version):
+        self._mro.pop(version, None)
+        with self.db:
+            self._delete(version)
+
+    def _delete(self, version):
+        """
+        Delete records of version inside the current transaction, without commit
+        """
+        ids = '(SELECT id FROM modules WHERE version = ?)'
+        method_ids = '(SELECT id FROM methods WHERE module_id IN %s)' % ids
+        self.db.execute('DELETE FROM docs WHERE docid IN (SELECT docid FROM docs WHERE version = ?)', (version,))
+        self.db.execute('DELETE FROM return_types WHERE method_id IN %s' % method_ids, (version,))
+        for table in ('methods', 'bases', 'enum_values'):
+            self.db.execute('DELETE FROM %s WHERE module_id IN %s' % (table, ids), (version,))
+        self.db.execute('DELETE FROM modules WHERE version = ?', (version,))
+
+    def records(self, version='latest', names=None):
+        """
+        Records of version as ModuleRecord in output order, all or only given names
+        """
+        modules = self.db.execute(
+            'SELECT id, url, type, name, doc, sha1 FROM modules WHERE version = ? ORDER BY position', (version,)).fetchall()
+        if names is not None:
+            names = set(names)
+            modules = [m for m in modules if m[3] in names]
+        if not modules:
+            return []
+        ids = '(%s)' % ','.join(str(m[0]) for m in modules)
+        bases = {}
+        for module_id, base in self.db.execute(
+                'SELECT module_id, base FROM bases WHERE module_id IN %s ORDER BY module_id, position' % ids):
+            bases.setdefault(module_id, []).append(base)
+        methods = {}
+        for module_id, kind, name, args, ret, doc, types in self.db.execute(
+                'SELECT module_id, kind, name, args, ret, doc, types FROM methods WHERE module_id IN %s '
+                'ORDER BY module_id, position' % ids):
+            methods.setdefault((module_id, kind), []).append(
+                Method(name, tuple(json.loads(args)), ret, doc, tuple(json.loads(types))))
+        enums = {}
+        for module_id, name, description in self.db.execute(
+                'SELECT module_id, name, description FROM enum_values WHERE module_id IN %s '
+                'ORDER BY module_id, position' % ids):
+            enums.setdefault(module_id, []).append(EnumValue(name, description))
+        records = []
+        for module_id, url, type, name, doc, sha1 in modules:
+            function = methods.get((module_id, KINDS[2]))
+            records.append(ModuleRecord(
+                url, type, name, doc, tuple(bases.get(module_id, ())),
+                tuple(methods.get((module_id, KINDS[0]), ())), tuple(methods.get((module_id, KINDS[1]), ())),
+                function[0] if function else None, tuple(enums.get(module_id, ())), sha1))
+        return records
+
+    def digests(self, version='latest'):
+        """
+        {name: (type, digest, api digest)} of version, see ModuleRecord.digest
+        """
+        return dict((name, (type, digest, api_digest)) for name, type, digest, api_digest in self.db.execute(
+            'SELECT name, type, digest, api_digest FROM modules WHERE version = ?', (version,)))
+
+    # queries
+
+    def find(self, name, version='latest'):
+        """
+        Names of classes, enums and functions matching sql LIKE pattern
+        """
+        return [r[0] for r in self.db.execute(
+            'SELECT name FROM modules WHERE version = ? AND name LIKE ? ORDER BY name', (version, name))]
+
+    def bases(self, name, version='latest'):
+        return [r[0] for r in self.db.execute(
+            'SELECT base_name FROM bases JOIN modules ON id = module_id WHERE version = ? AND name = ? '
+            'ORDER BY bases.position', (version, name))]
+
+    def subclasses(self, name, recursive=True, version='latest'):
+        """
+        Names of classes which inherit class name, sorted
+        """
+        if not recursive:
+            return [r[0] for r in self.db.execute(
+                'SELECT name FROM modules JOIN bases ON id = module_id WHERE version = ? AND base_name = ? ORDER BY name',
+                (version, name))]
+        return [r[0] for r in self.db.execute('''
+            WITH RECURSIVE sub(name) AS (
+                SELECT ?
+                UNION
+                SELECT modules.name FROM modules JOIN bases ON id = module_id JOIN sub ON base_name = sub.name
+                WHERE version = ?
+            )
+            SELECT name FROM sub WHERE name != ? ORDER BY name''', (name, version, name))]
+
+    def methods(self, name, inherited=False, version='latest'):
+        """
+        List of (class name, Method) of class, with methods of base classes if inherited.
+        Methods overridden in subclass are not repeated
+        """
+        owners = [name] + (self.ancestors(name, version) if inherited else [])
+        result = []
+        seen = set()
+        for owner in owners:
+            for method_name, args, ret, doc, types in self.db.execute(
+                    'SELECT methods.name, args, ret, methods.doc, types FROM methods JOIN modules ON modules.id = module_id '
+                    'WHERE version = ? AND modules.name = ? AND kind != ? ORDER BY kind, methods.position',
+                    (version, owner, KINDS[2])):
+                if method_name not in seen:
+                    seen.add(method_name)
+                    method = Method(method_name, tuple(json.loads(args)), ret, doc, tuple(json.loads(types)))
+                    result.append((owner, method))
+        return result
+
+    def mro(self, version='latest'):
+        """
+        {class name: method resolution order} of version, as HouModules.records_mro of stored records
+        """
+        if version not in self._mro:
+            inherits = {}
+            for module_id, base in self.db.execute(
+                    'SELECT module_id, base FROM bases JOIN modules ON id = module_id WHERE version = ? '
+                    'ORDER BY module_id, bases.position', (version,)):
+                inherits.setdefault(module_id, []).append(base)
+            self._mro[version] = HouModules.records_mro([
+                ModuleRecord(type=kind, name=name, inherits=inherits.get(module_id, ()))
+                for module_id, kind, name in self.db.execute(
+                    'SELECT id, type, name FROM modules WHERE version = ? AND type IN (?, ?)',
+                    (version, HouModules.TYPES.CLASS, HouModules.TYPES.MODULE))])
+        return self._mro[version]
+
+    def ancestors(self, name, version='latest'):
+        """
+        Base classes of class in method resolution order of the stubs.
+        Classes without consistent order get base classes breadth first, nearest first
+        """
+        mro = self.mro(version).get(name)
+        if mro:
+            return mro[1:]
+        result = []
+        queue = self.bases(name, version)
+        while queue:
+            base = queue.pop(0)
+            if base not in result:
+                result.append(base)
+                queue.extend(self.bases(base, version))
+        return result
+
+    def returning(self, type_name, version='latest'):
+        """
+        List of (owner name, method name, documented return) of methods and functions returning type_name,
+        alone or inside tuple or dict
+        """
+        return list(self.db.execute(
+            'SELECT modules.name, methods.name, methods.ret FROM return_types '
+            'JOIN methods ON methods.id = method_id JOIN modules ON modules.id = module_id '
+            'WHERE version = ? AND return_types.type = ? ORDER BY modules.name, methods.name',
+            (version, type_name.split('.')[-1])))
+
+    def search(self, text, limit=50, version='latest'):
+        """
+        Full text search over names and doc strings, list of (kind, owner, name, snippet).
+        Owner is empty for classes, enums and functions. Raises ValueError if text is not a valid fts query
+        """
+        try:
+            return [tuple(r) for r in self.db.execute(
+                "SELECT kind, owner, name, snippet(docs, '[', ']', '...', -1, 12) FROM docs "
+                "WHERE docs MATCH ? AND version = ? LIMIT ?", (text, version, limit))]
+        except sqlite3.OperationalError as e:
+            raise ValueError('Invalid search query %r: %s' % (text, e))
+
+
+def build(records, path, version='latest'):
+    """
+    Store ordered records of parse_help(as_text=False) in database at path
+    """
+    db = ApiDatabase(path)
+    try:
+        db.store(records, version)
+    finally:
+        db.close()
+    return path
+
+
+def write_stubs(path, out, version='latest'):
+    """
+    Regenerate hou_full.py and hou_min.py from database, without fetching or parsing pages
+    """
+    db = ApiDatabase(path)
+    try:
+        records = db.records(version)
+    finally:
+        db.close()
+    return HouModules.write_outputs(records, out)
+
+
+if __name__ == '__main__':
+    import argparse, time
+    parser = argparse.ArgumentParser(description='Query parsed houdini python api database')
+    parser.add_argument('database')
+    parser.add_argument('--doc-version', default='latest', help='Documentation version name')
+    sub = parser.add_subparsers(dest='command')
+    sub.add_parser('versions', help='Stored documentation versions')
+    find = sub.add_parser('find', help='Names matching pattern, %% is any text')
+    find.add_argument('pattern')
+    subclasses = sub.add_parser('subclasses', help='Classes inheriting class')
+    subclasses.add_argument('name')
+    subclasses.add_argument('--direct', action='store_true', help='Direct subclasses only')
+    methods = sub.add_parser('methods', help='Methods of class')
+    methods.add_argument('name')
+    methods.add_argument('--inherited', action='store_true', help='Include methods of base classes')
+    returns = sub.add_parser('returns', help='Methods returning type')
+    returns.add_argument('type')
+    search = sub.add_parser('search', help='Full text search in doc strings')
+    search.add_argument('text')
+    search.add_argument('--limit', type=int, default=50)
+    stubs = sub.add_parser('stubs', help='Write hou_full.py and hou_min.py from database')
+    stubs.add_argument('--out', default='.')
+    options = parser.parse_args()
+    if not os.path.exists(options.database):
+        parser.error('Database not found: %s' % options.database)
+    version = options.doc_version
+    start = time.time()
+    if options.command == 'stubs':
+        for path in write_stubs(options.database, options.out, version):
+            print 'SAVED:', path
+    else:
+        db = ApiDatabase(options.database)
+        if options.command == 'versions':
+            for name in db.versions():
+                print name
+        elif options.command == 'find':
+            for name in db.find(options.pattern, version):
+                print name
+        elif options.command == 'subclasses':
+            for name in db.subclasses(options.name, not options.direct, version):
+                print name
+        elif options.command == 'methods':
+            for owner, m in db.methods(options.name, options.inherited, version):
+                print '%s.%s%s -> %s' % (owner, m.name, HouModules.args_to_str(m.args), m.ret)
+        elif options.command == 'returns':
+            for owner, name, ret in db.returning(options.type, version):
+                print '%s.%s -> %s' % (owner, name, ret)
+        elif options.command == 'search':
+            try:
+                found = db.search(options.text, options.limit, version)
+            except ValueError as e:
+                parser.error(e.args[0])
+            for kind, owner, name, snippet in found:
+                print '%-8s %s  %s' % (kind, '.'.join(x for x in (owner, name) if x), snippet.replace('\n', ' '))
+        db.close()
+    print '(%.1f ms)' % ((time.time() - start) * 1000)
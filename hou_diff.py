@@ -0,0 +1,233 @@
+"""
+Differences of the parsed hou API between two documentation versions.
+
+Records are matched by name and compared by digests of their parsed data (ModuleRecord.digest),
+only records with different digests are compared member by member. Digests of versions stored
+in a hou_db database are read without loading the records.
+
+python hou_parser.py --doc-version 17.5 --db hou.db
+python hou_parser.py --doc-version 18.0 --db hou.db
+python hou_diff.py hou.db 17.5 18.0 --out migration.md
+"""
+import json
+from hou_parser import HouModules
+
+
+class RecordDiff(object):
+    """
+    Member changes of one record present in both versions
+    """
+    def __init__(self, old, new):
+        self.name = new.name
+        self.type = new.type
+        self.bases = (old.inherits, new.inherits) if old.inherits != new.inherits else None
+        self.added = []
+        # list of (old Method, new Method) with other arguments or return value
+        self.changed = []
+        self.docs = 0
+        if old.doc != new.doc:
+            self.docs += 1
+        old_methods, new_methods = _methods(old), _methods(new)
+        for key, m in new_methods.items():
+            if key not in old_methods:
+                self.added.append(key)
+            elif (m.args, m.ret) != (old_methods[key].args, old_methods[key].ret):
+                self.changed.append((old_methods[key], m))
+            elif m.doc != old_methods[key].doc:
+                self.docs += 1
+        self.removed = [key for key in old_methods if key not in new_methods]
+        self.added.sort()
+        self.removed.sort()
+        self.changed.sort(key=lambda x: x[1].name)
+        old_values = dict((e.name, e) for e in old.enum)
+        new_values = dict((e.name, e) for e in new.enum)
+        self.added_values = sorted(n for n in new_values if n not in old_values)
+        self.removed_values = sorted(n for n in old_values if n not in new_values)
+        self.docs += sum(1 for n, e in new_values.items() if n in old_values and e.description != old_values[n].description)
+        self._new_methods = new_methods
+
+    def __repr__(self):
+        return '<RecordDiff %s +%s -%s ~%s>' % (self.name, len(self.added), len(self.removed), len(self.changed))
+
+    @property
+    def api_changed(self):
+        return bool(self.bases or self.added or self.removed or self.changed or self.added_values or self.removed_values)
+
+    def to_dict(self):
+        return dict(
+            name=self.name, type=self.type, bases=self.bases and [list(x) for x in self.bases],
+            added=['%s %s' % k for k in self.added], removed=['%s %s' % k for k in self.removed],
+            changed=[dict(name=new.name, old=_signature(old), new=_signature(new)) for old, new in self.changed],
+            added_values=self.added_values, removed_values=self.removed_values, docs=self.docs,
+        )
+
+    def report_lines(self):
+        lines = []
+        if self.bases:
+            lines.append('- base classes: %s -> %s' % tuple(', '.join(x) or '-' for x in self.bases))
+        for kind, name in self.added:
+            lines.append('- added %s `%s`' % (kind, _signature(self._new_methods[(kind, name)])))
+        for kind, name in self.removed:
+            lines.append('- removed %s `%s`' % (kind, name))
+        for old, new in self.changed:
+            lines.append('- changed `%s` -> `%s`' % (_signature(old), _signature(new)))
+        for name in self.added_values:
+            lines.append('- added value `%s`' % name)
+        for name in self.removed_values:
+            lines.append('- removed value `%s`' % name)
+        return lines
+
+
+def _methods(record):
+    """
+    {(kind, name): Method}, kinds are method, static and function
+    """
+    result = dict((('method', m.name), m) for m in record.methods)
+    result.update((('static', f.name), f) for f in record.static_functions)
+    if record.function:
+        result[('function', record.function.name)] = record.function
+    return result
+
+
+def _signature(method):
+    return '%s%s -> %s' % (method.name, HouModules.args_to_str(method.args), method.ret.strip())
+
+
+class ApiDiff(object):
+    """
+    Added, removed and changed records between old and new version
+    """
+    def __init__(self, old_version, new_version):
+        self.old_version = old_version
+        self.new_version = new_version
+        self.added = []
+        self.removed = []
+        self.changed = []
+        # names of records with the same api and other doc strings or member order
+        self.docs_only = []
+        self.unchanged = 0
+
+    def __repr__(self):
+        return '<ApiDiff %s -> %s: +%s -%s ~%s>' % (
+            self.old_version, self.new_version, len(self.added), len(self.removed), len(self.changed))
+
+    @property
+    def changed_names(self):
+        """
+        Names of records which output is different in new version
+        """
+        return sorted([r.name for r in self.added] + [d.name for d in self.changed] + self.docs_only)
+
+    def to_dict(self):
+        return dict(
+            old=self.old_version, new=self.new_version,
+            added=[dict(name=r.name, type=r.type) for r in self.added],
+            removed=[dict(name=r.name, type=r.type) for r in self.removed],
+            changed=[d.to_dict() for d in self.changed],
+            docs_only=self.docs_only, unchanged=self.unchanged,
+        )
+
+    def report(self):
+        """
+        Migration report, markdown text
+        """
+        lines = [
+            '# hou API changes %s -> %s' % (self.old_version, self.new_version), '',
+            '%s added, %s removed, %s changed, %s with doc or order changes only, %s unchanged' % (
+                len(self.added), len(self.removed), len(self.changed), len(self.docs_only), self.unchanged),
+        ]
+        for title, records in (('Added', self.added), ('Removed', self.removed)):
+            if records:
+                lines.extend(['', '## %s' % title, ''])
+                lines.extend('- %s `hou.%s`' % (r.type, r.name) for r in records)
+        if self.changed:
+            lines.extend(['', '## Changed'])
+            for d in self.changed:
+                lines.extend(['', '### hou.%s' % d.name, ''])
+                lines.extend(d.report_lines())
+        if self.docs_only:
+            lines.extend(['', '## Doc or order changes only', ''])
+            lines.extend('- `hou.%s`' % n for n in self.docs_only)
+        return '\n'.join(lines) + '\n'
+
+
+def _diff(old_digests, new_digests, load, old_version, new_version):
+    """
+    old_digests and new_digests are {name: (type, digest, api digest)},
+    load(version, names) returns records of version
+    """
+    diff = ApiDiff(old_version, new_version)
+    compare = []
+    for name, (type, digest, api_digest) in new_digests.items():
+        if name not in old_digests:
+            continue
+        if old_digests[name][1] == digest:
+            diff.unchanged += 1
+        elif old_digests[name][2] == api_digest:
+            diff.docs_only.append(name)
+        else:
+            compare.append(name)
+    added = set(new_digests) - set(old_digests)
+    removed = set(old_digests) - set(new_digests)
+    old_records = dict((r.name, r) for r in load(old_version, removed.union(compare)))
+    new_records = dict((r.name, r) for r in load(new_version, added.union(compare)))
+    diff.added = sorted((new_records[n] for n in added), key=lambda r: (r.type, r.name))
+    diff.removed = sorted((old_records[n] for n in removed), key=lambda r: (r.type, r.name))
+    for name in sorted(compare):
+        d = RecordDiff(old_records[name], new_records[name])
+        if d.api_changed:
+            diff.changed.append(d)
+        else:
+            diff.docs_only.append(name)
+    diff.docs_only.sort()
+    return diff
+
+
+def diff_records(old, new, old_version='old', new_version='new'):
+    """
+    Diff of two lists of records, e.g. results of parse_help(as_text=False)
+    """
+    records = {old_version: old, new_version: new}
+    digests = [dict((r.name, (r.type, r.digest(), r.digest(False))) for r in x) for x in (old, new)]
+    return _diff(digests[0], digests[1], lambda v, names: [r for r in records[v] if r.name in names],
+                 old_version, new_version)
+
+
+def diff_versions(db, old_version, new_version):
+    """
+    Diff of two versions stored in hou_db.ApiDatabase
+    """
+    for version in (old_version, new_version):
+        if version not in db.versions():
+            raise KeyError('Version %s is not in database %s' % (version, db.path))
+    return _diff(db.digests(old_version), db.digests(new_version),
+                 lambda v, names: db.records(v, names), old_version, new_version)
+
+
+if __name__ == '__main__':
+    import argparse, time
+    import hou_db
+    parser = argparse.ArgumentParser(description='Compare parsed houdini python api of two documentation versions')
+    parser.add_argument('database')
+    parser.add_argument('old', help='Old version name')
+    parser.add_argument('new', help='New version name')
+    parser.add_argument('--out', help='Save migration report to markdown file, default is print')
+    parser.add_argument('--json', help='Save diff to json file')
+    options = parser.parse_args()
+    start = time.time()
+    db = hou_db.ApiDatabase(options.database)
+    try:
+        result = diff_versions(db, options.old, options.new)
+    except KeyError as e:
+        parser.error(e.args[0])
+    finally:
+        db.close()
+    if options.json:
+        json.dump(result.to_dict(), open(options.json, 'w'), indent=2, sort_keys=True)
+        print 'JSON SAVED:', options.json
+    if options.out:
+        open(options.out, 'wb').write(result.report().encode('utf-8'))
+        print 'REPORT SAVED:', options.out
+    else:
+        print result.report().encode('utf-8')
+    print '%s (%.1f ms)' % (result, (time.time() - start) * 1000)
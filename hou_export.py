@@ -0,0 +1,236 @@
+"""
+Interchange export of the parsed hou API.
+
+Records are written with a header of format name, schema version, documentation version, parser hash
+and record count, and read back as ModuleRecord objects. Reloaded records are accepted by
+HouModules.render_records, render_text, order_modules and sort_classes like parsed ones.
+
+    .jsonl      JSON Lines: header line, then one ModuleRecord.to_dict per line, read as a stream
+    .marshal    header and all records as nested tuples in field order, fastest reload
+    .msgpack    same layout as marshal, readable outside Python, requires msgpack package
+
+python hou_parser.py --export hou.jsonl
+python hou_export.py hou.jsonl info
+python hou_export.py hou.jsonl convert hou.marshal
+python hou_export.py hou.marshal stubs --out stubs/
+"""
+import os, json, marshal
+from hou_parser import HouModules, ModuleRecord, Method, EnumValue
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+FORMAT = 'hou-api'
+SCHEMA_VERSION = 2
+FIELDS = ModuleRecord.__slots__
+METHOD_FIELDS = Method.__slots__
+ENUM_FIELDS = EnumValue.__slots__
+FORMATS = {'.jsonl': 'jsonl', '.marshal': 'marshal', '.msgpack': 'msgpack'}
+TYPES = frozenset(v for k, v in vars(HouModules.TYPES).items() if not k.startswith('_'))
+
+
+def export_format(path, format=None):
+    """
+    Format name given or by file extension
+    """
+    format = format or FORMATS.get(os.path.splitext(path)[1].lower())
+    if format not in FORMATS.values():
+        raise ValueError('Unknown export format of %s, use one of %s' % (path, ', '.join(sorted(FORMATS))))
+    if format == 'msgpack' and msgpack is None:
+        raise ValueError('msgpack format requires msgpack package')
+    return format
+
+
+def make_header(count, version='latest'):
+    return dict(format=FORMAT, schema=SCHEMA_VERSION, version=version, parser=HouModules.parser_hash(),
+                count=count, fields=list(FIELDS), method_fields=list(METHOD_FIELDS), enum_fields=list(ENUM_FIELDS))
+
+
+def check_header(header, path):
+    """
+    Raise ValueError if header is not of a supported export
+    """
+    if not isinstance(header, dict) or header.get('format') != FORMAT:
+        raise ValueError('Not a hou api export: %s' % path)
+    if header.get('schema') != SCHEMA_VERSION:
+        raise ValueError('Unsupported export schema %s, expected %s: %s' % (header.get('schema'), SCHEMA_VERSION, path))
+    for key, fields in (('fields', FIELDS), ('method_fields', METHOD_FIELDS), ('enum_fields', ENUM_FIELDS)):
+        if tuple(header.get(key) or ()) != fields:
+            raise ValueError('Export %s do not match record fields: %s' % (key, path))
+    return header
+
+
+# record tuples: nested tuples in field order, the layout of binary formats
+
+def _method_row(m):
+    return m and (m.name, tuple(m.args), m.ret, m.doc, tuple(m.types or ()))
+
+
+def record_row(r):
+    return (r.url, r.type, r.name, r.doc, tuple(r.inherits),
+            tuple(_method_row(m) for m in r.methods), tuple(_method_row(f) for f in r.static_functions),
+            _method_row(r.function), tuple((e.name, e.description) for e in r.enum), r.sha1)
+
+
+def _method(row):
+    name, args, ret, doc, types = row
+    return Method(name, tuple(args), ret, doc, tuple(types))
+
+
+def from_row(row):
+    url, type, name, doc, inherits, methods, static_functions, function, enum, sha1 = row
+    if type not in TYPES:
+        raise ValueError('Unknown record type: %s' % type)
+    return ModuleRecord(url, type, name, doc, tuple(inherits),
+                        tuple(_method(m) for m in methods), tuple(_method(f) for f in static_functions),
+                        function and _method(function), tuple(EnumValue(n, d) for n, d in enum), sha1)
+
+
+def record_dict(r):
+    data = r.to_dict()
+    data['sha1'] = r.sha1
+    return data
+
+
+def from_dict(data):
+    missing = [k for k in FIELDS if k not in data]
+    if missing:
+        raise ValueError('Missing record fields: %s' % ', '.join(missing))
+    if data['type'] not in TYPES:
+        raise ValueError('Unknown record type: %s' % data['type'])
+    return ModuleRecord.from_dict(data, data['sha1'])
+
+
+def dump(records, path, version='latest', format=None):
+    """
+    Write records, e.g. result of parse_help(as_text=False), format by extension of path
+    """
+    format = export_format(path, format)
+    records = list(records)
+    header = make_header(len(records), version)
+    with open(path, 'wb') as f:
+        if format == 'jsonl':
+            f.write(json.dumps(header, sort_keys=True) + '\n')
+            for r in records:
+                f.write(json.dumps(record_dict(r), sort_keys=True, separators=(',', ':')) + '\n')
+        elif format == 'marshal':
+            marshal.dump(header, f)
+            marshal.dump(tuple(record_row(r) for r in records), f)
+        else:
+            f.write(msgpack.packb(header, use_bin_type=True))
+            f.write(msgpack.packb([record_row(r) for r in records], use_bin_type=True))
+    return path
+
+
+def _load_rows(f, format):
+    if format == 'marshal':
+        return marshal.load(f), marshal.load(f)
+    unpacker = msgpack.Unpacker(f, raw=False, use_list=False)
+    return next(unpacker), next(unpacker)
+
+
+def read_header(path, format=None):
+    """
+    Header of export: format, schema, version, parser, count and fields
+    """
+    format = export_format(path, format)
+    with open(path, 'rb') as f:
+        try:
+            if format == 'jsonl':
+                header = json.loads(f.readline())
+            elif format == 'marshal':
+                header = marshal.load(f)
+            else:
+                header = next(msgpack.Unpacker(f, raw=False, use_list=False))
+        except (ValueError, EOFError, TypeError, StopIteration):
+            raise ValueError('Not a hou api export: %s' % path)
+    return check_header(header, path)
+
+
+def iter_load(path, format=None):
+    """
+    Records of export one by one. JSON Lines are read as a stream, binary formats are read at once
+    """
+    format = export_format(path, format)
+    with open(path, 'rb') as f:
+        count = 0
+        if format == 'jsonl':
+            try:
+                header = json.loads(f.readline())
+            except ValueError:
+                raise ValueError('Not a hou api export: %s' % path)
+            check_header(header, path)
+            for line in f:
+                count += 1
+                try:
+                    yield from_dict(json.loads(line))
+                except (ValueError, KeyError, TypeError) as e:
+                    raise ValueError('Invalid record %s of %s: %s' % (count, path, e))
+        else:
+            try:
+                header, rows = _load_rows(f, format)
+            except (ValueError, EOFError, TypeError, StopIteration):
+                raise ValueError('Not a hou api export: %s' % path)
+            check_header(header, path)
+            for row in rows:
+                count += 1
+                try:
+                    yield from_row(row)
+                except (ValueError, TypeError) as e:
+                    raise ValueError('Invalid record %s of %s: %s' % (count, path, e))
+    if count != header['count']:
+        raise ValueError('Export is truncated, %s of %s records: %s' % (count, header['count'], path))
+
+
+def load(path, format=None):
+    """
+    List of records of export, in the order they were written
+    """
+    return list(iter_load(path, format))
+
+
+def convert(src, dst, format=None):
+    """
+    Rewrite export in other format, documentation version is kept
+    """
+    return dump(iter_load(src), dst, read_header(src)['version'], format)
+
+
+def write_stubs(path, out):
+    """
+    Regenerate hou_full.py and hou_min.py from export, without fetching or parsing pages
+    """
+    return HouModules.write_outputs(HouModules.order_modules(load(path)), out)
+
+
+if __name__ == '__main__':
+    import argparse, time, collections
+    parser = argparse.ArgumentParser(description='Read and convert parsed houdini python api export')
+    parser.add_argument('export', help='Export file, format by extension: %s' % ', '.join(sorted(FORMATS)))
+    sub = parser.add_subparsers(dest='command')
+    sub.add_parser('info', help='Header and record counts')
+    conv = sub.add_parser('convert', help='Write export in other format')
+    conv.add_argument('target')
+    stubs = sub.add_parser('stubs', help='Write hou_full.py and hou_min.py from export')
+    stubs.add_argument('--out', default='.')
+    options = parser.parse_args()
+    if not os.path.exists(options.export):
+        parser.error('Export not found: %s' % options.export)
+    start = time.time()
+    try:
+        if options.command == 'info':
+            header = read_header(options.export)
+            counts = collections.Counter(r.type for r in iter_load(options.export))
+            for key in ('format', 'schema', 'version', 'parser', 'count'):
+                print '%-10s %s' % (key, header[key])
+            for key, value in sorted(counts.items()):
+                print '%-10s %s' % (key, value)
+        elif options.command == 'convert':
+            print 'SAVED:', convert(options.export, options.target)
+        elif options.command == 'stubs':
+            for path in write_stubs(options.export, options.out):
+                print 'SAVED:', path
+    except ValueError as e:
+        parser.error(str(e))
+    print '(%.1f ms)' % ((time.time() - start) * 1000)
@@ -0,0 +1,76 @@
+"""
+Shared http layer for documentation pages.
+
+One pooled requests session for all pages with bounded retries, backoff and optional rate limit.
+Conditional requests are sent when validators (ETag / Last-Modified) of the cached copy are known.
+"""
+import time, threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class Fetcher(object):
+    RETRY_STATUS = (429, 500, 502, 503, 504)
+    # pages of local sources are not cached, see hou_source
+    local = False
+
+    def __init__(self, pool_size=10, retries=3, backoff=0.5, rate_limit=None, timeout=30):
+        """
+        :param pool_size: max kept alive connections per host, use number of workers
+        :param retries: max retries of connection errors and RETRY_STATUS responses
+        :param backoff: backoff factor, sleep between retries is backoff * 2 ** (retry - 1)
+        :param rate_limit: max requests per second, None is unlimited
+        """
+        self.timeout = timeout
+        self.session = requests.Session()
+        retry = Retry(total=retries, backoff_factor=backoff, status_forcelist=self.RETRY_STATUS,
+                      raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._interval = 1.0 / rate_limit if rate_limit else 0
+        self._next_time = 0
+        self._lock = threading.Lock()
+        self.requests_count = 0
+        self.not_modified_count = 0
+
+    def _wait(self):
+        if not self._interval:
+            return
+        with self._lock:
+            now = time.time()
+            wait = self._next_time - now
+            self._next_time = max(now, self._next_time) + self._interval
+        if wait > 0:
+            time.sleep(wait)
+
+    def get(self, url, validators=None):
+        """
+        GET url, conditional if validators dict is given.
+        Returns (status_code, content, validators).
+        Status 304 means cached copy is still valid, content is None
+        """
+        headers = {}
+        if validators:
+            if validators.get('etag'):
+                headers['If-None-Match'] = validators['etag']
+            if validators.get('last_modified'):
+                headers['If-Modified-Since'] = validators['last_modified']
+        self._wait()
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        with self._lock:
+            self.requests_count += 1
+            if response.status_code == 304:
+                self.not_modified_count += 1
+        if response.status_code == 304:
+            return 304, None, validators
+        new_validators = {}
+        if response.headers.get('ETag'):
+            new_validators['etag'] = response.headers['ETag']
+        if response.headers.get('Last-Modified'):
+            new_validators['last_modified'] = response.headers['Last-Modified']
+        return response.status_code, response.content, new_validators
+
+    def close(self):
+        self.session.close()
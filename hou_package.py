@@ -0,0 +1,210 @@
+"""
+Write parsed records as a lazy loading hou package instead of one monolithic file.
+
+hou/
+    __init__.py     name to submodule map, names are imported on first attribute access
+    _enums.py       all enums
+    _functions.py   all module level functions
+    _Node.py        one module per class or module page
+
+Every class module imports its base classes and names used in default argument values, so
+importing one class pulls in only what its definition needs. Names used in method bodies are
+imported under "if False:" for static analysis only. Default values which would make a circular
+import are replaced by object, like unknown types of parse_return.
+"""
+import os, re
+from hou_parser import HouModules
+
+ENUMS = '_enums'
+FUNCTIONS = '_functions'
+NAME_RE = re.compile(r'[A-Za-z_]\w*')
+
+INIT_TEMPLATE = '''"""
+{doc}
+Names are imported from submodules on first access.
+"""
+import sys, types, importlib
+
+_MODULES = {{
+{modules}
+}}
+__all__ = [
+{names}
+]
+
+
+class _LazyModule(types.ModuleType):
+    def __getattr__(self, name):
+        try:
+            module = _MODULES[name]
+        except KeyError:
+            raise AttributeError('module %r has no attribute %r' % (self.__name__, name))
+        value = getattr(importlib.import_module('.' + module, self.__name__), name)
+        setattr(self, name, value)
+        return value
+
+    def __dir__(self):
+        return sorted(set(self.__dict__) | set(__all__))
+
+
+_module = _LazyModule(__name__, __doc__)
+_module.__dict__.update((k, v) for k, v in globals().items() if k.startswith('__') and k != '__doc__')
+# keep globals of this module alive after it is replaced
+_module._original = sys.modules[__name__]
+sys.modules[__name__] = _module
+
+if False:
+{imports}
+'''
+
+
+def export_name(record):
+    """
+    Name of record in hou namespace
+    """
+    if record.type == HouModules.TYPES.FUNC and record.function:
+        return record.function.name
+    return record.name
+
+
+def module_names(records):
+    """
+    {record name: submodule name}, file names are unique on case insensitive file systems
+    """
+    result = {}
+    used = set([ENUMS, FUNCTIONS])
+    for r in records:
+        if r.type == HouModules.TYPES.ENUM:
+            result[r.name] = ENUMS
+        elif r.type == HouModules.TYPES.FUNC:
+            result[export_name(r)] = FUNCTIONS
+        else:
+            module = '_' + r.name
+            i = 1
+            while module.lower() in used:
+                i += 1
+                module = '_%s_%s' % (r.name, i)
+            used.add(module.lower())
+            result[r.name] = module
+    return result
+
+
+def _names(text, known):
+    return [n for n in NAME_RE.findall(text) if n in known]
+
+
+def _signatures(record):
+    methods = list(record.methods) + list(record.static_functions)
+    if record.function:
+        methods.append(record.function)
+    return methods
+
+
+def definition_names(record, known):
+    """
+    Names evaluated when record source is executed: base classes, default argument values, EnumValue
+    """
+    names = [b.split('.')[-1] for b in record.inherits]
+    for m in _signatures(record):
+        for arg in m.args:
+            if '=' in arg:
+                names.extend(_names(arg.split('=', 1)[1], known))
+    if record.type == HouModules.TYPES.ENUM and record.enum:
+        names.append('EnumValue')
+    return [n for n in names if n in known]
+
+
+def body_names(record, known):
+    """
+    Names used in rendered return values only
+    """
+    names = []
+    for m in _signatures(record):
+        names.extend(_names(HouModules.parse_return(m.ret), known))
+    return names
+
+
+def _unique(names, skip=()):
+    seen = set(skip)
+    result = []
+    for n in names:
+        if n not in seen:
+            seen.add(n)
+            result.append(n)
+    return result
+
+
+def _in_cycle(graph, start):
+    stack = list(graph[start])
+    seen = set()
+    while stack:
+        node = stack.pop()
+        if node == start:
+            return True
+        if node not in seen:
+            seen.add(node)
+            stack.extend(graph.get(node, ()))
+    return False
+
+
+def write_package(records, folder, docs=True, name='hou', renderer=HouModules):
+    """
+    Write records in output order (see HouModules.order_modules) as package folder/name.
+    Returns package path
+    """
+    modules = module_names(records)
+    groups = {}
+    for r in records:
+        groups.setdefault(modules[export_name(r)], []).append(r)
+    # submodule dependency graph of definition time names
+    definition = {}
+    body = {}
+    fallback = {}
+    for module, group in groups.items():
+        own = set(export_name(r) for r in group)
+        names = [n for r in group for n in definition_names(r, modules)]
+        definition[module] = _unique(names, own)
+        # default values referring to the class being defined
+        fallback[module] = _unique(n for n in names if n in own)
+        body[module] = _unique([n for r in group for n in body_names(r, modules)], own)
+    bases = dict((module, set(b.split('.')[-1] for r in group for b in r.inherits)) for module, group in groups.items())
+    while True:
+        graph = dict((module, [d for d in _unique(modules[n] for n in names) if d != module])
+                     for module, names in definition.items())
+        order, missing, cycles = renderer.class_order(graph)
+        # break a cycle at its first module with default value imports
+        cut = [m for m in cycles if _in_cycle(graph, m) and [n for n in definition[m] if n not in bases[m]]]
+        if not cut:
+            break
+        module = cut[0]
+        fallback[module] += [n for n in definition[module] if n not in bases[module]]
+        definition[module] = [n for n in definition[module] if n in bases[module]]
+
+    path = os.path.join(folder, name)
+    if not os.path.exists(path):
+        os.makedirs(path)
+    written = set(['__init__.py'])
+    for module, group in groups.items():
+        lines = [renderer.QT_IMPORT.rstrip('\n')]
+        lines.extend('from .%s import %s' % (modules[n], n) for n in definition[module])
+        lines.extend('%s = object' % n for n in fallback[module])
+        lazy = [n for n in body[module] if n not in definition[module] and n not in fallback[module]]
+        if lazy:
+            lines.append('if False:')
+            lines.extend('    from .%s import %s' % (modules[n], n) for n in lazy)
+        text = '\n'.join(lines) + '\n' + '\n'.join(renderer.render_text(r, docs) for r in group)
+        open(os.path.join(path, module + '.py'), 'wb').write(text.encode('utf-8'))
+        written.add(module + '.py')
+    names = _unique(export_name(r) for r in records)
+    text = INIT_TEMPLATE.format(
+        doc='Houdini %s module stubs for auto completion.' % name,
+        modules='\n'.join("    '%s': '%s'," % (n, modules[n]) for n in names),
+        names='\n'.join("    '%s'," % n for n in names),
+        imports='\n'.join('    from .%s import %s' % (modules[n], n) for n in names) or '    pass',
+    )
+    open(os.path.join(path, '__init__.py'), 'wb').write(text.encode('utf-8'))
+    # modules of records removed since previous run
+    for f in os.listdir(path):
+        if f.endswith(('.py', '.pyc')) and f.split('.')[0] + '.py' not in written:
+            os.remove(os.path.join(path, f))
+    return path
@@ -20,8 +20,207 @@ open('d:/hou_full.py', 'w').write(full)
 open('d:/hou_min.py', 'w').write(minify)
 
 """
-import requests, re, os
-from bs4 import BeautifulSoup
+import re, os, time, json, hashlib, itertools, bisect, traceback, collections, threading
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+from hou_fetcher import Fetcher
+from hou_cache import PageCache, RecordCache, CrawlJournal
+from hou_stats import Stats, timed, NO_TIMER
+import hou_signature
+
+
+class PageIndex(object):
+    """
+    Tags of page tree indexed by name, id and class in a single walk.
+    Lookups follow BeautifulSoup find rules: class matches any single class or the whole class string,
+    results are in document order. Tag positions are in document order, so descendants of a tag
+    are a contiguous range and "within" lookups are a bisect in the index lists
+    """
+    def __init__(self, root):
+        self.tags = []
+        self._end = []
+        self._pos = {}
+        self.by_name = {}
+        self.by_id = {}
+        self.by_class = {}
+        parents = []
+        for tag in root.descendants:
+            if not isinstance(tag, Tag):
+                continue
+            pos = len(self.tags)
+            self.tags.append(tag)
+            self._end.append(pos)
+            self._pos[id(tag)] = pos
+            parents.append(self._pos.get(id(tag.parent)))
+            self.by_name.setdefault(tag.name, []).append(pos)
+            tag_id = tag.get('id')
+            if tag_id is not None:
+                self.by_id.setdefault(tag_id, []).append(pos)
+            classes = tag.get('class')
+            if classes:
+                keys = set(classes)
+                keys.add(' '.join(classes))
+                for key in keys:
+                    self.by_class.setdefault(key, []).append(pos)
+        # last descendant position of every tag
+        for pos in range(len(self.tags) - 1, -1, -1):
+            parent = parents[pos]
+            if parent is not None and self._end[pos] > self._end[parent]:
+                self._end[parent] = self._end[pos]
+
+    @staticmethod
+    def _merge(groups):
+        if len(groups) == 1:
+            return groups[0]
+        return sorted(set(itertools.chain.from_iterable(groups)))
+
+    def _positions(self, name, tag_id, cls, id_part, cls_part):
+        if tag_id is not None:
+            return self.by_id.get(tag_id, [])
+        if cls is not None:
+            return self.by_class.get(cls, [])
+        if id_part is not None:
+            return self._merge([v for k, v in self.by_id.items() if id_part in k] or [[]])
+        if cls_part is not None:
+            return self._merge([v for k, v in self.by_class.items() if cls_part in k] or [[]])
+        return self.by_name.get(name, [])
+
+    def iter_tags(self, name=None, tag_id=None, cls=None, id_part=None, cls_part=None, no_class=False, within=None):
+        """
+        Iterate tags matching all given filters.
+        :param id_part: substring of id
+        :param cls_part: substring of class string
+        :param no_class: tag has no class attribute
+        :param within: search descendants of this tag only
+        """
+        positions = self._positions(name, tag_id, cls, id_part, cls_part)
+        start, end = 0, len(positions)
+        if within is not None:
+            pos = self._pos.get(id(within))
+            if pos is None:
+                return
+            start = bisect.bisect_right(positions, pos)
+            end = bisect.bisect_right(positions, self._end[pos])
+        for i in xrange(start, end):
+            tag = self.tags[positions[i]]
+            if name is not None and tag.name != name:
+                continue
+            if no_class and tag.get('class') is not None:
+                continue
+            yield tag
+
+    def find_all(self, name=None, **kwargs):
+        return list(self.iter_tags(name, **kwargs))
+
+    def find(self, name=None, **kwargs):
+        for tag in self.iter_tags(name, **kwargs):
+            return tag
+
+
+class Record(object):
+    """
+    Compact parsed data: fixed attribute slots, no per instance dict.
+    Item access is kept for code written against the old dict records
+    """
+    __slots__ = ()
+
+    def __init__(self, *args, **kwargs):
+        for key, value in zip(self.__slots__, args):
+            setattr(self, key, value)
+        for key in self.__slots__[len(args):]:
+            setattr(self, key, kwargs.get(key))
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+    def __reduce__(self):
+        return self.__class__, tuple(getattr(self, k) for k in self.__slots__)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.__reduce__() == other.__reduce__()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def to_dict(self):
+        return dict((k, getattr(self, k)) for k in self.__slots__)
+
+
+class Method(Record):
+    """
+    Method, static function or function signature.
+    types are documented argument types in order of args, None for untyped ones, empty if no argument is typed
+    """
+    __slots__ = ('name', 'args', 'ret', 'doc', 'types')
+
+    def __repr__(self):
+        return '<Method %s%s>' % (self.name, HouModules.args_to_str(self.args))
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['name'], tuple(data['args']), data['ret'], data['doc'], tuple(data.get('types') or ()))
+
+
+class EnumValue(Record):
+    __slots__ = ('name', 'description')
+
+    def __repr__(self):
+        return '<EnumValue %s>' % self.name
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['name'], data['description'])
+
+
+class ModuleRecord(Record):
+    """
+    Parsed documentation page without page source and parse tree.
+    Produced by HouModules.record, rendered by HouModules.render_text
+    """
+    __slots__ = ('url', 'type', 'name', 'doc', 'inherits', 'methods', 'static_functions', 'function', 'enum', 'sha1')
+
+    def __repr__(self):
+        return '<HouMod %s hou.%s>' % (self.type.upper(), self.name)
+
+    def as_text(self, docs=True):
+        return HouModules.render_text(self, docs)
+
+    def to_dict(self):
+        """
+        Parsed data as json serializable dict
+        """
+        return dict(
+            url=self.url, type=self.type, name=self.name, doc=self.doc, inherits=list(self.inherits),
+            methods=[m.to_dict() for m in self.methods],
+            static_functions=[f.to_dict() for f in self.static_functions],
+            function=self.function and self.function.to_dict(),
+            enum=[e.to_dict() for e in self.enum],
+        )
+
+    @classmethod
+    def from_dict(cls, data, sha1=None):
+        return cls(
+            data['url'], data['type'], data['name'], data['doc'], tuple(data['inherits']),
+            tuple(Method.from_dict(m) for m in data['methods']),
+            tuple(Method.from_dict(f) for f in data['static_functions']),
+            data['function'] and Method.from_dict(data['function']),
+            tuple(EnumValue.from_dict(e) for e in data['enum']),
+            sha1,
+        )
+
+    def digest(self, docs=True):
+        """
+        sha1 of parsed data, same for equal api in any documentation version.
+        Page url and source sha1 are not included, doc strings only if docs
+        """
+        data = self.to_dict()
+        del data['url']
+        if not docs:
+            data['doc'] = None
+            for m in data['methods'] + data['static_functions'] + [data['function'] or {}]:
+                m['doc'] = None
+            for e in data['enum']:
+                e['description'] = None
+        return hashlib.sha1(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()
 
 
 class HouModules(object):
@@ -38,30 +237,50 @@ class HouModules(object):
         TYPES.FUNC: 2,
         TYPES.ENUM: 3
     }
+    QT_IMPORT = 'from PySide2.QtWidgets import *\n'
     cache_folder = os.path.normpath(os.path.expanduser('~/hou_help_cache'))
+    root_url = 'http://www.sidefx.com/docs/houdini/hom/hou/'
+    # root of numbered documentation versions, e.g. 17.5
+    version_root_url = 'http://www.sidefx.com/docs/houdini{version}/hom/hou/'
+    fetcher = None
+    cache = None
+    # seconds a cached page list of documentation root is used without request, None is forever
+    index_max_age = 24 * 3600
+    # use cached root page list and pages only, never send requests
+    offline = False
+    # Failure of pages skipped in current run
+    failures = []
+    # tree builder name, None is the fastest available of PARSERS
+    html_parser = None
+    PARSERS = ('lxml', 'html.parser')
+    # build only parts of page used by parser
+    strain_tree = True
+    STRAIN_CLASSES = {'title-content', 'usage_group', 'usage', 'methods_item_group', 'functions_item_group'}
+    # Stats of current run, None disables instrumentation
+    stats = None
 
-    def __init__(self, url, verbose=False, use_cache=True):
+    def __init__(self, url, verbose=False, use_cache=True, content=None):
+        """
+        Fetch and parse documentation page.
+        If content is given page is not fetched and cache is not written, caller owns the page source
+        """
         self.is_valid = False
         self._verbose = verbose
+        self.sha1 = None
         print '>>>', url
         self.soup = None
+        self.index = None
         self.url = url
         self.page_content = ''
-        from_cache = False
-        cache_file = os.path.normpath(os.path.join(self.cache_folder, os.path.basename(url)))
-        if use_cache:
-            if os.path.exists(cache_file):
-                self.verbose('From cache "%s"' % os.path.basename(cache_file))
-                self.page_content = open(cache_file).read()
-                self.soup = BeautifulSoup(self.page_content, 'html.parser')
-                from_cache = True
-        if not self.soup:
-            self.page = requests.get(url)
-            if not self.page.status_code == 200:
-                self.verbose('URL not found')
+        from_cache = content is not None
+        validators = None
+        if content is None:
+            content, from_cache, validators = self.fetch_page(url, use_cache, verbose)
+            if content is None:
                 return
-            self.page_content = self.page.content
-            self.soup = BeautifulSoup(self.page_content, 'html.parser')
+        self.page_content = content
+        with self.timer('soup', url):
+            self.soup = self.make_soup(self.page_content)
 
         self.type = ''
         self.name = ''
@@ -69,23 +288,192 @@ class HouModules(object):
         self.methods = []
         self.static_functions = []
         self.inherits = []
-        self.function = {}
+        self.function = None
         self.enum = []
         self.doc = ''
-        self.parse_element()
+        with self.timer('extract', url):
+            self.parse_element()
         if self.is_valid and self.page_content and not from_cache:
-            if not os.path.exists(os.path.dirname(cache_file)):
-                os.makedirs(os.path.dirname(cache_file))
-            if not os.path.exists(cache_file):
-                print 'Write cache: %s' % cache_file
-            cache = self.page_content
-            open(cache_file, 'w').write(cache)
+            self.write_cache(url, self.page_content, validators)
+
+    @classmethod
+    def get_fetcher(cls):
+        if cls.fetcher is None:
+            cls.fetcher = Fetcher()
+        return cls.fetcher
+
+    @classmethod
+    def get_cache(cls):
+        if cls.cache is None:
+            cls.cache = PageCache(cls.cache_folder)
+        return cls.cache
+
+    @classmethod
+    def timer(cls, stage, page=None):
+        """
+        Context manager adding time of stage to run stats
+        """
+        return cls.stats.timer(stage, page) if cls.stats is not None else NO_TIMER
+
+    @classmethod
+    def count(cls, name, value=1):
+        """
+        Add value to counter of run stats
+        """
+        if cls.stats is not None:
+            cls.stats.count(name, value)
+
+    @classmethod
+    def get_html_parser(cls):
+        """
+        Name of tree builder to use, falls back to html.parser if requested one is not installed
+        """
+        from bs4.builder import builder_registry
+        if cls.html_parser:
+            if builder_registry.lookup(cls.html_parser):
+                return cls.html_parser
+            print 'Parser "%s" is not available, use html.parser' % cls.html_parser
+            return 'html.parser'
+        for name in cls.PARSERS:
+            if builder_registry.lookup(name):
+                return name
+
+    @classmethod
+    def _strain_page(cls, name, attrs):
+        """
+        SoupStrainer filter: title, summary, content and item bodies only
+        """
+        if name not in ('h1', 'h2', 'p', 'div'):
+            return False
+        classes = attrs.get('class') or []
+        if not isinstance(classes, list):
+            classes = classes.split()
+        if name == 'h1':
+            return 'title' in classes
+        if name == 'p':
+            return 'summary' in classes
+        tag_id = attrs.get('id') or ''
+        if name == 'h2':
+            return tag_id.startswith('methods-from')
+        if tag_id == 'content' or tag_id.endswith('-body') or tag_id.startswith('methods-from'):
+            return True
+        return bool(cls.STRAIN_CLASSES.intersection(classes))
+
+    @classmethod
+    def make_soup(cls, content, strainer=None):
+        """
+        Parse html with selected tree builder. With strain_tree only parts used by parser are built
+        """
+        if strainer is None and cls.strain_tree:
+            strainer = SoupStrainer(cls._strain_page)
+        return BeautifulSoup(content, cls.get_html_parser(), parse_only=strainer)
+
+    @classmethod
+    def parser_hash(cls):
+        """
+        Hash of parser source, signature tokenizer included, incremental records of other parser code are not reused
+        """
+        sha1 = hashlib.sha1()
+        for path in (__file__, hou_signature.__file__):
+            sha1.update(open(os.path.splitext(path)[0] + '.py', 'rb').read())
+        return sha1.hexdigest()
+
+    @classmethod
+    def fetch_page(cls, url, use_cache=True, verbose=False):
+        """
+        Return (content, from_cache, validators). Content is None if page not found.
+        Stale cached pages, or all cached pages if use_cache is False, are revalidated
+        with conditional request and downloaded again only if changed on server
+        """
+        fetcher = cls.get_fetcher()
+        if fetcher.local:
+            # local source, nothing to cache
+            with cls.timer('read', url):
+                status, content, _ = fetcher.get(url)
+            if status != 200:
+                if verbose:
+                    print 'Page not found'
+                return None, True, None
+            return content, True, None
+        cache = cls.get_cache()
+        if cls.offline:
+            with cls.timer('cache_read', url):
+                content = cache.get(url)
+            if content is None:
+                cls.count('offline_missing')
+                if verbose:
+                    print 'Not in cache "%s"' % url
+            return content, True, None
+        if use_cache and cache.fresh(url):
+            with cls.timer('cache_read', url):
+                content = cache.get(url)
+            if content is not None:
+                if verbose:
+                    print 'From cache "%s"' % url
+                return content, True, None
+        validators = cache.validators(url)
+        with cls.timer('fetch', url):
+            status, content, validators = fetcher.get(url, validators)
+        if status == 304:
+            with cls.timer('cache_read', url):
+                content = cache.get(url)
+            if content is not None:
+                if verbose:
+                    print 'Not modified "%s"' % url
+                cache.touch(url)
+                return content, True, None
+            with cls.timer('fetch', url):
+                status, content, validators = fetcher.get(url)
+        if content is not None:
+            cls.count('bytes_fetched', len(content))
+        if not status == 200:
+            if verbose:
+                print 'URL not found'
+            return None, False, None
+        return content, False, validators
+
+    @classmethod
+    def write_cache(cls, url, content, validators=None):
+        cache = cls.get_cache()
+        if not cache.entry(url):
+            print 'Write cache: %s' % url
+        cache.put(url, content, validators)
+
+    def release(self):
+        """
+        Drop page source and parse tree, keep parsed data only
+        """
+        self.soup = None
+        self.index = None
+        self.page_content = ''
+
+    def record(self):
+        """
+        Compact record of parsed data, page source and parse tree are not referenced
+        """
+        return ModuleRecord(
+            self.url, self.type, self.name, self.doc, tuple(self.inherits),
+            tuple(self.methods), tuple(self.static_functions), self.function or None, tuple(self.enum), self.sha1)
+
+    def to_dict(self):
+        """
+        Parsed data as json serializable dict
+        """
+        return self.record().to_dict()
+
+    @classmethod
+    def from_dict(cls, data, sha1=None):
+        """
+        Restore parsed record without fetching and parsing the page
+        """
+        return ModuleRecord.from_dict(data, sha1)
 
     def __repr__(self):
         return '<HouMod %s hou.%s>' % (self.type.upper(), self.name)
 
     def parse_element(self):
-        title = self.soup.find('h1', {'class': 'title'}).text
+        self.index = PageIndex(self.soup)
+        title = self.index.find('h1', cls='title').text
         if not title:
             self.verbose('Title not found for %s' % self.url)
             return
@@ -103,7 +491,7 @@ class HouModules(object):
             self.type = self.TYPES.CLASS
         elif type == 'module':
             self.type = self.TYPES.MODULE
-        summary = self.soup.find('p', {'class': 'summary'})
+        summary = self.index.find('p', cls='summary')
         if summary:
             self.doc = summary.text.strip()
         get_details = True
@@ -121,7 +509,7 @@ class HouModules(object):
             # self.type = self.TYPES.MODULE
             # return
         if get_details:
-            details = self.soup.find('div', {'id': 'content', 'class': None})
+            details = self.index.find('div', tag_id='content', no_class=True)
             elems = []
             for p in details.findChildren(recursive=False):
                 if p.name == 'section':
@@ -135,32 +523,35 @@ class HouModules(object):
     def parse_methods(self):
         # self methods
         ok = False
-        have_methods = self.soup.find('div', {'id': 'methods-body'}) or self.soup.find('div', {'id': 'functions-body'})
+        index = self.index
+        have_methods = index.find('div', tag_id='methods-body') or index.find('div', tag_id='functions-body')
         if have_methods:
-            self_methods_div = self.soup.find('div', {'class': 'methods_item_group item_group'}) or self.soup.find('div', {'class': 'functions_item_group item_group'})
+            self_methods_div = (index.find('div', cls='methods_item_group item_group')
+                                or index.find('div', cls='functions_item_group item_group'))
             if self_methods_div:
-                for m in self_methods_div.find_all('div', {'class': re.compile('collapsible collapsed method item.*')}):
+                for m in index.find_all('div', cls_part='collapsible collapsed method item', within=self_methods_div):
                     if 'ni' in m['class']:
                         # skip non implemented
                         continue
-                    method_title = m.find('p', {'class': 'label'}).text
-                    description = m.find('div', {'class': 'content'}).text
-                    name, args,  ret = self.parse_method_title(method_title.strip())
+                    method_title = index.find('p', cls='label', within=m).text
+                    description = index.find('div', cls='content', within=m).text
+                    name, args, ret, types = self.parse_signature(method_title.strip())
                     if name:
-                        self.methods.append(dict(
-                            name=name,
-                            args=self.parse_args(args),
-                            ret=ret,
-                            doc=self.legal_text(description).strip()
+                        self.methods.append(Method(
+                            name,
+                            tuple(args),
+                            ret,
+                            self.legal_text(description).strip(),
+                            types
                         ))
                     else:
                         print 'Error parse "%s"' % method_title
             ok = True
 
         # inherits
-        inherit = self.soup.find('div', {'id': re.compile(r'methods-from.*')})
+        inherit = index.find('div', id_part='methods-from')
         if inherit:
-            inherit = self.soup.find_all('h2', {'id': re.compile(r'methods-from.*')})
+            inherit = index.find_all('h2', id_part='methods-from')
             for inh in inherit:
                 self.inherits.append(inh.text.split('from')[-1].strip().split('hou.')[-1])
             ok = True
@@ -168,34 +559,38 @@ class HouModules(object):
 
     def parse_static_functions(self):
         ok = False
-        functions = self.soup.find('div', {'id': 'functions-body'})
+        functions = self.index.find('div', tag_id='functions-body')
         if functions:
-            for f in functions.find_all('div', {'class': 'collapsible collapsed method item '}):
-                name, args, ret = self.parse_method_title(f['data-title'])
+            for f in self.index.find_all('div', cls='collapsible collapsed method item ', within=functions):
+                name, args, ret, types = self.parse_signature(f['data-title'])
                 if not name:
                     return None, None, None
-                description = f.find('div', {'class': 'content'}).text
-                self.static_functions.append(dict(
-                    name=name,
-                    args=self.parse_args(args),
-                    ret=ret,
-                    doc=self.legal_text(description).strip()
+                description = self.index.find('div', cls='content', within=f).text
+                self.static_functions.append(Method(
+                    name,
+                    tuple(args),
+                    ret,
+                    self.legal_text(description).strip(),
+                    types
                 ))
             ok = True
         return ok
 
     def parse_single_function(self):
-        usage = self.soup.find('div', {'class': 'usage_group'})
+        index = self.index
+        usage = index.find('div', cls='usage_group')
+        content_div = index.find('div', tag_id='content')
         if usage:
-            title = usage.find('p', {'class': 'label'}).text.strip()
-            doc = [p.text for p in self.soup.find('div', {'id': 'content'}).find_all('p', {'class': None})]
-            name, args, ret = self.parse_method_title(title)
+            title = index.find('p', cls='label', within=usage).text.strip()
+            doc = [p.text for p in index.find_all('p', no_class=True, within=content_div)]
+            name, args, ret, types = self.parse_signature(title)
             if name:
-                self.function = dict(
-                    name=name,
-                    args=self.parse_args(args),
-                    ret=ret,
-                    doc=self.legal_text('\n'.join(doc)).strip()
+                self.function = Method(
+                    name,
+                    tuple(args),
+                    ret,
+                    self.legal_text('\n'.join(doc)).strip(),
+                    types
                 )
                 self.name = name
                 # self.doc = doc
@@ -203,27 +598,28 @@ class HouModules(object):
                 print 'Error get name', title
             return True
         else:
-            content = self.soup.find('div', {'class': 'title-content '})
+            content = index.find('div', cls='title-content ')
             if content:
                 # title = content.find('h1', {'class': 'title'}).text.strip()
-                summary = content.find('p', {'class': 'summary'})
+                summary = index.find('p', cls='summary', within=content)
                 if summary:
                     summary = summary.text.strip()
                 else:
                     summary = ''
-                pp = (self.soup.find('div', {'id': 'content'}).find('usage')
-                      or self.soup.find('div', {'class': 'usage item'})
-                      or self.soup.find('div', {'id': 'content'})).find_all('p')
+                pp = index.find_all('p', within=(index.find('usage', within=content_div)
+                                                  or index.find('div', cls='usage item')
+                                                  or content_div))
                 pp = [p.text.strip() for p in pp if p.text.strip()]
                 usage = pp.pop(0)
-                name, args, ret = self.parse_method_title(usage)
-                docs = '\n'.join(pp + [x.text for x in self.soup.find('div', {'id': 'content'}).find_all('pre')])
+                name, args, ret, types = self.parse_signature(usage)
+                docs = '\n'.join(pp + [x.text for x in index.find_all('pre', within=content_div)])
                 docs = summary + '\n\n' + docs
-                self.function = dict(
-                    name=name,
-                    args=self.parse_args(args),
-                    ret=ret,
-                    doc=self.legal_text(docs).strip()
+                self.function = Method(
+                    name,
+                    tuple(args),
+                    ret,
+                    self.legal_text(docs).strip(),
+                    types
                 )
                 self.doc = docs
             self.doc = ''
@@ -232,28 +628,26 @@ class HouModules(object):
 
     def parse_enum(self):
         ok = False
-        values = self.soup.find('div', {'id': 'values-body'})
+        index = self.index
+        values = index.find('div', tag_id='values-body')
         if values:
             # http://www.sidefx.com/docs/houdini/hom/hou/saveMode
             # enumerate
-            items = values.find_all('div', {'class': 'values_item item def'})
+            items = index.find_all('div', cls='values_item item def', within=values)
             if items:
                 ok = True
                 for el in items:
-                    name = el.find('p', {'class': 'label'}).text.strip().strip('.')
-                    description = el.find('div', {'class': 'content'})
+                    name = index.find('p', cls='label', within=el).text.strip().strip('.')
+                    description = index.find('div', cls='content', within=el)
                     if description:
                         description = description.text.replace('\n\n', '\n')
-                    self.enum.append(dict(
-                        name=name,
-                        description=description.strip()
-                    ))
+                    self.enum.append(EnumValue(name, description.strip()))
             else:
-                items = values.find_all('li')
+                items = index.find_all('li', within=values)
                 if items:
                     ok = True
                     for li in items:
-                        pp = li.find_all('p')
+                        pp = index.find_all('p', within=li)
                         if pp:
                             name = pp.pop(0)
                             name = name.text.strip().split('.')[-1]
@@ -261,181 +655,212 @@ class HouModules(object):
                                 description = pp[0].text
                             else:
                                 description = ''
-                            self.enum.append(dict(
-                                name=name,
-                                description=description.strip()
-                            ))
+                            self.enum.append(EnumValue(name, description.strip()))
                         else:
                             print 'Wrong Enum parsing'
-        summary = self.soup.find('p', {'class': 'summary'})
+        summary = index.find('p', cls='summary')
         if summary:
             self. doc = summary.text
-        docs = self.soup.find('div', {'id': 'content'})
+        docs = index.find('div', tag_id='content')
         if docs:
             doc = '\n'.join([x.text for x in docs.find_all('p', {'class': None}, recursive=False)])
             self.doc = self.doc + '\n' + doc
         return ok
 
     @classmethod
-    def parse_method_title(cls, title):
-        title = re.sub(r'[^\x00-\x7F]', '==', title)
-        title = re.sub(r'->', '==', title)
-        title = cls.legal_text(title).replace('\n', ' ').strip()
-        name, args, ret = None, None, None
-        if '==' in title:
-            deff, ret = title.split('==')
-        else:
-            deff, ret = title, ''
-        # m = re.match(r"(\w+)(\(.*?\))[\s=]*([\w\s.]*)$", title)
-        # m = re.search(r"(\w+)(\(.*\))[\s=]*?(.*)", title)
-        m = re.search(r"(\w+)(\(.*\))", deff)
-        if m:
-            name, args = [x.strip().strip(':') for x in m.groups()]
-        return name, args, ret
+    @timed('signature')
+    def parse_signature(cls, title):
+        """
+        (name, argument strings, return, argument types) of method title in one scan,
+        name is None if title has no argument list. Types are as in Method.types, without Hom and hou prefixes
+        """
+        signature = hou_signature.parse_signature(title)
+        if signature.name is None:
+            return None, None, signature.ret, ()
+        types = ()
+        if any(a.type for a in signature.args):
+            types = tuple(a.type and cls.clean_hom(a.type) for a in signature.args)
+        return signature.name, [cls.arg_text(a) for a in signature.args], signature.ret, types
 
     @classmethod
-    def parse_return(cls, line):
-        line = line.replace('=', '').strip().replace('`', '')
+    def parse_method_title(cls, title):
+        """
+        (name, argument list text, return) of method title
+        """
+        signature = hou_signature.parse_signature(title)
+        return signature.name, signature.args_text, signature.ret
+
+    # Return type rules: (name, compiled matcher, handler(cls, match, line)).
+    # Applied in order, first handler result which is not None wins
+    RETURN_RULES = [
         # int , float , str or tuple
-        if re.match(r"(.+,)+\s*\w+\s*or\s*\w+", line):
-            return 'object'
+        ('several types', re.compile(r"(.+,)+\s*\w+\s*or\s*\w+").match,
+         lambda cls, m, line: 'object'),
         # single class
-        m = re.match(r"^hou.(\w+)$", line)
-        if m:
-            return m.group(1)
+        ('class', re.compile(r"^hou.(\w+)$").match,
+         lambda cls, m, line: m.group(1)),
         # class or none
-        m = re.match(r"([\w.]+)\s+or\s+(None|none)", line)
-        if m:
-            return cls.type_to_data(m.group(1))
+        ('class or none', re.compile(r"([\w.]+)\s+or\s+(None|none)").match,
+         lambda cls, m, line: cls.type_to_data(m.group(1))),
         # tuple of enums
-        m = re.match(r"tuple\s*of\s*([\w._]+)\s+enum\s+values", line)
-        if m:
-            return '(EnumValue, )'
+        ('tuple of enums', re.compile(r"tuple\s*of\s*([\w._]+)\s+enum\s+values").match,
+         lambda cls, m, line: '(EnumValue, )'),
         # tuple of []
-        m = re.match(r"tuple\s*of\s*\[Hom:([\w._]+)\]", line)
-        if m:
-            return '(%s, )' % cls.type_to_data(m.group(1))
+        ('tuple of hom', re.compile(r"tuple\s*of\s*\[Hom:([\w._]+)\]").match,
+         lambda cls, m, line: '(%s, )' % cls.type_to_data(m.group(1))),
         # tuple of
-        m = re.match(r"tuple\s*of\s*([\w._]+)", line)
-        if m:
-            return '(%s, )' % cls.type_to_data(m.group(1))
+        ('tuple of', re.compile(r"tuple\s*of\s*([\w._]+)").match,
+         lambda cls, m, line: '(%s, )' % cls.type_to_data(m.group(1))),
         # tuple ot tuples
-        m = re.match(r"\(\s*tuple\s+of\s+([\w._]+)\s*,\s+tuple\s+of\s+tuples\s+of\s+([\w._]+).*", line)
-        if m:
-            return '(%s, ((%s,),))' % (cls.type_to_data(m.group(1)), cls.type_to_data(m.group(2)))
+        ('tuple of tuples', re.compile(
+            r"\(\s*tuple\s+of\s+([\w._]+)\s*,\s+tuple\s+of\s+tuples\s+of\s+([\w._]+).*").match,
+         lambda cls, m, line: '(%s, ((%s,),))' % (cls.type_to_data(m.group(1)), cls.type_to_data(m.group(2)))),
         # tuple ot tuples 2
-        m = re.search(r"tuple\s+of\s+\(([\w\s.,_]+)+\)", line)
-        if m:
-            vals = [cls.type_to_data(x.strip()) for x in m.group(1).split(',')]
-            return '((%s,),)' % ', '.join(vals)
+        ('tuple of group', re.compile(r"tuple\s+of\s+\(([\w\s.,_]+)\)").search,
+         lambda cls, m, line: '((%s,),)' % ', '.join([cls.type_to_data(x.strip()) for x in m.group(1).split(',')])),
         # hou.primType enum value
-        m = re.match(r"([\[\]:\w.]+)\s+enum\s+value", line)
-        if m:
-            return 'EnumValue'  # type_to_data(m.group(1))
-        m = re.match(r"dict\s+of\s+([\w.]+)\s+to\s+([\w.]+)", line)
-        if m:
-            return '{%s: %s}' % (cls.type_to_data(m.group(1)), cls.type_to_data(m.group(2)))
-        m = re.match(r"dict\s+of\s+[\s\w\[\].:]+\s+enum\s+value\s+to\s+([\w.]+)", line)
-        if m:
-            return '{EnumValue: %s}' % cls.type_to_data(m.group(1))
-        m = re.search(r"(dict|dictionary)\s+mapping\s+\w+\s+to\s+\w+", line)
-        if m:
-            return '{"": ""}'
-        m = re.match(r"\(([\s\w,._]+)\)", line)
-        if m and ',' in line:
-            args = [cls.type_to_data(x.strip()) for x in m.group(1).split(',')]
-            return '(%s,)' % ', '.join(args)
-        m = re.match(r"dictionary\s+of\s+\((([\w\/.]+)\s?\,\s?tuple\s+of\s+([\w.]+))\)\s+pairs", line)
-        if m:
-            k, v = m.group(2).split('/')[-1], m.group(3)
-            return '{%s: (%s, )}' % (cls.type_to_data(k), cls.type_to_data(v))
-        m = re.match(r".*(Q[\w]+)\s+subclass", line)
-        if m:
-            # need to import QWidget to script
-            return m.group(1)
-        m = re.match(r"\(([\w.+]+)\s*,\s*tuple\s+of\s+([\w._]+)\)", line)
-        if m:
-            k, v = m.groups()
-            return '(%s, (%s,))' % (cls.type_to_data(k), cls.type_to_data(v))
-        m = re.match(r"\(([\w.+]+)\s*,\s*tuple\s+of\s+([\w._]+)\s+and\s+([\w._]+)\s+tuples\)", line)
-        if m:
-            v1, v2, v3 = m.groups()
-            return '(%s, (%s (%s,),))' % (cls.type_to_data(v1), cls.type_to_data(v2), cls.type_to_data(v3))
-        variants = [x.strip().strip(',') for x in re.findall(r"([\w.]+\s*,?\s*)", line)]
-        if 'or' in variants:
-            return 'object'
-        return cls.type_to_data(line)
+        ('enum value', re.compile(r"([\[\]:\w.]+)\s+enum\s+value").match,
+         lambda cls, m, line: 'EnumValue'),
+        ('dict of', re.compile(r"dict\s+of\s+([\w.]+)\s+to\s+([\w.]+)").match,
+         lambda cls, m, line: '{%s: %s}' % (cls.type_to_data(m.group(1)), cls.type_to_data(m.group(2)))),
+        ('dict of enum', re.compile(r"dict\s+of\s+[\s\w\[\].:]+\s+enum\s+value\s+to\s+([\w.]+)").match,
+         lambda cls, m, line: '{EnumValue: %s}' % cls.type_to_data(m.group(1))),
+        ('dict mapping', re.compile(r"(dict|dictionary)\s+mapping\s+\w+\s+to\s+\w+").search,
+         lambda cls, m, line: '{"": ""}'),
+        ('tuple', re.compile(r"\(([\s\w,._]+)\)").match,
+         lambda cls, m, line: '(%s,)' % ', '.join([cls.type_to_data(x.strip()) for x in m.group(1).split(',')])
+         if ',' in line else None),
+        ('dict of pairs', re.compile(
+            r"dictionary\s+of\s+\((([\w\/.]+)\s?\,\s?tuple\s+of\s+([\w.]+))\)\s+pairs").match,
+         lambda cls, m, line: '{%s: (%s, )}' % (cls.type_to_data(m.group(2).split('/')[-1]),
+                                                cls.type_to_data(m.group(3)))),
+        # need to import QWidget to script
+        ('qt subclass', re.compile(r".*(Q[\w]+)\s+subclass").match,
+         lambda cls, m, line: m.group(1)),
+        ('pair with tuple', re.compile(r"\(([\w.+]+)\s*,\s*tuple\s+of\s+([\w._]+)\)").match,
+         lambda cls, m, line: '(%s, (%s,))' % (cls.type_to_data(m.group(1)), cls.type_to_data(m.group(2)))),
+        ('pair with tuples', re.compile(
+            r"\(([\w.+]+)\s*,\s*tuple\s+of\s+([\w._]+)\s+and\s+([\w._]+)\s+tuples\)").match,
+         lambda cls, m, line: '(%s, (%s (%s,),))' % tuple(cls.type_to_data(x) for x in m.groups())),
+        ('alternatives', lambda line: 'or' in [x.strip().strip(',') for x in HouModules._WORDS_RE.findall(line)],
+         lambda cls, m, line: 'object'),
+    ]
+    _WORDS_RE = re.compile(r"([\w.]+\s*,?\s*)")
+    # memo of parse_return, normalized return string: value
+    _return_cache = {}
+    RETURN_RULE_HITS = collections.Counter()
+
+    @classmethod
+    @timed('returns')
+    def parse_return(cls, line):
+        line = line.replace('=', '').strip().replace('`', '')
+        try:
+            ret = cls._return_cache[line]
+            cls.RETURN_RULE_HITS['(cached)'] += 1
+            return ret
+        except KeyError:
+            pass
+        stats = cls.stats
+        for name, matcher, handler in cls.RETURN_RULES:
+            if stats is not None:
+                start = time.time()
+            m = matcher(line)
+            ret = handler(cls, m, line) if m else None
+            if stats is not None:
+                stats.add_rule(name, time.time() - start)
+            if ret is not None:
+                break
+        else:
+            name, ret = 'type', cls.type_to_data(line)
+        cls.RETURN_RULE_HITS[name] += 1
+        cls._return_cache[line] = ret
+        return ret
+
+    @classmethod
+    def reset_return_stats(cls):
+        cls._return_cache.clear()
+        cls.RETURN_RULE_HITS.clear()
+
+    @classmethod
+    def print_return_stats(cls):
+        """
+        Print how many return strings every rule resolved, memo hits are "(cached)"
+        """
+        total = sum(cls.RETURN_RULE_HITS.values()) or 1
+        for name, count in cls.RETURN_RULE_HITS.most_common():
+            print '%-18s %8s %5.1f%%' % (name, count, 100.0 * count / total)
 
     @classmethod
     def parse_args(cls, args):
-        nargs = []
-        args = args.strip()
-        if args[0] == '(':
-            args = args[1:]
-        if args[-1] == ')':
-            args = args[:-1]
-        if not args.strip():
-            return nargs
-        s = re.search(r"=\s*(hou.([\w+]+)\(\(.*?\)\))", args)
-        if s:
-            args = args.replace(s.group(1), s.group(2))
-        r = re.search(r"(\w+)\s?=\s?\([\s\w.,]+\)", args)
-        if r:
-            args = args.replace(r.group(0), r.group(1))
-        m = re.search(r"(\w+)=\(['\"*,]+\)", args)
-        if m:
-            args = args.replace(m.group(0), m.group(1)+'=None')
-
-        for a in args.split(','):
-            a = a.strip().replace('Hom:hou.', '').replace('hou.', '').replace('Hom.', '').replace('Hom:', '')
-            if '=' in a:
-                name, val = a.split('=')
-                name = name.strip()
-                val = val.strip()
-                if ' ' in name:
-                    name = name.split(' ')[-1]
-                nargs.append('%s=%s' % (name.strip(), cls.type_to_data(val)))
-                continue
-            if '[' in a or ']' in a:
-                a = a.replace('[', '').replace(']', '').replace('::', ".").replace(':', ".").split('hou.')[-1]
-                nargs.append(a)
-                continue
-            if ' ' in a:
-                a = a.split()[-1]
-            nargs.append(a)
-        return nargs
+        """
+        Argument strings of argument list text, see arg_text
+        """
+        return [cls.arg_text(a) for a in hou_signature.parse_arguments(args)]
+
+    # default values of argument: hou.Vector3((0, 0, 0)) is Vector3, tuple of words or numbers is left out,
+    # tuple of quotes and stars is None, calls and tuples with commas inside are the class and tuple()
+    HOM_CALL_DEFAULT_RE = re.compile(r"hou.([\w+]+)\(\(.*?\)\)$")
+    WORDS_TUPLE_DEFAULT_RE = re.compile(r"\([\s\w.,]+\)$")
+    STARS_TUPLE_DEFAULT_RE = re.compile(r"\(['\"*,]+\)$")
+    CALL_DEFAULT_RE = re.compile(r"(?:Hom:)?hou\.([\w.]+)\(.*[,=].*\)$")
+
+    @classmethod
+    def arg_text(cls, arg):
+        """
+        Stub argument of hou_signature.Argument: name or name=value
+        """
+        default = arg.default
+        if default is not None and '(' in default:
+            m = cls.HOM_CALL_DEFAULT_RE.match(default) or cls.CALL_DEFAULT_RE.match(default)
+            if m:
+                default = m.group(1)
+            elif cls.WORDS_TUPLE_DEFAULT_RE.match(default):
+                return cls.clean_hom(arg.name)
+            elif cls.STARS_TUPLE_DEFAULT_RE.match(default):
+                default = 'None'
+            elif default.startswith('(') and ',' in default:
+                return '%s=tuple()' % cls.clean_hom(arg.name)
+        if default is not None:
+            return '%s=%s' % (cls.clean_hom(arg.name), cls.type_to_data(cls.clean_hom(default)))
+        if arg.type:
+            # Hom:hou.Node node, [Hom:hou.ParmTemplate] parm_template
+            return cls.clean_hom(arg.name)
+        text = cls.clean_hom(arg.text)
+        if '[' in text or ']' in text:
+            return text.replace('[', '').replace(']', '').replace('::', ".").replace(':', ".").split('hou.')[-1]
+        return text
+
+    @staticmethod
+    def clean_hom(text):
+        if 'hou.' not in text and 'Hom' not in text:
+            return text
+        return text.replace('Hom:hou.', '').replace('hou.', '').replace('Hom.', '').replace('Hom:', '')
+
+    TYPE_VALUES = {
+        'double': '0.0', 'float': '0.0', 'floats': '0.0',
+        'int': '0', 'start': '0', 'end': '0', 'integer': '0',
+        'bool': 'True', 'Boolean': 'True', 'true': 'True', 'True': 'True', 'false': 'True', 'False': 'True',
+        'string': '""', 'str': '""', 'strings': '""',
+        'dict': '{}', '{}': '{}', 'dictionary': '{}', 'dictionaries': '{}',
+        'parm': 'Parm',
+        '()': 'tuple()',
+        'Nodes': 'Node',
+        'Vector3s': 'Vector3',
+        'value': 'object', 'values': 'object',
+    }
 
     @classmethod
     def type_to_data(cls, line):
         line = line.replace('=', '').replace('::', '.').replace(':', '.').strip()
         if not line:
             return 'None'
-        if line in ['double', 'float', 'floats']:
-            return '0.0'
-        elif line in ['int', 'start', 'end', 'integer']:
-            return '0'
-        elif line in ['bool', 'Boolean', 'true', 'True', 'false', 'False']:
-            return 'True'
-        elif line in ['string', 'str', 'strings']:
-            return '""'
-        elif line in ['dict', '{}', 'dictionary', 'dictionaries']:
-            return '{}'
-        elif line == 'parm':
-            return 'Parm'
-        elif line == '()':
-            return 'tuple()'
-        elif line == 'Nodes':
-            return 'Node'
-        elif line == 'Vector3s':
-            return 'Vector3'
-
-        elif line.startswith('hou.') or 'hou.' in line:
-            return line.split('hou.')[-1]
-        elif line.startswith('Hom.') or 'Hom.' in line:
+        value = cls.TYPE_VALUES.get(line)
+        if value is not None:
+            return value
+        elif 'hou.' in line:
             return line.split('hou.')[-1]
-        elif line.strip() in ['value', 'values']:
-            return 'object'
-
+        elif 'Hom.' in line:
+            return line
         elif line[0].istitle():
             return line
         else:
@@ -445,11 +870,19 @@ class HouModules(object):
         if self._verbose:
             print ' '.join([str(x) for x in args])
 
+    NON_ASCII_RE = re.compile(r'[^\x00-\x7F]')
+    NEW_LINES_RE = re.compile(r"(\n)+")
+
     @classmethod
     def legal_text(cls, text):
-        text = re.sub(r'[^\x00-\x7F]', ' ', text)
-        text = re.sub(r"(\n)+", r"\n", text).strip()
-        return text
+        # most doc strings are ascii without blank lines, skip substitutions which change nothing
+        try:
+            text.encode('ascii')
+        except UnicodeError:
+            text = cls.NON_ASCII_RE.sub(' ', text)
+        if '\n\n' in text:
+            text = cls.NEW_LINES_RE.sub('\n', text)
+        return text.strip()
 
     @classmethod
     def add_self_to_args(cls, args, s='self'):
@@ -478,217 +911,961 @@ class HouModules(object):
         return (' ' * indent) + offs
 
     def as_text(self, docs=True):
-        text = ''
-        #################### CLASS
-        if self.type == self.TYPES.CLASS or self.type == self.TYPES.MODULE:
-            if docs:
-                d = '%s\n%s' % (
-                    self.legal_text(self.doc),
-                    self.url
-                )
-            else:
-                d = ''
-            text += """
-class {name}({inherit}):
-{doc}
-""".format(
-                name=self.name,
-                inherit=', '.join([x.split('.')[-1] for x in self.inherits]),
-                # doc=d
-                doc=self.to_doc_string(d, 4)
-            )
-            if self.methods or self.static_functions:
-                for m in self.methods:
-                    if docs:
-                        d = '%s\nreturn %s' % (
-                            self.legal_text(m['doc']).strip(),
-                            m['ret'].replace('=', '').strip()
-                        )
-                    else:
-                        d = ''
-                    if m['name'] == '__init__':
-                        ret = 'pass'
-                    else:
-                        ret = 'return '+self.parse_return(m['ret'])
-                    text += """
-    def {name}{args}:
-{doc}
-        {parse_ret}
-    """.format(
-                        name=m['name'],
-                        args=self.args_to_str(m['args'], 'self'),
-                        doc=self.to_doc_string(d, 8),
-                        parse_ret=ret
-                    )
-                for f in self.static_functions:
-                    if docs:
-                        d = '%s\nreturn %s' % (
-                            self.legal_text(f['doc'].replace('"""', "'''")).strip(),
-                            f['ret'].replace('=', '').strip()
-                        )
-                    else:
-                        d = ''
-                    text += """
-    @classmethod
-    def {name}{args}:
-{doc}
-        return {parse_ret}
-    """.format(
-                        name=f['name'],
-                        args=self.args_to_str(f['args'], 'cls'),
-                        doc=self.to_doc_string(d, 8),
-                        parse_ret=self.parse_return(f['ret'])
-                    )
-            else:
-                text += '    pass'
-        ##################### MODULE
-#         elif self.type == self.TYPES.MODULE:
-#             if docs:
-#                 d = '%s\n%s' % (
-#                     self.legal_text(self.doc.replace('"""', "'''")).strip(),
-#                     self.url
-#                 )
-#                 d = self.to_doc_string(d)
-#             else:
-#                 d = 'pass\n'
-#             text += """
-# class {name}({inherit}):
-#     {doc}
-# """.format(
-#                 name=self.name,
-#                 inherit=', '.join([x.split('.')[0] for x in self.inherits]),
-#                 doc=d
-#             )
-        ########################### FUNCTION
-        elif self.type == self.TYPES.FUNC:
-            if isinstance(self.doc, list):
-                self.doc = '\n'.join(self.doc)
-
-            if docs:
-                d = '%s\n' \
-                    '%s\n' \
-                    '%s\n' \
-                    'return %s' % (
-                        self.url,
-                        self.legal_text(self.doc),
-                        self.legal_text(self.function['doc'].replace('"""', "'''")).strip(),
-                        self.function['ret'].replace('=', '').strip()
-                    )
-            else:
-                d = ''
-
-            text += """
-def {name}{args}:
-{doc}    
-    return {parse_ret}
-""".format(
-                name=self.function['name'],
-                args=self.args_to_str(self.function['args']),
-                doc=self.to_doc_string(d),
-                parse_ret=self.parse_return(self.function['ret'])
-            )
-        ########################## ENUM
-        elif self.type == self.TYPES.ENUM:
-            d = ''
-            if docs:
-                d = '%s\n' \
-                    '%s' % (
-                        self.doc,
-                        self.url
-                    )
-            text += """
-class {name}:
-{doc}
-{enum}
-""".format(
-                name=self.name,
-                doc=self.to_doc_string(d),
-                enum='\n'.join(['    {name} = EnumValue'.format(name=x['name']) +
-                                ('\n    # {doc}'.format(doc=self.legal_text(x['description'].replace('\n', '\n    # ').replace('"""', "'''")).strip())
-                                 if (x['description'].strip() and docs)else '') for x in self.enum])
-            )
-        return text
+        return self.render_text(self.record(), docs)
+
+    @classmethod
+    def render_text(cls, record, docs=True):
+        """
+        Source text of parsed record, with doc strings or only source url
+        """
+        return cls.render_blocks(record, (docs,))[0]
+
+    @classmethod
+    def render_blocks(cls, record, targets=(True, False)):
+        """
+        Source text of parsed record for every target in one pass, target is docs flag of render_text.
+        Argument strings and returns are computed once per method for all targets,
+        text of every target is collected in a list and joined once
+        """
+        sinks = [[] for _ in targets]
+        with_docs = [i for i, docs in enumerate(targets) if docs]
+
+        def write(text, doc_text=None):
+            """
+            Append text to every target, doc_text to targets with docs if given
+            """
+            for i, sink in enumerate(sinks):
+                sink.append(doc_text if doc_text is not None and targets[i] else text)
+
+        def method_doc(m):
+            return '%s\nreturn %s' % (cls.legal_text(m.doc.replace('"""', "'''")).strip(), m.ret.replace('=', '').strip())
+
+        if record.type == cls.TYPES.CLASS or record.type == cls.TYPES.MODULE:
+            head = '\nclass %s(%s):\n' % (record.name, ', '.join([x.split('.')[-1] for x in record.inherits]))
+            doc = cls.to_doc_string('%s\n%s' % (cls.legal_text(record.doc), record.url), 4) if with_docs else ''
+            write(head + '\n', head + doc + '\n')
+            for m in record.methods:
+                head = '\n    def %s%s:\n' % (m.name, cls.args_to_str(m.args, 'self'))
+                tail = '\n        %s\n    ' % ('pass' if m.name == '__init__' else 'return ' + cls.parse_return(m.ret))
+                write(head + tail, with_docs and head + cls.to_doc_string(method_doc(m), 8) + tail or None)
+            for f in record.static_functions:
+                head = '\n    @classmethod\n    def %s%s:\n' % (f.name, cls.args_to_str(f.args, 'cls'))
+                tail = '\n        return %s\n    ' % cls.parse_return(f.ret)
+                write(head + tail, with_docs and head + cls.to_doc_string(method_doc(f), 8) + tail or None)
+            if not record.methods and not record.static_functions:
+                write('    pass')
+        elif record.type == cls.TYPES.FUNC:
+            f = record.function
+            head = '\ndef %s%s:\n' % (f.name, cls.args_to_str(f.args))
+            tail = '    \n    return %s\n' % cls.parse_return(f.ret)
+            doc = None
+            if with_docs:
+                text = '\n'.join(record.doc) if isinstance(record.doc, list) else record.doc
+                doc = cls.to_doc_string('%s\n%s\n%s' % (record.url, cls.legal_text(text), method_doc(f)))
+            write(head + tail, doc is not None and head + doc + tail or None)
+        elif record.type == cls.TYPES.ENUM:
+            head = '\nclass %s:\n' % record.name
+            doc = cls.to_doc_string('%s\n%s' % (record.doc, record.url)) if with_docs else ''
+            values = ['    %s = EnumValue' % x.name for x in record.enum]
+            write(head + '\n' + '\n'.join(values) + '\n', with_docs and head + doc + '\n' + '\n'.join(
+                v + ('\n    # %s' % cls.legal_text(x.description.replace('\n', '\n    # ').replace('"""', "'''")).strip()
+                     if x.description.strip() else '') for v, x in zip(values, record.enum)) + '\n' or None)
+        return [''.join(sink) for sink in sinks]
+
+    @classmethod
+    def render_records(cls, records, sinks):
+        """
+        Write output of records to several sinks in one pass over records.
+        sinks is a list of (file object, docs), every file gets QT_IMPORT and blocks of its target
+        """
+        targets = tuple(docs for _, docs in sinks)
+        for f, _ in sinks:
+            f.write(cls.QT_IMPORT)
+        for i, record in enumerate(records):
+            for (f, _), text in zip(sinks, cls.render_blocks(record, targets)):
+                if i:
+                    f.write('\n')
+                f.write(text.encode('utf-8'))
+
+    @classmethod
+    def write_outputs(cls, records, out):
+        """
+        Write hou_full.py and hou_min.py of ordered records to out folder, returns their paths
+        """
+        if not os.path.exists(out):
+            os.makedirs(out)
+        result = [os.path.join(out, 'hou_full.py'), os.path.join(out, 'hou_min.py')]
+        with open(result[0], 'wb') as full, open(result[1], 'wb') as short:
+            cls.render_records(records, [(full, True), (short, False)])
+        return result
 
     @staticmethod
-    def sort_classes(classes):
-        next = True
-        i = 0
-        while next and i < 1000:
-            i += 1
-            for curr_cls in classes:
-                for cls in classes:
-                    if cls.name == curr_cls.name:
-                        continue
-                    if curr_cls.name in cls.inherits:
-                        if classes.index(curr_cls) > classes.index(cls):
-                            cur = classes.pop(classes.index(curr_cls))
-                            print 'Move', cur
-                            classes.insert(classes.index(cls) - 1, cur)
-                            break
-                    next = False
-            else:
-                next = False
-        return classes
+    def inheritance_graph(classes):
+        """
+        Return {class name: [base class names]} for list of class modules
+        """
+        graph = {}
+        for c in classes:
+            bases = graph.setdefault(c.name, [])
+            for base in c.inherits:
+                base = base.split('.')[-1]
+                if base not in bases:
+                    bases.append(base)
+        return graph
+
+    @staticmethod
+    def class_order(graph):
+        """
+        Topological order of inheritance graph {name: [bases]}, base classes first.
+        Classes with no order between them are sorted by name.
+        Returns (names, missing, cycles): missing is {class name: [bases not in graph]},
+        cycles is sorted list of class names that inherit each other, they are appended to the end by name
+        """
+        import heapq
+        missing = {}
+        children = {}
+        pending = {}
+        for name, bases in graph.items():
+            pending[name] = 0
+            for base in bases:
+                if base not in graph:
+                    missing.setdefault(name, []).append(base)
+                    continue
+                children.setdefault(base, []).append(name)
+                pending[name] += 1
+        ready = [name for name, count in pending.items() if not count]
+        heapq.heapify(ready)
+        names = []
+        while ready:
+            name = heapq.heappop(ready)
+            names.append(name)
+            for child in children.get(name, ()):
+                pending[child] -= 1
+                if not pending[child]:
+                    heapq.heappush(ready, child)
+        cycles = sorted(name for name, count in pending.items() if count)
+        return names + cycles, missing, cycles
 
     @classmethod
-    def parse_help(cls, verbose=False, as_text=True, save_cache=True):
-        import time, datetime
-        _start = time.time()
-        root_url = 'http://www.sidefx.com/docs/houdini/hom/hou/'
-        page = requests.get(root_url)
-        s = BeautifulSoup(page.content, 'html.parser')
-        hou_modules = []
+    def sort_classes(cls, classes):
+        """
+        Sort classes so every base class comes before its subclasses.
+        Missing base classes and inheritance cycles are reported
+        """
+        names, missing, cycles = cls.class_order(cls.inheritance_graph(classes))
+        for name in sorted(missing):
+            print 'Missing base class for %s: %s' % (name, ', '.join(missing[name]))
+        if cycles:
+            print 'Inheritance cycle: %s' % ', '.join(cycles)
+        by_name = {}
+        for c in classes:
+            by_name.setdefault(c.name, []).append(c)
+        return [c for name in names for c in by_name[name]]
+
+    @staticmethod
+    def class_mro(graph, names):
+        """
+        {name: method resolution order} of inheritance graph, names in class_order.
+        Classes without consistent order (C3 linearization fails, inheritance cycles) are left out,
+        missing base classes have no bases
+        """
+        result = {}
+        for name in names:
+            bases = graph.get(name, ())
+            if any(b in graph and b not in result for b in bases):
+                continue
+            sequences = [list(result.get(b, [b])) for b in bases] + [list(bases)]
+            mro = [name]
+            while True:
+                sequences = [x for x in sequences if x]
+                if not sequences:
+                    result[name] = mro
+                    break
+                for seq in sequences:
+                    head = seq[0]
+                    if not any(head in x[1:] for x in sequences):
+                        break
+                else:
+                    break
+                mro.append(head)
+                for seq in sequences:
+                    if seq[0] == head:
+                        del seq[0]
+        return result
+
+    @classmethod
+    def records_mro(cls, records):
+        """
+        {name: method resolution order} of classes and modules of records, the order python gives
+        the generated stubs. Names defined more than once and classes without consistent order are left out
+        """
+        types = cls.TYPES
+        classes = [r for r in records if r.type in (types.CLASS, types.MODULE)]
+        names = collections.Counter(r.name for r in classes)
+        graph = cls.inheritance_graph([r for r in classes if names[r.name] == 1])
+        return cls.class_mro(graph, cls.class_order(graph)[0])
+
+    @classmethod
+    def dedup_methods(cls, records):
+        """
+        Records without methods and static functions equal (name, arguments, return and doc) to the one
+        the class inherits anyway. A member is dropped only if no subclass resolves it to another method after that,
+        so the api of every class is the same. Returns new list, changed records get new sha1
+        """
+        types = cls.TYPES
+        classes = [r for r in records if r.type in (types.CLASS, types.MODULE)]
+        names = collections.Counter(r.name for r in classes)
+        graph = cls.inheritance_graph([r for r in classes if names[r.name] == 1])
+        order = cls.class_order(graph)[0]
+        mro = cls.class_mro(graph, order)
+        # {class: {name: (kind, Method)}}, last definition wins as in python
+        own = {}
+        # names defined more than once in the same class are kept
+        repeated = collections.defaultdict(set)
+        for r in classes:
+            if r.name in mro:
+                members = own[r.name] = {}
+                for kind, items in (('method', r.methods), ('static', r.static_functions)):
+                    for m in items:
+                        if m.name in members:
+                            repeated[r.name].add(m.name)
+                        members[m.name] = (kind, m)
+        # subclasses which mro continues after base with other classes than mro of base,
+        # only there dropping a member of base can change what is resolved
+        tangled = collections.defaultdict(list)
+        for name, linear in mro.items():
+            for i, base in enumerate(linear[1:], 1):
+                if base in mro and linear[i:] != mro[base]:
+                    tangled[base].append(name)
+
+        def resolve(name, member, skip=None):
+            for owner in mro[name]:
+                if owner != skip and member in own.get(owner, ()):
+                    return own[owner][member]
+
+        dropped = {}
+        for name in order:
+            if name not in mro:
+                continue
+            # only names defined in a base class can be inherited
+            inherited = set().union(*[own[base] for base in mro[name][1:] if base in own])
+            for member in sorted(inherited.intersection(own[name])):
+                if member in repeated[name] or resolve(name, member, name) != own[name][member]:
+                    continue
+                if all(resolve(sub, member) == resolve(sub, member, name) for sub in tangled[name]):
+                    del own[name][member]
+                    dropped.setdefault(name, set()).add(member)
+        result = []
+        for r in records:
+            if r.type not in (types.CLASS, types.MODULE) or r.name not in dropped:
+                result.append(r)
+                continue
+            drop = dropped[r.name]
+            sha1 = r.sha1 and hashlib.sha1(('%s dedup %s' % (r.sha1, ' '.join(sorted(drop)))).encode('utf-8')).hexdigest()
+            result.append(ModuleRecord(
+                r.url, r.type, r.name, r.doc, r.inherits,
+                tuple(m for m in r.methods if m.name not in drop),
+                tuple(f for f in r.static_functions if f.name not in drop), r.function, r.enum, sha1))
+        cls.count('dedup_methods', sum(len(x) for x in dropped.values()))
+        return result
+
+    @classmethod
+    def intern_docs(cls, records):
+        """
+        Make equal doc strings of records, methods and enum values one object, returns number of characters
+        no longer kept in memory
+        """
+        docs = {}
+        saved = 0
+
+        def intern(text):
+            if not isinstance(text, basestring):
+                return text, 0
+            shared = docs.setdefault(text, text)
+            return shared, len(text) if shared is not text else 0
+
+        for r in records:
+            r.doc, size = intern(r.doc)
+            saved += size
+            for m in r.methods + r.static_functions + ((r.function,) if r.function else ()):
+                m.doc, size = intern(m.doc)
+                saved += size
+            for e in r.enum:
+                e.description, size = intern(e.description)
+                saved += size
+        cls.count('docs_interned_chars', saved)
+        return saved
+
+    @classmethod
+    def crawl(cls, pages, verbose=False, use_cache=True, workers=1, store=None, journal=None):
+        """
+        Fetch and parse pages, return valid modules in the same order as pages.
+        pages is a list of (url, title).
+        With workers > 1 fetching runs on a thread pool and parsing on a process pool,
+        so parsing of fetched pages overlaps with pending downloads.
+        If store (RecordCache) is given, pages with unchanged content hash are restored without parsing.
+        Pages which fail to fetch or parse are skipped and added to failures.
+        If journal (CrawlJournal) is given, finished pages are written to it, pages already in it
+        are restored without fetching and parsing
+        """
+        return list(cls.iter_crawl(pages, verbose, use_cache, workers, store, journal))
+
+    @classmethod
+    def iter_crawl(cls, pages, verbose=False, use_cache=True, workers=1, store=None, journal=None):
+        """
+        Generator version of crawl, yields every valid module as soon as it and all previous pages are done.
+        Parse tree and page source of yielded modules are released
+        """
+        def fetch(page):
+            if journal is not None and page[0] in journal:
+                return page + (None, True, None)
+            try:
+                return page + cls.fetch_page(page[0], use_cache, verbose)
+            except Exception:
+                cls.add_failure(page[0], 'fetch')
+                return page + (None, True, None)
+
+        def collect(url, content, from_cache, validators, sha1, record, job):
+            if record:
+                if journal is not None and url not in journal:
+                    journal.add(url, sha1, record)
+                return cls.from_dict(record, sha1)
+            if job is None:
+                return
+            hou_mod, page_stats, error = job.get() if parse_pool else job
+            if page_stats and cls.stats is not None:
+                cls.stats.merge(page_stats)
+            if error:
+                cls.add_failure(url, 'parse', error)
+                return
+            if journal is not None:
+                journal.add(url, sha1, hou_mod and hou_mod.to_dict())
+            if hou_mod:
+                hou_mod.sha1 = sha1
+                if not from_cache:
+                    cls.write_cache(url, content, validators)
+                if store is not None:
+                    store.put(url, sha1, hou_mod.to_dict())
+                return hou_mod
+
+        def window():
+            # pages are handed to the fetch pool only while less than limit pages are fetched and not collected
+            for page in pages:
+                slots.acquire()
+                if stopped:
+                    return
+                yield page
+
+        parser_options = (cls.html_parser, cls.strain_tree)
+        limit = 2 * workers
+        slots = threading.Semaphore(limit)
+        stopped = []
+        if workers > 1:
+            from multiprocessing import Pool
+            from multiprocessing.pool import ThreadPool
+            fetch_pool = ThreadPool(workers)
+            parse_pool = Pool(workers)
+            fetched = fetch_pool.imap(fetch, window())
+        else:
+            fetch_pool = parse_pool = None
+            fetched = itertools.imap(fetch, pages)
+        try:
+            jobs = collections.deque()
+            done = 0
+            for i, (url, title, content, from_cache, validators) in enumerate(fetched):
+                if journal is not None and url in journal:
+                    sha1, record = journal.get(url)
+                    if store is not None and record:
+                        store.put(url, sha1, record)
+                else:
+                    sha1 = hashlib.sha1(content).hexdigest() if content is not None else None
+                    record = store.get(url, sha1) if store is not None and sha1 else None
+                if content is None or record:
+                    job = None
+                elif parse_pool:
+                    job = parse_pool.apply_async(_parse_page, ((cls, url, content, verbose, parser_options),))
+                else:
+                    if verbose:
+                        cls._print_progress(i, len(pages), title)
+                    job = _parse_page((cls, url, content, verbose, parser_options))
+                if not parse_pool:
+                    hou_mod = collect(url, content, from_cache, validators, sha1, record, job)
+                    if hou_mod:
+                        yield hou_mod
+                    continue
+                # source is kept only to write it to cache after parsing
+                jobs.append((title, (url, None if from_cache else content, from_cache, validators, sha1, record, job)))
+                content = None
+                # hand over finished pages in order while others are still downloading,
+                # wait for the oldest page when limit pages are in flight
+                while jobs and (jobs[0][1][-1] is None or jobs[0][1][-1].ready() or len(jobs) >= limit):
+                    title, job = jobs.popleft()
+                    if verbose:
+                        cls._print_progress(done, len(pages), title)
+                    done += 1
+                    hou_mod = collect(*job)
+                    job = None
+                    slots.release()
+                    if hou_mod:
+                        yield hou_mod
+            while jobs:
+                title, job = jobs.popleft()
+                if verbose:
+                    cls._print_progress(done, len(pages), title)
+                done += 1
+                hou_mod = collect(*job)
+                job = None
+                if hou_mod:
+                    yield hou_mod
+            if parse_pool:
+                parse_pool.close()
+                parse_pool.join()
+        finally:
+            if parse_pool:
+                # unblock window of a stopped crawl
+                stopped.append(True)
+                for _ in xrange(limit):
+                    slots.release()
+                fetch_pool.terminate()
+                parse_pool.terminate()
+
+    @staticmethod
+    def _print_progress(i, count, title):
+        print '-'*50
+        print '%s/%s: %s' % ('{:>{}}'.format(i, len(str(count))), count, title)
+
+    @classmethod
+    def setup(cls, workers=1, retries=3, rate_limit=None, version='latest', compress_cache=False,
+              cache_size=None, cache_max_age=None, cache_max_idle=None, html_parser=None, strain_tree=True,
+              source=None, index_max_age=24 * 3600, offline=False):
+        """
+        Configure shared fetcher, page cache and html parser for a run.
+        See parse_help for arguments
+        """
+        cls.html_parser, cls.strain_tree = html_parser, strain_tree
+        cls.index_max_age, cls.offline = index_max_age, offline
+        cls.failures = []
+        if cls.fetcher:
+            cls.fetcher.close()
+        cls.fetcher = source or Fetcher(pool_size=max(workers, 1), retries=retries, rate_limit=rate_limit)
+        cls.cache = PageCache(cls.cache_folder, version, compress_cache, cache_size, cache_max_age, cache_max_idle)
+
+    @classmethod
+    def version_url(cls, version='latest'):
+        """
+        Documentation root of version, root_url for latest
+        """
+        if version == 'latest':
+            return cls.root_url
+        return cls.version_root_url.format(version=version)
+
+    @classmethod
+    def source_root(cls, version='latest'):
+        """
+        Documentation root of current source: root of local source or version_url
+        """
+        fetcher = cls.get_fetcher()
+        return fetcher.root_url if fetcher.local else cls.version_url(version)
+
+    @classmethod
+    def index_pages(cls, root_url=None, use_cache=True):
+        """
+        Pages listed in documentation root, list of (url, title).
+        Page list is cached per version like pages: cached list younger than index_max_age,
+        or of any age in offline mode, is used without request, else it is revalidated with
+        conditional request and root page is parsed again only if changed
+        """
+        root_url = root_url or cls.root_url
+        fetcher = cls.get_fetcher()
+        if fetcher.local:
+            status, content, _ = fetcher.get(root_url)
+            if status != 200:
+                raise IOError('Documentation root not found in source: %s' % root_url)
+            return cls.parse_index(content, root_url)
+        cache = cls.get_cache()
+        entry = cache.page_list(root_url)
+        if entry and (cls.offline or use_cache and (
+                cls.index_max_age is None or time.time() - entry['fetched'] < cls.index_max_age)):
+            cls.count('index_cached')
+            return [tuple(p) for p in entry['pages']]
+        if cls.offline:
+            raise IOError('Page list of %s is not cached, run online first' % root_url)
+        validators = entry and dict(etag=entry['etag'], last_modified=entry['last_modified'])
+        status, content, validators = fetcher.get(root_url, validators)
+        if status == 304 or (status == 200 and entry and hashlib.sha1(content).hexdigest() == entry['sha1']):
+            cache.touch_page_list(root_url)
+            cls.count('index_not_modified')
+            return [tuple(p) for p in entry['pages']]
+        if status != 200:
+            raise IOError('Documentation root not found: %s (status %s)' % (root_url, status))
+        pages = cls.parse_index(content, root_url)
+        cache.put_page_list(root_url, hashlib.sha1(content).hexdigest(), pages, validators)
+        return pages
+
+    @classmethod
+    def parse_index(cls, content, root_url):
+        """
+        Pages listed in documentation root page source, list of (url, title)
+        """
+        s = cls.make_soup(content, SoupStrainer('li', {'class': 'subtopics_item'}))
         all_modules = s.find_all('li', {'class': 'subtopics_item'})
-        for i, elem in enumerate(all_modules):
-            if verbose:
-                print '-'*50
-                print '%s/%s: %s' % ('{:>{}}'.format(i, len(str(len(all_modules)))), len(all_modules), elem['data-title'])
-            hou_mod = cls(root_url + elem.find('a')['href'], verbose, save_cache)
-            if hou_mod.is_valid:
-                hou_modules.append(hou_mod)
-        # sort
-        classes = [x for x in hou_modules if x.type == HouModules.TYPES.CLASS]
-        modules = [x for x in hou_modules if x.type == HouModules.TYPES.MODULE]
-        functions = [x for x in hou_modules if x.type == HouModules.TYPES.FUNC]
-        enumerates = [x for x in hou_modules if x.type == HouModules.TYPES.ENUM]
-        classes = HouModules.sort_classes(classes)
+        return [(root_url + elem.find('a')['href'], elem['data-title']) for elem in all_modules]
+
+    @classmethod
+    def order_modules(cls, hou_modules):
+        """
+        Output order: enums, classes with base classes first, modules, functions.
+        Uses type, name and inherits only, so works with any record having them
+        """
+        classes = [x for x in hou_modules if x.type == cls.TYPES.CLASS]
+        modules = [x for x in hou_modules if x.type == cls.TYPES.MODULE]
+        functions = [x for x in hou_modules if x.type == cls.TYPES.FUNC]
+        enumerates = [x for x in hou_modules if x.type == cls.TYPES.ENUM]
+        classes = cls.sort_classes(classes)
         modules = sorted(modules, key=lambda x: x.name)
         functions = sorted(functions, key=lambda x: x.name)
         enumerates = sorted(enumerates, key=lambda x: x.name)
+        return enumerates + classes + modules + functions
 
-        hou_modules = enumerates + classes + modules + functions
+    @classmethod
+    def render(cls, m, store=None):
+        """
+        Return (full text, min text) of module, None if rendering failed.
+        Text of pages not changed since incremental store was saved is reused
+        """
+        blocks = store.blocks(m.url, m.sha1) if store is not None else None
+        if blocks:
+            return blocks
+        try:
+            with cls.timer('render', m.url):
+                ftext, mtext = cls.render_blocks(m)
+        except Exception:
+            cls.add_failure(m.url, 'render')
+            return
+        if store is not None:
+            store.put_blocks(m.url, m.sha1, (ftext, mtext))
+        return ftext, mtext
+
+    @classmethod
+    def add_failure(cls, url, stage, error=None):
+        """
+        Record page skipped after exception in stage (fetch, parse, render), error is traceback of current exception
+        """
+        error = error or traceback.format_exc()
+        print 'FAILED %s: %s\n%s' % (stage, url, error.strip().splitlines()[-1])
+        cls.failures.append(Failure(url, stage, error))
+        cls.count('failed')
+
+    @classmethod
+    def save_failures(cls, path):
+        """
+        Write failures of current run to json file
+        """
+        if not path:
+            return
+        json.dump([f._asdict() for f in cls.failures], open(path, 'w'), indent=2)
+        print 'FAILURES SAVED:', path
+
+    @classmethod
+    def open_journal(cls, version='latest', resume=False):
+        journal = CrawlJournal(cls.cache_folder, version, cls.parser_hash(), resume)
+        if journal.entries:
+            print 'Resume: %s pages from journal %s' % (len(journal.entries), journal.path)
+        return journal
+
+    @classmethod
+    def finish_crawl(cls, journal):
+        """
+        Drop journal of complete run. Journal is kept while pages failed, so a resumed run retries only those
+        """
+        if not cls.failures:
+            journal.remove()
+
+    @classmethod
+    def _print_summary(cls, store):
         print 'Cache folder: ', cls.cache_folder
-        if not as_text:
-            d = datetime.timedelta(seconds=time.time() - _start)
-            print 'Total time: %s' % str(d).split('.')[0]
-            return hou_modules
-        # to text
-        min_array = []
-        full_array = []
-        for m in hou_modules:
-            try:
-                ftext = m.as_text(True)
-                mtext = m.as_text(False)
-                full_array.append(ftext)
-                min_array.append(mtext)
-            except Exception as e:
-                print 'ERROR:', m.url
-                print e
-                continue
-        qt_import = 'from PySide2.QtWidgets import *\n'
-        d = datetime.timedelta(seconds=time.time() - _start)
+        print 'Cache: %s hits, %s misses, %.1f MB' % (cls.cache.hits, cls.cache.misses, cls.cache.size() / 1048576.0)
+        if store is not None:
+            print 'Incremental: %s pages reused, %s parsed' % (store.hits, store.misses)
+        if cls.failures:
+            print 'Failed: %s pages, run with resume to retry them' % len(cls.failures)
+            for f in cls.failures:
+                print '  %-6s %s' % (f.stage, f.url)
+
+    @classmethod
+    def _print_dedup(cls, records, full_size):
+        """
+        Output size and render time saved by dedup_methods and memory saved by intern_docs. Savings of dropped methods
+        are estimated from average size and render time of methods rendered in this run,
+        net time saved is that less the time of dedup_methods and intern_docs
+        """
+        stats = cls.stats
+        if stats is None:
+            return
+        counters = stats.counters
+        methods = sum(len(r.methods) + len(r.static_functions) for r in records) or 1
+        dropped = counters['dedup_methods']
+        saved = dropped * stats.stages['render'] / methods
+        cost = stats.stages['dedup']
+        print 'Dedup: %s inherited methods dropped, ~%.1f KB and ~%.0f ms of rendering saved, dedup took %.0f ms, ' \
+            'net %+.0f ms' % (dropped, dropped * full_size / 1024.0 / methods, saved * 1000, cost * 1000,
+                             (saved - cost) * 1000)
+        print 'Doc strings: %.1f KB interned' % (counters['docs_interned_chars'] / 1024.0)
+
+    @classmethod
+    def start_stats(cls, stats=None):
+        """
+        Enable instrumentation with given or new Stats, returns it
+        """
+        cls.stats = stats if stats is not None else Stats()
+        return cls.stats
+
+    @classmethod
+    def finish_stats(cls, store=None, stats_json=None):
+        """
+        Add cache and fetcher counters to run stats, print summary and optionally dump stats to json
+        """
+        stats = cls.stats
+        if stats is None:
+            return
+        stats.count('cache_hits', cls.cache.hits)
+        stats.count('cache_misses', cls.cache.misses)
+        stats.count('requests', cls.fetcher.requests_count)
+        stats.count('not_modified', cls.fetcher.not_modified_count)
+        if store is not None:
+            stats.count('reused', store.hits)
+        print stats.summary()
+        if stats_json:
+            stats.dump_json(stats_json)
+            print 'Stats saved: %s' % stats_json
+
+    @staticmethod
+    def _print_time(start):
+        import datetime
+        d = datetime.timedelta(seconds=time.time() - start)
         print 'Total time: %s' % str(d).split('.')[0]
-        return qt_import+'\n'.join(min_array), qt_import+'\n'.join(full_array)
+
+    @classmethod
+    def parse_help(cls, verbose=False, as_text=True, save_cache=True, workers=1, root_url=None,
+                   retries=3, rate_limit=None, version='latest', compress_cache=False,
+                   cache_size=None, cache_max_age=None, cache_max_idle=None, incremental=False,
+                   html_parser=None, strain_tree=True, stats=None, stats_json=None, pyi=None, db=None, source=None,
+                   index_max_age=24 * 3600, offline=False, resume=False, failures_json=None, export=None,
+                   dedup=False, shard=None):
+        """
+        :param save_cache: use cached pages as is, else revalidate them on server
+        :param workers: number of parallel fetch and parse workers
+        :param retries: max retries of failed requests
+        :param rate_limit: max requests per second
+        :param version: documentation version, e.g. 17.5, cache of every version is kept separately.
+            Pages are indexed from version_url(version) if root_url is not given
+        :param compress_cache: store cached pages compressed
+        :param cache_size: max cache size in bytes
+        :param cache_max_age: seconds after cached page is revalidated on server
+        :param cache_max_idle: seconds after not used cached page is removed
+        :param incremental: reuse parsed data and rendered text of pages which content is not changed
+        :param html_parser: tree builder name (lxml, html.parser), default is the fastest installed
+        :param strain_tree: build only parts of page used by parser
+        :param stats: Stats instance to collect run instrumentation into, e.g. with hooks added, default is new Stats
+        :param stats_json: save stats to this json file
+        :param pyi: write type stubs to this .pyi file
+        :param db: store parsed records of version in this SQLite database, see hou_db
+        :param source: read pages from local source instead of the web, see hou_source
+        :param index_max_age: seconds after cached page list of documentation root is revalidated, None is never
+        :param offline: use cached page list and pages of any age, never send requests, pages not in cache are skipped
+        :param resume: restore pages finished by previous unfinished run of version from journal
+        :param failures_json: save url, stage and traceback of pages failed in this run to json file
+        :param export: write parsed records to this .jsonl, .marshal or .msgpack file, see hou_export
+        :param dedup: drop methods equal to inherited ones from output and intern doc strings, see dedup_methods.
+            Stubs, database and export keep all methods
+        :param shard: hou_shard.Shard, crawl only pages of shard and save its records for hou_shard.merge
+        """
+        _start = time.time()
+        cls.start_stats(stats)
+        try:
+            cls.setup(workers, retries, rate_limit, version, compress_cache, cache_size, cache_max_age,
+                      cache_max_idle, html_parser, strain_tree, source, index_max_age, offline)
+            with cls.timer('index'):
+                pages = cls.index_pages(root_url or cls.source_root(version), save_cache)
+            run = version
+            if shard is not None:
+                index, pages, run = pages, shard.pages(pages), shard.run_name(version)
+            store = RecordCache(cls.cache_folder, run, cls.parser_hash()) if incremental else None
+            journal = cls.open_journal(run, resume)
+            try:
+                hou_modules = cls.crawl(pages, verbose, save_cache, workers, store, journal)
+            finally:
+                cls.cache.save()
+                journal.close()
+            cls.finish_crawl(journal)
+            if shard is not None:
+                print 'SHARD SAVED: %s (%s of %s pages)' % (shard.save(hou_modules, index, version, cls.failures),
+                                                            len(pages), len(index))
+            # sort
+            with cls.timer('sort'):
+                hou_modules = cls.order_modules(hou_modules)
+            if pyi:
+                import hou_pyi
+                with cls.timer('pyi'):
+                    hou_pyi.write_stub(hou_modules, pyi)
+            if db:
+                import hou_db
+                with cls.timer('db'):
+                    hou_db.build(hou_modules, db, version)
+            if export:
+                import hou_export
+                with cls.timer('export'):
+                    hou_export.dump(hou_modules, export, version)
+            if dedup:
+                with cls.timer('dedup'):
+                    hou_modules = cls.dedup_methods(hou_modules)
+                    cls.intern_docs(hou_modules)
+            cls._print_summary(store)
+            if not as_text:
+                if store is not None:
+                    store.save()
+                cls.save_failures(failures_json)
+                cls.finish_stats(store, stats_json)
+                cls._print_time(_start)
+                return hou_modules
+            # to text
+            min_array = []
+            full_array = []
+            for m in hou_modules:
+                blocks = cls.render(m, store)
+                if blocks:
+                    full_array.append(blocks[0])
+                    min_array.append(blocks[1])
+            if dedup:
+                cls._print_dedup(hou_modules, sum(len(x) for x in full_array))
+            if store is not None:
+                store.save()
+            cls.save_failures(failures_json)
+            cls.finish_stats(store, stats_json)
+            cls._print_time(_start)
+            return cls.QT_IMPORT+'\n'.join(min_array), cls.QT_IMPORT+'\n'.join(full_array)
+        finally:
+            # counters of next run start from zero
+            cls.stats = None
+
+    @classmethod
+    def stream_help(cls, full_path, min_path, verbose=False, save_cache=True, workers=1, root_url=None,
+                    version='latest', incremental=False, stats=None, stats_json=None, resume=False,
+                    failures_json=None, **options):
+        """
+        Same output as parse_help, but every page is rendered as soon as it is parsed and its text is
+        spooled to temporary files. Only small StreamEntry records are kept in memory,
+        output files are assembled in order from spooled text at the end.
+        Other keyword arguments are the same as of parse_help
+        """
+        import tempfile
+        _start = time.time()
+        cls.start_stats(stats)
+        try:
+            cls.setup(workers, version=version, **options)
+            with cls.timer('index'):
+                pages = cls.index_pages(root_url or cls.source_root(version), save_cache)
+            store = RecordCache(cls.cache_folder, version, cls.parser_hash()) if incremental else None
+            journal = cls.open_journal(version, resume)
+            entries = []
+            spool_full, spool_min = tempfile.TemporaryFile(), tempfile.TemporaryFile()
+            try:
+                try:
+                    for m in cls.iter_crawl(pages, verbose, save_cache, workers, store, journal):
+                        blocks = cls.render(m, store)
+                        if not blocks:
+                            continue
+                        ftext, mtext = [b.encode('utf-8') for b in blocks]
+                        entries.append(StreamEntry(m.type, m.name, m.inherits,
+                                                   spool_full.tell(), len(ftext), spool_min.tell(), len(mtext)))
+                        spool_full.write(ftext)
+                        spool_min.write(mtext)
+                finally:
+                    cls.cache.save()
+                    journal.close()
+                cls.finish_crawl(journal)
+                if store is not None:
+                    store.save()
+                with cls.timer('sort'):
+                    entries = cls.order_modules(entries)
+                cls._print_summary(store)
+                for path, spool, field in ((full_path, spool_full, 'full'), (min_path, spool_min, 'min')):
+                    with cls.timer('write'), open(path, 'wb') as f:
+                        f.write(cls.QT_IMPORT)
+                        for i, entry in enumerate(entries):
+                            if i:
+                                f.write('\n')
+                            spool.seek(getattr(entry, field + '_pos'))
+                            f.write(spool.read(getattr(entry, field + '_size')))
+            finally:
+                spool_full.close()
+                spool_min.close()
+            cls.save_failures(failures_json)
+            cls.finish_stats(store, stats_json)
+            cls._print_time(_start)
+            return len(entries)
+        finally:
+            # counters of next run start from zero
+            cls.stats = None
+
+
+StreamEntry = collections.namedtuple('StreamEntry', 'type name inherits full_pos full_size min_pos min_size')
+Failure = collections.namedtuple('Failure', 'url stage error')
+
+
+def _parse_page(args):
+    """
+    Process pool entry point. Parse already fetched page, return its compact record or None if page is not valid,
+    stats dict of the page if run stats are enabled and traceback if parsing failed.
+    Page source and parse tree are not sent back
+    """
+    cls, url, content, verbose, (cls.html_parser, cls.strain_tree) = args
+    run_stats = cls.stats
+    cls.stats = Stats() if run_stats is not None else None
+    try:
+        hou_mod = cls(url, verbose, content=content)
+        return hou_mod.record() if hou_mod.is_valid else None, cls.stats and cls.stats.to_dict(), None
+    except Exception:
+        return None, cls.stats and cls.stats.to_dict(), traceback.format_exc()
+    finally:
+        cls.stats = run_stats
 
 
 if __name__ == '__main__':
-    minify, full = HouModules.parse_help(verbose=True, as_text=True)
-    print 'WRITE'
+    import argparse
+    parser = argparse.ArgumentParser(description='Parse houdini python documentation')
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                        help='Number of parallel fetch and parse workers')
+    parser.add_argument('-u', '--url',
+                        help='Documentation root url, default is root of --doc-version, also page urls of --source')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Revalidate cached pages, download only changed ones')
+    parser.add_argument('--retries', type=int, default=3, help='Max retries of failed requests')
+    parser.add_argument('--rate-limit', type=float, help='Max requests per second')
+    parser.add_argument('--doc-version', default='latest',
+                        help='Documentation version, e.g. 17.5, cache and database keep every version separately')
+    parser.add_argument('--compress-cache', action='store_true', help='Store cached pages compressed')
+    parser.add_argument('--cache-size', type=float, help='Max cache size, MB')
+    parser.add_argument('--cache-max-age', type=float, help='Revalidate cached pages older than this, days')
+    parser.add_argument('--index-max-age', type=float, default=1,
+                        help='Revalidate cached page list of documentation root older than this, days')
+    parser.add_argument('--offline', action='store_true',
+                        help='Use cached page list and pages only, never connect, pages not in cache are skipped')
+    parser.add_argument('--cache-max-idle', type=float, help='Remove cached pages not used for this, days')
+    parser.add_argument('-i', '--incremental', action='store_true',
+                        help='Parse and render only pages changed since previous run')
+    parser.add_argument('--source', metavar='PATH',
+                        help='Read html pages from local folder or zip archive instead of the web')
+    parser.add_argument('--source-root', default='', help='Folder of hou pages inside --source, e.g. hom/hou')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue unfinished or failed run of --doc-version, only pages not finished are fetched')
+    parser.add_argument('--failures', metavar='FILE', help='Save url and traceback of failed pages to json file')
+    parser.add_argument('--parser', choices=HouModules.PARSERS, help='HTML tree builder, default is the fastest installed')
+    parser.add_argument('--full-tree', action='store_true', help='Build full page tree instead of used parts only')
+    parser.add_argument('--stream', action='store_true',
+                        help='Write output while parsing, keep only small records in memory')
+    parser.add_argument('--package', metavar='FOLDER',
+                        help='Write lazy loading hou package with one module per class to folder')
+    parser.add_argument('--pyi', action='store_true', help='Write .pyi type stubs next to the output and check them')
+    parser.add_argument('--db', help='Store parsed api in SQLite database, see hou_db.py for queries')
+    parser.add_argument('--dedup', action='store_true',
+                        help='Leave out methods equal to inherited ones and intern doc strings')
+    parser.add_argument('--export', metavar='FILE',
+                        help='Save parsed records to .jsonl, .marshal or .msgpack file, see hou_export.py')
+    parser.add_argument('--shard', metavar='I/N',
+                        help='Crawl only shard I of N shards of pages and save it to --shard-dir, see hou_shard.py')
+    parser.add_argument('--shard-dir', default='shards', help='Folder of shard results shared by all shards')
+    parser.add_argument('--stats-json', help='Save stage timings and counters to json file')
+    parser.add_argument('--profile', help='Save cProfile stats of the main process to file')
+    options = parser.parse_args()
+    day = 24 * 3600
+    source = None
+    if options.source:
+        import hou_source
+        try:
+            source = hou_source.open_source(os.path.expanduser(options.source), options.source_root,
+                                            options.url or HouModules.version_url(options.doc_version))
+        except ValueError as e:
+            parser.error(str(e))
+    kwargs = dict(
+        verbose=True, save_cache=not options.no_cache,
+        workers=options.workers, root_url=options.url,
+        retries=options.retries, rate_limit=options.rate_limit,
+        version=options.doc_version, compress_cache=options.compress_cache,
+        cache_size=options.cache_size and int(options.cache_size * 1048576),
+        cache_max_age=options.cache_max_age and options.cache_max_age * day,
+        cache_max_idle=options.cache_max_idle and options.cache_max_idle * day,
+        incremental=options.incremental, html_parser=options.parser, strain_tree=not options.full_tree,
+        stats_json=options.stats_json, db=options.db, export=options.export, source=source,
+        dedup=options.dedup,
+        index_max_age=options.index_max_age * day, offline=options.offline,
+        resume=options.resume, failures_json=options.failures)
+    if options.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
     path1 = os.path.abspath('hou_full.py')
-    open(path1, 'w').write(full)
-    print 'FULL VERSION SAVED:', path1
     path2 = os.path.abspath('hou_min.py')
-    open(path2, 'w').write(minify)
-    print 'SHORT VERSION SAVED:', path2
+    if options.pyi and options.stream:
+        parser.error('--pyi is not available with --stream')
+    if options.offline and options.no_cache:
+        parser.error('--offline uses cached pages, --no-cache is not available')
+    if options.db and options.stream:
+        parser.error('--db is not available with --stream')
+    if options.export and options.stream:
+        parser.error('--export is not available with --stream')
+    if options.dedup and options.stream:
+        parser.error('--dedup needs all records, not available with --stream')
+    if options.shard:
+        for name in ('stream', 'package', 'pyi', 'db', 'export', 'dedup'):
+            if getattr(options, name):
+                parser.error('--%s is not available with --shard, shards are merged by hou_shard.py' %
+                             name.replace('_', '-'))
+        import hou_shard
+        try:
+            kwargs['shard'] = hou_shard.Shard.parse(options.shard, os.path.abspath(options.shard_dir))
+        except ValueError as e:
+            parser.error(str(e))
+    if options.export:
+        import hou_export
+        try:
+            hou_export.export_format(options.export)
+        except ValueError as e:
+            parser.error(str(e))
+    stubs = None
+    if options.package:
+        import hou_package
+        hou_modules = HouModules.parse_help(as_text=False, **kwargs)
+        package = hou_package.write_package(hou_modules, options.package, renderer=HouModules)
+        print 'PACKAGE SAVED:', package
+        if options.pyi:
+            import hou_pyi
+            stubs = hou_pyi.write_stub(hou_modules, os.path.join(package, '__init__.pyi'))
+    elif options.shard:
+        HouModules.parse_help(as_text=False, **kwargs)
+    elif options.stream:
+        for key in ('db', 'export', 'dedup'):
+            kwargs.pop(key)
+        HouModules.stream_help(path1, path2, **kwargs)
+    else:
+        if options.pyi:
+            stubs = kwargs['pyi'] = os.path.splitext(path1)[0] + '.pyi'
+        minify, full = HouModules.parse_help(as_text=True, **kwargs)
+        print 'WRITE'
+        open(path1, 'w').write(full)
+        open(path2, 'w').write(minify)
+    if not options.package and not options.shard:
+        print 'FULL VERSION SAVED:', path1
+        print 'SHORT VERSION SAVED:', path2
+    if options.export:
+        print 'EXPORT SAVED:', options.export
+    if stubs:
+        import hou_pyi
+        print 'STUBS SAVED:', stubs
+        for path, error in hou_pyi.check_stubs([stubs]):
+            print 'STUB ERROR: %s %s' % (path, error)
+    if options.profile:
+        profiler.disable()
+        profiler.dump_stats(options.profile)
+        print 'PROFILE SAVED:', options.profile
     print 'COMPLETE'
-
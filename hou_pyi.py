@@ -0,0 +1,184 @@
+"""
+Type stub (.pyi) emitter.
+
+Annotations are derived from the same data as the runtime stubs: return values from
+HouModules.parse_return, argument types from documented types of Method.types, else from default values.
+
+    argument                        type                annotation
+    Hom:hou.Node node               Node                node: Node
+    [Hom:hou.ParmTemplate] parm     [ParmTemplate]      parm: ParmTemplate
+    int index=0                     int                 index: int = ...
+    pos=hou.Vector3                 None                pos: Vector3 = ...
+
+    return string              parse_return       annotation
+    hou.Node or None           Node               Optional[Node]
+    tuple of hou.Parm          (Parm, )           Tuple[Parm, ...]
+    (hou.Vector3, float)       (Vector3, 0.0,)    Tuple[Vector3, float]
+    dict of str to hou.Node    {"": Node}         Dict[str, Node]
+    hou.primType enum value    EnumValue          EnumValue
+
+Names which are not documented hou classes are Any. Stubs use Python 3 syntax,
+check_stubs parses them with a Python 3 interpreter.
+"""
+import re, ast, sys, json, subprocess
+from hou_parser import HouModules
+from hou_package import export_name
+
+HEADER = 'from typing import Any, Dict, Optional, Tuple\n'
+OPTIONAL_RE = re.compile(r'\bor\s+none\b', re.I)
+LITERALS = {'True': 'bool', 'False': 'bool', 'None': 'None', 'object': 'Any'}
+
+
+def annotation(expr, known):
+    """
+    Type annotation of rendered python value, known is a set of hou names
+    """
+    try:
+        node = ast.parse(expr.strip(), mode='eval').body
+    except SyntaxError:
+        return 'Any'
+    return _annotation(node, known)
+
+
+def _annotation(node, known):
+    if isinstance(node, ast.Num):
+        return type(node.n).__name__
+    if isinstance(node, ast.Str):
+        return 'str'
+    if isinstance(node, ast.Name):
+        if node.id in LITERALS:
+            return LITERALS[node.id]
+        return node.id if node.id in known else 'Any'
+    if getattr(ast, 'NameConstant', None) and isinstance(node, ast.NameConstant):
+        return LITERALS[repr(node.value)]
+    if isinstance(node, ast.Tuple):
+        if not node.elts:
+            return 'Tuple[()]'
+        if len(node.elts) == 1:
+            # "tuple of X"
+            return 'Tuple[%s, ...]' % _annotation(node.elts[0], known)
+        return 'Tuple[%s]' % ', '.join(_annotation(x, known) for x in node.elts)
+    if isinstance(node, ast.Dict):
+        if not node.keys:
+            return 'Dict[Any, Any]'
+        return 'Dict[%s, %s]' % (_annotation(node.keys[0], known), _annotation(node.values[0], known))
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == 'tuple':
+        return 'Tuple[Any, ...]'
+    return 'Any'
+
+
+def return_annotation(ret, known):
+    """
+    Annotation of documented return string
+    """
+    result = annotation(HouModules.parse_return(ret), known)
+    if OPTIONAL_RE.search(ret) and result not in ('Any', 'None'):
+        result = 'Optional[%s]' % result
+    return result
+
+
+def type_annotation(kind, known):
+    """
+    Annotation of documented argument type, Any if not known
+    """
+    return annotation(HouModules.type_to_data(kind.replace('[', '').replace(']', '')), known)
+
+
+def arg_text(arg, known, kind=None):
+    """
+    Stub argument from parse_args item, typed by documented type kind, else by default value
+    """
+    name, value = arg, None
+    if '=' in arg:
+        name, value = [x.strip() for x in arg.split('=', 1)]
+    result = 'Any'
+    if kind:
+        result = type_annotation(kind, known)
+    if result == 'Any' and value is not None:
+        result = annotation(value, known)
+    if result in ('Any', 'None'):
+        return arg if value is None else '%s=...' % name
+    return '%s: %s' % (name, result) if value is None else '%s: %s = ...' % (name, result)
+
+
+def _def(method, known, first=None, indent=''):
+    args = list(method.args)
+    types = list(method.types or ())
+    types += [None] * (len(args) - len(types))
+    if first:
+        pairs = [(a.strip(), t) for a, t in zip(args, types) if a.strip() != first]
+        args, types = [first] + [a for a, t in pairs], [None] + [t for a, t in pairs]
+    return '%sdef %s(%s) -> %s: ...' % (indent, method.name,
+                                       ', '.join(arg_text(a, known, t) for a, t in zip(args, types)),
+                                       return_annotation(method.ret, known))
+
+
+def record_stub(record, known):
+    """
+    Stub source of one parsed record
+    """
+    types = HouModules.TYPES
+    if record.type == types.FUNC:
+        return _def(record.function, known) if record.function else ''
+    if record.type == types.ENUM:
+        lines = ['class %s:' % record.name]
+        value = 'EnumValue' if 'EnumValue' in known else 'Any'
+        lines.extend('    %s: %s' % (x.name, value) for x in record.enum)
+        if not record.enum:
+            lines.append('    ...')
+        return '\n'.join(lines)
+    bases = [b.split('.')[-1] for b in record.inherits]
+    lines = ['class %s%s:' % (record.name, '(%s)' % ', '.join(bases) if bases else '')]
+    for m in record.methods:
+        lines.append(_def(m, known, 'self', '    '))
+    for f in record.static_functions:
+        lines.append('    @staticmethod')
+        lines.append(_def(f, known, None, '    '))
+    if len(lines) == 1:
+        lines.append('    ...')
+    return '\n'.join(lines)
+
+
+def stub_text(records):
+    """
+    Stub module of records in output order
+    """
+    known = set(export_name(r) for r in records)
+    blocks = [record_stub(r, known) for r in records]
+    return HEADER + '\n\n' + '\n\n'.join(b for b in blocks if b) + '\n'
+
+
+def write_stub(records, path):
+    """
+    Write stub of records, e.g. hou_full.pyi next to hou_full.py or hou/__init__.pyi for package output
+    """
+    open(path, 'wb').write(stub_text(records).encode('utf-8'))
+    return path
+
+
+CHECK_SCRIPT = '''
+import ast, sys, json
+errors = []
+for path in sys.argv[1:]:
+    try:
+        ast.parse(open(path, 'rb').read(), path)
+    except SyntaxError as e:
+        errors.append([path, '%s:%s: %s' % (e.lineno, e.offset, e.msg)])
+sys.stdout.write(json.dumps(errors))
+'''
+
+
+def check_stubs(paths, python=None):
+    """
+    Parse stub files with Python 3. Returns list of (path, error), empty if all stubs are valid
+    """
+    python = python or (sys.executable if sys.version_info[0] >= 3 else 'python3')
+    try:
+        process = subprocess.Popen([python, '-c', CHECK_SCRIPT] + list(paths), stdout=subprocess.PIPE)
+    except OSError as e:
+        # no Python 3 interpreter on PATH under Python 2
+        return [(path, 'Python 3 interpreter %s not found: %s' % (python, e.strerror)) for path in paths]
+    out, _ = process.communicate()
+    if process.returncode:
+        raise RuntimeError('Stub check failed to run with %s' % python)
+    return [tuple(x) for x in json.loads(out)]
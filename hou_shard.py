@@ -0,0 +1,216 @@
+"""
+Sharded crawl: pages of the documentation index are split into stable hash based shards, every shard is
+fetched and parsed by its own process or machine, results are saved to a shared folder and merged into
+the same output as of a single run, byte for byte, whatever the number of shards.
+
+Shard of a page depends on its url only. Every shard saves its records (hou_export JSON Lines) and a manifest
+with the shard number, documentation version, parser hash, digest of the full page list and index
+position of every record. Merge checks that all shards of one run are present and consistent, restores
+index order by position and renders like parse_help: order_modules, then render_records.
+
+python hou_parser.py --shard 0/4 --shard-dir shards/     one command per shard, on any machine
+python hou_shard.py merge shards/ --out .
+python hou_shard.py local 4 shards/ -- --source help.zip --workers 2
+"""
+import os, sys, json, glob, time, hashlib, tempfile, subprocess
+from hou_parser import HouModules
+import hou_export
+
+MANIFEST_VERSION = 1
+
+
+def shard_of(url, count):
+    """
+    Shard number of page url, stable between runs and machines
+    """
+    return int(hashlib.sha1(url.encode('utf-8')).hexdigest()[:8], 16) % count
+
+
+def index_digest(pages):
+    return hashlib.sha1('\n'.join(url for url, title in pages).encode('utf-8')).hexdigest()
+
+
+class Shard(object):
+    def __init__(self, index, count, folder):
+        if not 0 <= index < count:
+            raise ValueError('Shard %s is not in 0..%s' % (index, count - 1))
+        self.index = index
+        self.count = count
+        self.folder = folder
+
+    def __repr__(self):
+        return '<Shard %s/%s %s>' % (self.index, self.count, self.folder)
+
+    @classmethod
+    def parse(cls, text, folder):
+        """
+        Shard of "index/count" text, e.g. 0/4
+        """
+        try:
+            index, count = [int(x) for x in text.split('/')]
+        except ValueError:
+            raise ValueError('Shard must be index/count, e.g. 0/4: %s' % text)
+        return cls(index, count, folder)
+
+    @property
+    def name(self):
+        return 'shard-%03d-of-%03d' % (self.index, self.count)
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.folder, self.name + '.json')
+
+    def run_name(self, version):
+        """
+        Name of journal and incremental records of shard, shards sharing a cache folder don't overwrite them
+        """
+        return '%s.%s' % (version, self.name)
+
+    def pages(self, pages):
+        """
+        Pages of index which belong to shard, in index order
+        """
+        return [p for p in pages if shard_of(p[0], self.count) == self.index]
+
+    def save(self, records, pages, version='latest', failures=()):
+        """
+        Save records crawled from pages of shard. pages is the full index, manifest is written last,
+        so shard is not merged until saved completely
+        """
+        if not os.path.exists(self.folder):
+            os.makedirs(self.folder)
+        if os.path.exists(self.manifest_path):
+            os.remove(self.manifest_path)
+        positions = {}
+        for i, (url, title) in enumerate(pages):
+            positions.setdefault(url, i)
+        export = self.name + '.jsonl'
+        hou_export.dump(records, os.path.join(self.folder, export), version)
+        manifest = dict(
+            manifest=MANIFEST_VERSION, shard=self.index, shards=self.count, version=version,
+            parser=HouModules.parser_hash(), index=index_digest(pages), pages=len(self.pages(pages)),
+            records=export, positions=[positions[r.url] for r in records],
+            failures=[[f.url, f.stage] for f in failures],
+        )
+        fd, tmp = tempfile.mkstemp(dir=self.folder, prefix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+        os.rename(tmp, self.manifest_path)
+        return self.manifest_path
+
+
+def load_manifests(folder):
+    """
+    Manifests of complete shards of one run in folder, sorted by shard.
+    Raises ValueError if shards are missing or of different runs
+    """
+    manifests = []
+    for path in sorted(glob.glob(os.path.join(folder, 'shard-*-of-*.json'))):
+        data = json.load(open(path))
+        if data.get('manifest') != MANIFEST_VERSION:
+            raise ValueError('Unsupported shard manifest: %s' % path)
+        manifests.append(data)
+    if not manifests:
+        raise ValueError('No shards in %s' % folder)
+    counts = sorted(set(m['shards'] for m in manifests))
+    if len(counts) > 1:
+        raise ValueError('Shards of runs with %s shards in %s, remove old ones' % (
+            ', '.join(str(x) for x in counts), folder))
+    found = set(m['shard'] for m in manifests)
+    missing = [str(i) for i in range(counts[0]) if i not in found]
+    if missing:
+        raise ValueError('Shards %s of %s are not finished in %s' % (', '.join(missing), counts[0], folder))
+    for key, title in (('version', 'documentation versions'), ('parser', 'parser versions'), ('index', 'page lists')):
+        if len(set(m[key] for m in manifests)) > 1:
+            raise ValueError('Shards have different %s, run all shards again' % title)
+    return manifests
+
+
+def merge_records(folder):
+    """
+    Records of all shards in output order, and list of (url, stage) of pages which failed in shards
+    """
+    records = []
+    failures = []
+    for m in load_manifests(folder):
+        shard_records = hou_export.load(os.path.join(folder, m['records']))
+        if len(shard_records) != len(m['positions']):
+            raise ValueError('Records of shard %s do not match its manifest' % m['shard'])
+        records.extend(zip(m['positions'], shard_records))
+        failures.extend(tuple(x) for x in m['failures'])
+    # stable sort, records of one page keep their order
+    records.sort(key=lambda x: x[0])
+    return HouModules.order_modules([r for position, r in records]), sorted(failures)
+
+
+def merge(folder, out='.', dedup=False):
+    """
+    Write hou_full.py and hou_min.py of all shards in folder to out folder, returns their paths
+    """
+    records, failures = merge_records(folder)
+    for url, stage in failures:
+        print 'FAILED in shard %s: %s' % (stage, url)
+    if dedup:
+        records = HouModules.dedup_methods(records)
+        HouModules.intern_docs(records)
+    return HouModules.write_outputs(records, out)
+
+
+def run_local(count, folder, args=(), python=None):
+    """
+    Crawl all shards with one local hou_parser process per shard at the same time, returns exit codes.
+    args are other hou_parser arguments, e.g. ["--source", "help.zip"]
+    """
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hou_parser.py')
+    processes = []
+    for i in range(count):
+        log = open(os.path.join(folder, 'shard-%03d-of-%03d.log' % (i, count)), 'w')
+        processes.append((subprocess.Popen(
+            [python or sys.executable, script, '--shard', '%s/%s' % (i, count), '--shard-dir', folder] + list(args),
+            stdout=log, stderr=subprocess.STDOUT), log))
+    codes = []
+    for process, log in processes:
+        codes.append(process.wait())
+        log.close()
+    return codes
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Merge sharded crawl of houdini python api documentation')
+    sub = parser.add_subparsers(dest='command')
+    merge_parser = sub.add_parser('merge', help='Write output of all shards in folder')
+    merge_parser.add_argument('folder')
+    local = sub.add_parser('local', help='Run every shard as local process, then merge. '
+                                         'Arguments after -- are passed to hou_parser.py')
+    local.add_argument('shards', type=int)
+    local.add_argument('folder')
+    for p in (merge_parser, local):
+        p.add_argument('--out', default='.', help='Output folder')
+        p.add_argument('--dedup', action='store_true', help='Leave out methods equal to inherited ones')
+    argv = sys.argv[1:]
+    extra = []
+    if '--' in argv:
+        argv, extra = argv[:argv.index('--')], argv[argv.index('--') + 1:]
+    options = parser.parse_args(argv)
+    start = time.time()
+    if options.command == 'local':
+        if options.shards < 1:
+            parser.error('Number of shards must be positive')
+        if not os.path.exists(options.folder):
+            os.makedirs(options.folder)
+        for path in glob.glob(os.path.join(options.folder, 'shard-*-of-*.json')):
+            os.remove(path)
+        codes = run_local(options.shards, options.folder, extra)
+        for i, code in enumerate(codes):
+            if code:
+                print 'Shard %s exited with code %s, see %s' % (i, code, os.path.join(
+                    options.folder, 'shard-%03d-of-%03d.log' % (i, options.shards)))
+        print 'Shards finished in %.1fs' % (time.time() - start)
+    try:
+        paths = merge(options.folder, options.out, options.dedup)
+    except ValueError as e:
+        parser.error(str(e))
+    for path in paths:
+        print 'SAVED:', path
+    print 'Total time: %.1fs' % (time.time() - start)
@@ -0,0 +1,205 @@
+"""
+Tokenizer of HOM method signatures.
+
+One scan over a method title finds the method name and its argument list, splits arguments on commas
+outside of brackets and quotes, finds the default value of every argument, and stops at the return arrow
+(-> or the arrow sign of the docs). Arguments are returned as records, HouModules.arg_text renders them
+as stub arguments. Titles without quotes and deeply nested brackets, most of them, are matched by one regular
+expression, others are scanned token by token.
+
+    createNode(Hom:hou.NodeType node_type, pos=hou.Vector2((0, 0))) -> hou.Node
+
+    Signature(name='createNode', ret=' hou.Node', args_text='(Hom:hou.NodeType node_type, pos=hou.Vector2((0, 0)))',
+              args=[Argument(name='node_type', default=None, type='Hom:hou.NodeType', text='Hom:hou.NodeType node_type'),
+                    Argument(name='pos', default='hou.Vector2((0, 0))', type=None, text='pos=hou.Vector2((0, 0))')])
+"""
+import re, collections
+
+# text of argument as written, name and type are the last word and other words before default value
+Argument = collections.namedtuple('Argument', 'name default type text')
+# ret is text after return arrow as written, with leading space, empty if title has no arrow
+Signature = collections.namedtuple('Signature', 'name args ret args_text')
+
+ARROW = u'\u2192'
+OPEN = u'([{'
+CLOSE = u')]}'
+QUOTES = u'\'"'
+STRING_AFTER = u'=([{,:'
+# brackets, quotes, separators and arrows, text between them is taken as is
+TOKEN_RE = re.compile(u'[()\\[\\]{}\'",=\\\\\u2192]|->')
+ARROW_RE = re.compile(u'->|\u2192')
+# bracket group inside argument list, two levels deep, without quotes
+GROUP = u'[(\\[{](?:[^()\\[\\]{}\'"\\\\]|[(\\[{][^()\\[\\]{}\'"\\\\]*[)\\]}])*[)\\]}]'
+GROUP_RE = re.compile(GROUP)
+# title with argument list of such groups and text without quotes and arrows, most of them are
+FLAT_RE = re.compile(u'[^(\u2192>]*?(\\w+)\\(((?:[^()\\[\\]{}\'"\\\\\u2192]|%s)*)\\)' % GROUP)
+# argument of such list and its part before default value
+PIECE_RE = re.compile(u'(?:[^,()\\[\\]{}]|%s)*' % GROUP)
+HEAD_RE = re.compile(u'(?:[^=()\\[\\]{}]|%s)*=' % GROUP)
+WORD = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_')
+NON_ASCII_RE = re.compile(r'[^\x00-\x7F]')
+NEW_LINES_RE = re.compile(r'\n+')
+
+
+def _clean(text):
+    """
+    Text with non ascii characters and new lines as spaces
+    """
+    try:
+        text.encode('ascii')
+    except UnicodeError:
+        text = NON_ASCII_RE.sub(' ', text)
+    if '\n' in text:
+        text = NEW_LINES_RE.sub(' ', text)
+    return text
+
+
+def _argument(text, eq, clean):
+    """
+    Argument of its text, eq is position of default value "=" in text or -1,
+    clean is False if argument list has no non ascii characters and new lines
+    """
+    if clean:
+        if eq < 0:
+            head, default = text, None
+        else:
+            head, default = text[:eq], _clean(text[eq + 1:]).strip()
+        head, text = _clean(head), _clean(text)
+    elif eq < 0:
+        head, default = text, None
+    else:
+        head, default = text[:eq], text[eq + 1:].strip()
+    words = head.split()
+    if len(words) == 1:
+        return Argument(words[0], default, None, text.strip())
+    return Argument(words[-1] if words else '', default, ' '.join(words[:-1]) or None, text.strip())
+
+
+def parse_signature(title):
+    """
+    Signature of method title. Name is the word before the first bracket of argument list,
+    name is None if title has no complete argument list before return arrow
+    """
+    m = FLAT_RE.match(title)
+    if m:
+        return _flat_signature(title, m)
+    name = None
+    start = end = None
+    arrow = None
+    # bracket depth inside argument list, quote char inside string
+    depth = 0
+    quote = None
+    escaped = -1
+    piece = None
+    eq = -1
+    # (start, end, default position) of arguments
+    pieces = []
+    search = TOKEN_RE.search
+    position = 0
+    while True:
+        m = search(title, position)
+        if m is None:
+            break
+        c = m.group()
+        i = m.start()
+        position = m.end()
+        if quote:
+            if c == '\\':
+                if i != escaped:
+                    escaped = i + 1
+            elif c == quote and i != escaped:
+                quote = None
+        elif depth:
+            if c in OPEN:
+                group = GROUP_RE.match(title, i)
+                if group:
+                    position = group.end()
+                else:
+                    depth += 1
+            elif c in CLOSE:
+                depth -= 1
+                if not depth:
+                    end = i
+                    if pieces or title[piece:i].strip():
+                        pieces.append((piece, i, eq))
+                    piece = None
+            elif c in QUOTES:
+                # apostrophes of words are not strings
+                j = i - 1
+                while title[j].isspace():
+                    j -= 1
+                if title[j] in STRING_AFTER:
+                    quote = c
+            elif depth == 1:
+                if c == ',':
+                    pieces.append((piece, i, eq))
+                    piece = i + 1
+                    eq = -1
+                elif c == '=' and eq < 0:
+                    eq = i
+        elif c == ARROW or c == '->':
+            arrow = m.end()
+            break
+        elif c == '(' and name is None and i and title[i - 1] in WORD:
+            word = i - 1
+            while word and title[word - 1] in WORD:
+                word -= 1
+            name = title[word:i]
+            start = i
+            piece = i + 1
+            depth = 1
+    return _signature(title, name, start, end, pieces, arrow)
+
+
+def _flat_signature(title, m):
+    """
+    Signature of title matched by FLAT_RE
+    """
+    text = m.group(2)
+    start, end = m.span(2)
+    pieces = []
+    if '(' not in text and '[' not in text and '{' not in text:
+        if text.strip():
+            for part in text.split(','):
+                eq = part.find('=')
+                pieces.append((start, start + len(part), start + eq if eq >= 0 else -1))
+                start += len(part) + 1
+    elif text.strip():
+        while True:
+            piece = PIECE_RE.match(title, start, end).end()
+            head = HEAD_RE.match(title, start, piece)
+            pieces.append((start, piece, head.end() - 1 if head else -1))
+            if piece >= end:
+                break
+            start = piece + 1
+    arrow = ARROW_RE.search(title, m.end())
+    return _signature(title, m.group(1), m.start(2) - 1, end, pieces, arrow and arrow.end())
+
+
+def _signature(title, name, start, end, pieces, arrow):
+    """
+    Signature of title scanned, start and end are positions of argument list brackets,
+    pieces are (start, end, default position) of arguments, arrow is position after return arrow
+    """
+    ret = ''
+    if arrow is not None:
+        ret = _clean(title[arrow:]).rstrip()
+    if end is None:
+        return Signature(None, [], ret, None)
+    args_text = title[start:end + 1]
+    cleaned = _clean(args_text)
+    clean = cleaned is not args_text
+    args = [_argument(title[a:b], eq - a if eq >= 0 else -1, clean) for a, b, eq in pieces]
+    return Signature(name, args, ret, cleaned.strip())
+
+
+def parse_arguments(text):
+    """
+    Arguments of argument list text, with or without brackets
+    """
+    text = text.strip()
+    if not text.startswith('('):
+        text = '(' + text
+    if not text.endswith(')'):
+        text += ')'
+    return parse_signature('f' + text).args
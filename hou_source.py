@@ -0,0 +1,136 @@
+"""
+Local documentation sources: read pages from a folder or a zip archive instead of the web.
+
+A source has the Fetcher interface (get, close, counters), HouModules.setup(source=...) uses it
+for a run. Pages keep the urls of the documentation they are a copy of (base_url), so output is
+the same as of the web run. Without base_url page urls are "local:" + path inside the source.
+
+Sources must contain rendered html pages, e.g. a saved copy of the web documentation.
+Help archives of a Houdini install (houdini/help/*.zip) hold wiki sources of the pages, which are
+rendered to html by the Houdini help server, so they can't be parsed directly.
+"""
+import os, zipfile, threading
+
+SCHEME = 'local:'
+
+
+class LocalSource(object):
+    local = True
+
+    def __init__(self, root='', base_url=None):
+        """
+        :param root: folder of hou pages inside the source, e.g. hom/hou
+        :param base_url: web url of root, e.g. HouModules.version_url(version)
+        """
+        root = root.strip('/')
+        self.root = root + '/' if root else ''
+        self.root_url = base_url.rstrip('/') + '/' if base_url else SCHEME + self.root
+        self.requests_count = 0
+        self.not_modified_count = 0
+        self._lock = threading.Lock()
+
+    def path(self, url):
+        """
+        Path inside the source of page url
+        """
+        if not url.startswith(self.root_url):
+            raise ValueError('Url is not in source: %s' % url)
+        path = self.root + url[len(self.root_url):].split('#')[0].split('?')[0]
+        if not path or path.endswith('/'):
+            path += 'index.html'
+        return path
+
+    def read(self, path):
+        """
+        Content of path, None if not found
+        """
+        raise NotImplementedError
+
+    def get(self, url, validators=None):
+        """
+        Same result as Fetcher.get, status is 200 or 404
+        """
+        path = self.path(url)
+        content = self.read(path)
+        if content is None and not os.path.splitext(path)[1]:
+            content = self.read(path + '.html')
+        with self._lock:
+            self.requests_count += 1
+        if content is None:
+            return 404, None, {}
+        return 200, content, {}
+
+    def close(self):
+        pass
+
+
+class DirectorySource(LocalSource):
+    def __init__(self, folder, root='', base_url=None):
+        super(DirectorySource, self).__init__(root, base_url)
+        self.folder = os.path.abspath(os.path.expanduser(folder))
+
+    def __repr__(self):
+        return '<DirectorySource %s>' % self.folder
+
+    def read(self, path):
+        full = os.path.normpath(os.path.join(self.folder, path))
+        if not full.startswith(self.folder + os.sep) or not os.path.isfile(full):
+            return None
+        with open(full, 'rb') as f:
+            return f.read()
+
+
+class ZipSource(LocalSource):
+    """
+    Pages are read member by member from the open archive, nothing is extracted.
+    Archive is opened on first read and closed by close
+    """
+    def __init__(self, path, root='', base_url=None):
+        super(ZipSource, self).__init__(root, base_url)
+        self.archive_path = os.path.abspath(os.path.expanduser(path))
+        self._zip = None
+        self._names = None
+
+    def __repr__(self):
+        return '<ZipSource %s>' % self.archive_path
+
+    def _open(self):
+        self._zip = zipfile.ZipFile(self.archive_path)
+        # members by normalized name, archives written on windows may use backslashes
+        self._names = dict((n.replace('\\', '/').lstrip('/'), n) for n in self._zip.namelist() if not n.endswith('/'))
+
+    def read(self, path):
+        with self._lock:
+            if self._zip is None:
+                self._open()
+            name = self._names.get(path)
+            if name is None:
+                return None
+            # members share the archive file position
+            return self._zip.read(name)
+
+    def names(self):
+        """
+        Member paths of the archive
+        """
+        with self._lock:
+            if self._zip is None:
+                self._open()
+            return sorted(self._names)
+
+    def close(self):
+        with self._lock:
+            if self._zip is not None:
+                self._zip.close()
+            self._zip = None
+
+
+def open_source(path, root='', base_url=None):
+    """
+    Source of a folder or a zip archive
+    """
+    if os.path.isdir(path):
+        return DirectorySource(path, root, base_url)
+    if zipfile.is_zipfile(path):
+        return ZipSource(path, root, base_url)
+    raise ValueError('Not a folder or zip archive: %s' % path)
@@ -0,0 +1,149 @@
+"""
+Run instrumentation.
+
+Timers and counters per stage and per page. Stage times are inclusive, "extract" contains
+"signature" and "returns" time of the same page. Pages parsed in worker processes are timed
+there into their own Stats and merged back into the run Stats.
+
+Hooks are called in the main process as callback(event, data):
+    stage   dict(stage, page, seconds) for every timed stage of the main process
+    page    dict(page, stages) when a page parsed in any process is merged
+"""
+import time, json, functools, threading, collections
+from contextlib import contextmanager
+
+
+class Stats(object):
+    def __init__(self):
+        self.stages = collections.Counter()
+        self.calls = collections.Counter()
+        self.counters = collections.Counter()
+        self.rules = collections.Counter()
+        self.rule_calls = collections.Counter()
+        self.pages = collections.defaultdict(collections.Counter)
+        self.hooks = []
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return '<Stats %s stages, %s pages>' % (len(self.stages), len(self.pages))
+
+    def add_hook(self, callback):
+        self.hooks.append(callback)
+
+    def remove_hook(self, callback):
+        self.hooks.remove(callback)
+
+    def emit(self, event, **data):
+        for callback in self.hooks:
+            callback(event, data)
+
+    @contextmanager
+    def timer(self, stage, page=None):
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.add(stage, time.time() - start, page)
+
+    def add(self, stage, seconds, page=None):
+        with self._lock:
+            self.stages[stage] += seconds
+            self.calls[stage] += 1
+            if page:
+                self.pages[page][stage] += seconds
+        if self.hooks:
+            self.emit('stage', stage=stage, page=page, seconds=seconds)
+
+    def add_rule(self, name, seconds):
+        self.rules[name] += seconds
+        self.rule_calls[name] += 1
+
+    def count(self, name, value=1):
+        with self._lock:
+            self.counters[name] += value
+
+    def slowest_pages(self, count=10):
+        """
+        List of (url, seconds) of pages with the largest total time
+        """
+        totals = dict((url, sum(v for k, v in stages.items() if k in TOP_STAGES)) for url, stages in self.pages.items())
+        return sorted(totals.items(), key=lambda x: -x[1])[:count]
+
+    def to_dict(self):
+        return dict(
+            stages=dict(self.stages),
+            calls=dict(self.calls),
+            counters=dict(self.counters),
+            rules=dict(self.rules),
+            rule_calls=dict(self.rule_calls),
+            pages=dict((url, dict(v)) for url, v in self.pages.items()),
+        )
+
+    def merge(self, data):
+        """
+        Add stats dict of other process
+        """
+        with self._lock:
+            for name in ('stages', 'calls', 'counters', 'rules', 'rule_calls'):
+                getattr(self, name).update(data[name])
+            for url, stages in data['pages'].items():
+                self.pages[url].update(stages)
+        for url, stages in data['pages'].items():
+            if self.hooks:
+                self.emit('page', page=url, stages=dict(stages))
+
+    def dump_json(self, path):
+        json.dump(self.to_dict(), open(path, 'w'), indent=2, sort_keys=True)
+
+    def summary(self, pages=5, rules=5):
+        lines = ['Stage times (inclusive):']
+        for stage, seconds in sorted(self.stages.items(), key=lambda x: -x[1]):
+            lines.append('  %-12s %9.3fs %8s calls' % (stage, seconds, self.calls[stage]))
+        if self.counters:
+            lines.append('Counters:')
+            for name, value in sorted(self.counters.items()):
+                lines.append('  %-12s %12s' % (name, value))
+        if self.pages:
+            lines.append('Slowest pages:')
+            for url, seconds in self.slowest_pages(pages):
+                lines.append('  %9.3fs %s' % (seconds, url))
+        if self.rules:
+            lines.append('Return rules by time:')
+            for name, seconds in self.rules.most_common(rules):
+                lines.append('  %-18s %9.3fms %8s calls' % (name, seconds * 1000, self.rule_calls[name]))
+        return '\n'.join(lines)
+
+
+class _NoTimer(object):
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc):
+        pass
+
+
+NO_TIMER = _NoTimer()
+
+
+# per page stages which are not contained in other stages
+TOP_STAGES = ('fetch', 'cache_read', 'read', 'soup', 'extract', 'render')
+
+
+def timed(stage):
+    """
+    Time method with stats of its class, no op when class stats is None
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(obj, *args, **kwargs):
+            stats = obj.stats
+            if stats is None:
+                return func(obj, *args, **kwargs)
+            start = time.time()
+            try:
+                return func(obj, *args, **kwargs)
+            finally:
+                stats.add(stage, time.time() - start)
+        return wrapper
+    return decorator
+